@@ -1,33 +1,59 @@
 # app.py - US Rental Map PRO v28.3 (MODULAR + ESTÁVEL)
-import math
-import folium
-import requests
+import pickle
 import pandas as pd
 import streamlit as st
 from streamlit_folium import st_folium
-from core.map_builder import MapBuilder
+from core.map_builder import MapBuilder, poi_features
+from core.clustering import bounds_from_state
+from core.anchors import ANCHOR_MAX, anchor_columns, anchor_dicts, anchors_from_query, anchors_to_query, normalize_anchors, MAX_ANCHORS
+from core.cache import LRUCache, content_hash, frame_hash, open_backend
+from core.filters import normalize_filters, filter_key, from_query, to_query
+from core.results import ResultPager, PAGE_SIZE, keyset_page
+from core.enrichment import nearest_dicts
+from core.dedupe import buildings, collapse_mask
+from core.geofilter import normalize_shapes
+from core.reachability import REACH_COLUMNS, reach_label
+from core.ranking import CRITERIA, DEFAULT_WEIGHTS
+from core.engine import build_pipeline, pipeline_inputs
+from core.pois import AROUND_CACHE
+from core.profiling import CAPTURE_MODES, Capture, Profiler
+from utils.st_adapter import install_logging, install_profiling_log, load_aggregates_cached, load_properties_cached, area_pois_cached
+from config.settings import BUFFER, MAP_CACHE_MAX_ENTRIES, MAP_CACHE_MAX_BYTES, POI_LAYER_CACHE_MAX_ENTRIES, PIPELINE_CACHE_MAX_ENTRIES
+from config.settings import SHARED_CACHE_MAX_BYTES, SHARED_CACHE_TTL, SHARED_CACHE_URL
 
 # CONFIG
 st.set_page_config(layout="wide", page_title="US Rental Map PRO", page_icon="house")
 st.markdown("<h1 style='text-align:center;color:#FF5252'>US RENTAL MAP PRO</h1>", unsafe_allow_html=True)
 st.markdown("<style>[data-testid='stApp'] {background:#000;color:#FFF}</style>", unsafe_allow_html=True)
 
-# === 1. CARREGA DADOS ===
-@st.cache_data(ttl=86400)
-def load_data():
-    df = pd.read_csv("../dataset/bronze/Houston_bronze.csv")
-    df = df.dropna(subset=["Lat", "Lon", "unit_price", "City", "State"])
-    df["unit_price"] = pd.to_numeric(df["unit_price"], errors="coerce")
-    df = df.dropna(subset=["unit_price"])
-    return df
+# === 0. INSTRUMENTAÇÃO: tempo por etapa neste rerun (+ cProfile/tracemalloc se pedido no painel Debug) ===
+# Reruns só de fragmento acumulam no perfil do último rerun completo.
+if "capture" in st.session_state:
+    st.session_state.capture.stop()
+capture = st.session_state.capture = Capture(st.session_state.pop("capture_next", None)).start()
+prof = Profiler()
 
-df_original = load_data()
+# === 1. CARREGA DADOS ===
+install_logging()
+with prof.span("load") as span:
+    df_original = load_properties_cached()
+    aggregates = load_aggregates_cached(df_original, content_hash(df_original))
+    span["rows"] = len(df_original)
 
 # === 2. FILTROS NO SIDEBAR ===
 st.sidebar.header("Filtros de Localização")
 
-available_states = sorted(df_original["State"].unique())
-if "state" not in st.session_state:
+# Filtros da URL (link compartilhado) só semeiam a primeira execução da sessão
+if "url_filters" not in st.session_state:
+    st.session_state.url_filters = from_query(st.query_params.to_dict())
+    st.session_state.state = st.session_state.url_filters.get("state", st.session_state.get("state"))
+    st.session_state.city = st.session_state.url_filters.get("city", "")
+    st.session_state.geo_shapes = st.session_state.url_filters.get("shapes", [])
+    st.session_state.anchors = anchors_from_query(st.query_params.to_dict())
+url_filters = st.session_state.url_filters
+
+available_states = aggregates.states
+if st.session_state.get("state") is None:
     st.session_state.state = available_states[0] if available_states else "TX"
 
 st.session_state.state = st.sidebar.selectbox(
@@ -37,7 +63,7 @@ st.session_state.state = st.sidebar.selectbox(
     key="state_selectbox"
 )
 
-cities_in_state = sorted(df_original[df_original["State"] == st.session_state.state]["City"].str.title().unique())
+cities_in_state = aggregates.cities.get(st.session_state.state, [])
 if "city" not in st.session_state:
     st.session_state.city = ""
 
@@ -45,164 +71,330 @@ st.session_state.city = st.sidebar.selectbox(
     "Cidade",
     options=[""] + cities_in_state,
     index=0 if st.session_state.city == "" else (cities_in_state.index(st.session_state.city) + 1 if st.session_state.city in cities_in_state else 0),
+    # Estado e agregados ligados na criação: o AppTest chama format_func fora da execução do script
+    format_func=lambda c, s=st.session_state.state, agg=aggregates: f"{c} ({agg.area(s, c)['count']})" if c else "Todas",
     key="city_selectbox"
 )
 
-beds_options = sorted(df_original["unit_beds"].dropna().unique())
-beds_sel = st.sidebar.multiselect("Quartos", beds_options, default=beds_options[:2])
+# Quartos e faixa de preço da área selecionada (cidade, ou o estado inteiro)
+area = aggregates.area(st.session_state.state, st.session_state.city)
+beds_options = area["beds"]
+beds_default = [b for b in url_filters.get("beds", []) if b in beds_options] or beds_options[:2]
+beds_sel = st.sidebar.multiselect("Quartos", beds_options, default=beds_default)
+
+price_min, price_max = area["price_min"], max(area["price_max"], area["price_min"] + 1)
+url_lo, url_hi = url_filters.get("price", (price_min, price_max))
+price_default = (min(max(url_lo, price_min), price_max), max(min(url_hi, price_max), price_min))
+price_range = st.sidebar.slider(
+    "Preço (USD)", price_min, price_max, price_default,
+    help=f"Mediana ${area['price_q']['p50']:,.0f} • 10%–90%: ${area['price_q']['p10']:,.0f}–${area['price_q']['p90']:,.0f}"
+)
+
+# Alcance pré-calculado (rota real no gold com malha viária; senão faixa de distância): filtro booleano
+reach_sel = st.sidebar.multiselect(
+    "Alcance", REACH_COLUMNS, default=url_filters.get("reach", []), format_func=reach_label,
+    help="Tempo até o POI mais próximo da categoria"
+)
+
+# Área desenhada no mapa (polígono/retângulo/círculo) restringe a busca
+if st.session_state.geo_shapes:
+    col_geo, col_clear = st.sidebar.columns([3, 2])
+    col_geo.caption(f"Área desenhada: {len(st.session_state.geo_shapes)} forma(s)")
+    if col_clear.button("Limpar área"):
+        st.session_state.geo_shapes = []
+
+# Âncoras de deslocamento (trabalho etc.): distância de todos os imóveis a cada uma, filtrável/ordenável
+with st.sidebar.expander(f"Âncoras de deslocamento ({len(st.session_state.anchors['points'])})"):
+    for i, p in enumerate(st.session_state.anchors["points"]):
+        col_name, col_rm = st.columns([4, 1])
+        col_name.caption(f"{p['name']} ({p['lat']:.4f}, {p['lon']:.4f})")
+        if col_rm.button("✕", key=f"anchor_rm_{i}"):
+            points = [q for j, q in enumerate(st.session_state.anchors["points"]) if j != i]
+            st.session_state.anchors = normalize_anchors(points, st.session_state.anchors["max_km"])
+            st.rerun()
+    if len(st.session_state.anchors["points"]) < MAX_ANCHORS:
+        with st.form("anchor_form", clear_on_submit=True):
+            anchor_name = st.text_input("Nome", placeholder="Trabalho")
+            anchor_pos = st.text_input("Lat, Lon", placeholder="29.7604, -95.3698")
+            if st.form_submit_button("Adicionar"):
+                try:
+                    lat, lon = (float(v) for v in anchor_pos.split(","))
+                    points = st.session_state.anchors["points"] + [{"name": anchor_name, "lat": lat, "lon": lon}]
+                    st.session_state.anchors = normalize_anchors(points, st.session_state.anchors["max_km"])
+                except ValueError:
+                    st.error("Use o formato: lat, lon")
+        st.toggle("Clique no mapa adiciona âncora", key="anchor_click")
+    max_km = st.number_input(
+        "Distância máx. até qualquer âncora (km)", 0.0, 500.0, st.session_state.anchors["max_km"] or 0.0, 1.0,
+        help="0 = sem limite", disabled=not st.session_state.anchors["points"]
+    )
+    st.session_state.anchors = normalize_anchors(st.session_state.anchors["points"], max_km)
+anchors = st.session_state.anchors
+
+best_deals = st.sidebar.toggle("Melhores ofertas (Pareto)", value=False, help="Imóveis que nenhum outro supera em preço, escola e supermercado ao mesmo tempo")
+map_layer = st.sidebar.radio("Camada de imóveis", ["Marcadores", "Hexágonos (preço)"], horizontal=True)
+viewport_mode = st.sidebar.toggle("Modo viewport (clusters)", value=False, help="Envia só os imóveis/POIs visíveis, agrupados por zoom")
+collapse_dups = st.sidebar.toggle("Agrupar relistagens", value=True, help="Esconde anúncios repetidos da mesma unidade (até 5% acima do mais barato)")
 
-price_min = int(df_original["unit_price"].min())
-price_max = int(df_original["unit_price"].max())
-price_range = st.sidebar.slider("Preço (USD)", price_min, price_max, (price_min, price_max + 1000))
+# Estágios e dependências (cada um só reexecuta quando algo acima dele muda):
+#   filtros (sidebar) -> resultados (df_match, POIs da área, ranking)
+#                          -> mapa (fragmento: paginação, pan/zoom)
+#                          -> tabela (fragmento: ordenação, pesos)
+# POIs dependem só de Estado/Cidade: trocar quartos/preço não refaz a busca nem as camadas de POI.
 
 # === 4. APLICA FILTROS ===
-df_filtrado = df_original[
-    (df_original["State"] == st.session_state.state) &
-    (df_original["City"].str.title() == st.session_state.city.title() if st.session_state.city else True) &
-    (df_original["unit_beds"].isin(beds_sel)) &
-    (df_original["unit_price"].between(price_range[0], price_range[1]))
-].copy()
-
-if not df_filtrado.empty:
-    df_filtrado = df_filtrado.sort_values("unit_price").head(50).reset_index(drop=True)
-    center = [df_filtrado["Lat"].mean(), df_filtrado["Lon"].mean()]
-else:
+# Forma canônica -> URL compartilhável e chave dos caches do processo (pipeline, mapa): a mesma busca
+# feita por qualquer sessão reaproveita filtrados, enriquecimento e HTML do mapa (LRU).
+filters = normalize_filters(st.session_state.state, st.session_state.city, beds_sel, price_range, st.session_state.geo_shapes, reach_sel)
+query = {**to_query(filters), **anchors_to_query(anchors)}
+if st.query_params.to_dict() != query:
+    st.query_params.from_dict(query)
+
+# === 5. PIPELINE: filtra -> POIs -> enriquece -> âncoras -> ranking -> Pareto (memoizado por conteúdo) ===
+@st.cache_resource(show_spinner=False)
+def get_pipeline():
+    shared = open_backend(SHARED_CACHE_URL, "enriched", max_bytes=SHARED_CACHE_MAX_BYTES, ttl=SHARED_CACHE_TTL)
+    return build_pipeline(LRUCache(PIPELINE_CACHE_MAX_ENTRIES), pois_fn=area_pois_cached, shared=shared)
+
+pipeline = get_pipeline()
+def run_stages(*targets):
+    out, report = pipeline.run_many(list(targets), **pipeline_inputs(df_original, filters, anchors, collapse_dups))
+    st.session_state.setdefault("pipeline_report", []).extend(report)
+    prof.add_stages(report)
+    return out
+
+st.session_state.pipeline_report = []
+with st.spinner("Buscando POIs..."), prof.span("results") as span:
+    out = run_stages("commute", "shown", "pois", "ranking", *(["deals"] if best_deals else []))
+# Já enriquecido (POI mais próximo) e com distâncias às âncoras: mapa e tabela não recalculam por linha
+df_match, (supermarkets_df, schools_df), ranking = out["commute"], out["pois"], out["ranking"]
+df_shown = out["shown"]
+deals_idx = out.get("deals")
+span.update(rows=len(df_match), supermarkets=len(supermarkets_df), schools=len(schools_df))
+prof.count("rows_matched", len(df_match))
+prof.count("pois", len(supermarkets_df) + len(schools_df))
+if df_match.empty:
     st.warning("Nenhum imóvel encontrado.")
-    center = [30.2672, -95.6000]
-    df_filtrado = pd.DataFrame()
-
-st.write(f"**{len(df_filtrado)} imóveis encontrados**")
-
-# === 5. BUSCA POIs (ROBUSTA) ===
-def haversine(lat1, lon1, lat2, lon2):
-    R = 6371
-    dlat = math.radians(lat2 - lat1)
-    dlon = math.radians(lon2 - lon1)
-    a = math.sin(dlat/2)**2 + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(dlon/2)**2
-    return 2 * R * math.atan2(math.sqrt(a), math.sqrt(1-a))
-
-@st.cache_data(ttl=7200)
-def get_pois_around_houses(_hash, lat_list, lon_list):
-    if not lat_list: return [], []
-    points = ",".join([f"{la},{lo}" for la, lo in zip(lat_list, lon_list)])
-    query = f'''
-    [out:json][timeout:60];
-    (
-      nwr["shop"~"supermarket|grocery"]["name"](around:5000,{points});
-      nwr["brand"~"Walmart|Best Buy|Savers|HEB|Kroger|Target|Costco|Aldi",i](around:5000,{points});
-      nwr["amenity"="school"](around:5000,{points});
-    );
-    out center;
-    '''
-    servers = [
-        "https://overpass.kumi.systems/api/interpreter",
-        "https://overpass-api.de/api/interpreter",
-        "https://lz4.overpass-api.de/api/interpreter"
-    ]
-    for server in servers:
-        try:
-            r = requests.post(server, data={"data": query}, timeout=60)
-            if r.status_code == 200:
-                supers, schools = [], []
-                for e in r.json().get("elements", []):
-                    lat = e.get("lat") or e.get("center", {}).get("lat")
-                    lon = e.get("lon") or e.get("center", {}).get("lon")
-                    if not lat or not lon: continue
-                    name = (e["tags"].get("name") or e["tags"].get("brand") or "Local").title()
-                    if e["tags"].get("shop") or "brand" in e["tags"]:
-                        supers.append([float(lat), float(lon), name])
-                    elif e["tags"].get("amenity") == "school":
-                        if not any(x in name.lower() for x in ["university", "college", "daycare", "preschool"]):
-                            schools.append([float(lat), float(lon), name])
-                return supers, schools
-        except:
-            continue
-    return [], []
-
-with st.spinner("Buscando POIs..."):
-    hash_key = f"{st.session_state.state}_{st.session_state.city}_{len(df_filtrado)}"
-    supers, schools = get_pois_around_houses(hash_key, df_filtrado["Lat"].tolist(), df_filtrado["Lon"].tolist())
-
-# === CONVERTE PARA DATAFRAMES ===
-supermarkets_df = pd.DataFrame(supers, columns=["lat", "lon", "name"]) if supers else pd.DataFrame(columns=["lat", "lon", "name"])
-schools_df = pd.DataFrame(schools, columns=["lat", "lon", "name"]) if schools else pd.DataFrame(columns=["lat", "lon", "name"])
+    ranking = deals_idx = None
 
 # === 6. CONSTRÓI O MAPA MODULAR ===
-map_builder = MapBuilder(center=center)
-map_builder.add_supermarkets(supermarkets_df)
-map_builder.add_schools(schools_df)
-
-for _, row in df_filtrado.iterrows():
-    # Supermercado mais próximo
-    if not supermarkets_df.empty:
-        dists = supermarkets_df.apply(lambda r: haversine(row["Lat"], row["Lon"], r["lat"], r["lon"]), axis=1)
-        idx = dists.idxmin()
-        ns = supermarkets_df.loc[idx].to_dict()
-        ns["dist"] = dists[idx]
-    else:
-        ns = {"lat": 0, "lon": 0, "name": "N/A", "dist": 99}
-
-    # Escola mais próxima
-    if not schools_df.empty:
-        dists = schools_df.apply(lambda r: haversine(row["Lat"], row["Lon"], r["lat"], r["lon"]), axis=1)
-        idx = dists.idxmin()
-        nsc = schools_df.loc[idx].to_dict()
-        nsc["dist"] = dists[idx]
+@st.cache_resource(show_spinner=False)
+def get_map_caches():
+    # Compartilhado entre sessões: camadas de POI por snapshot e receita do mapa por filtro normalizado
+    return LRUCache(POI_LAYER_CACHE_MAX_ENTRIES), LRUCache(MAP_CACHE_MAX_ENTRIES, MAP_CACHE_MAX_BYTES)
+
+poi_layer_cache, map_cache = get_map_caches()
+
+def build_map_plan(page_df, sups, schs, deals, zoom):
+    # Receita imutável do mapa: chamadas do MapBuilder com argumentos prontos (POIs vizinhos, features).
+    # O folium.Map é mutável e o st_folium serializa a cada rerun, então cada sessão monta o seu a partir daqui
+    calls = [("add_draw", (filters["shapes"],)), ("add_anchors", (anchors["points"],))]
+    for kind, pois in (("supermarket", sups), ("school", schs)):
+        features = poi_layer_cache.get_or_set((kind, frame_hash(pois)), lambda: poi_features(pois))
+        calls.append(("add_poi_layer", (features, kind)))
+
+    with prof.span("map.plan", rows=len(page_df)):
+        if map_layer != "Marcadores":
+            # Visão agregada de todos os imóveis filtrados (custo fixo, independe da quantidade)
+            calls.append(("add_hex_layer", (run_stages("hexgrid")["hexgrid"].get_features(zoom),)))
+        else:
+            # Um marcador por prédio (unidades do mesmo endereço não se empilham)
+            for units in buildings(page_df):
+                row = units.iloc[0]
+                if len(units) == 1:
+                    calls.append(("add_home", (row.to_dict(), *nearest_dicts(row), anchor_dicts(row, anchors))))
+                else:
+                    calls.append(("add_building", (units, *nearest_dicts(row), anchor_dicts(row, anchors))))
+                prof.count("markers")
+        if deals is not None:
+            calls.append(("add_best_deals", (deals,)))
+    calls = tuple(calls)
+    return {"calls": calls, "bytes": len(pickle.dumps(calls))}
+
+def build_map(center, plan):
+    map_builder = MapBuilder(center=center)
+    with prof.span("map.build", calls=len(plan["calls"])):
+        for method, args in plan["calls"]:
+            getattr(map_builder, method)(*args)
+    return map_builder.get_map()
+
+def render_viewport_map(center, df_shown, sups_vp, schs_vp, deals):
+    # Base fixa por filtro; só a camada de clusters do viewport atual vai para o navegador
+    out = run_stages("home_clusters", "poi_clusters")
+    homes_idx, (sups_idx, schs_idx) = out["home_clusters"], out["poi_clusters"]
+
+    map_state = st.session_state.get("rental_map_vp") or {}
+    s, w = df_shown["Lat"].min() - BUFFER, df_shown["Lon"].min() - BUFFER
+    n, e = df_shown["Lat"].max() + BUFFER, df_shown["Lon"].max() + BUFFER
+    bounds = bounds_from_state(map_state) or (s, w, n, e)
+    zoom = map_state.get("zoom") or 12
+    vp_center = map_state.get("center") or {}
+    vp_center = [vp_center["lat"], vp_center["lng"]] if vp_center else center
+
+    builder = MapBuilder(center=center)
+    builder.add_draw(filters["shapes"])
+    builder.add_anchors(anchors["points"])
+    layer = builder.new_layer("viewport")
+
+    with prof.span("map.clusters", zoom=zoom) as span:
+        homes = homes_idx.get_clusters(bounds, zoom)
+        sups = sups_idx.get_clusters(bounds, zoom)
+        schs = schs_idx.get_clusters(bounds, zoom)
+        span["clusters"] = len(homes) + len(sups) + len(schs)
+    builder.add_clusters(sups, color="#1E90FF", label="supermercados")
+    builder.add_clusters(schs, color="#FF9800", label="escolas")
+    if deals is not None:
+        builder.add_best_deals(deals)
+    if map_layer == "Marcadores":
+        builder.add_clusters(homes, label="imóveis")
     else:
-        nsc = {"lat": 0, "lon": 0, "name": "N/A", "dist": 99}
-
-    map_builder.add_home(row, ns, nsc)
-
-
-# === 7. EXIBE O MAPA ===
-st_folium(map_builder.get_map(), width=1200, height=550, key="rental_map")
-
-
-
-# === 8. TABELA FINAL COM NOME DOS POIs ===
-if not df_filtrado.empty:
-    tabela = df_filtrado.copy()
-
-    # Calcula distância e nome do supermercado mais próximo
-    def get_closest_sup(row):
-        if supermarkets_df.empty:
-            return "N/A", 99
-        dists = supermarkets_df.apply(
-            lambda r: haversine(row["Lat"], row["Lon"], r["lat"], r["lon"]), axis=1
-        )
-        idx = dists.idxmin()
-        return supermarkets_df.loc[idx, "name"], dists[idx]
-
-    # Calcula distância e nome da escola mais próxima
-    def get_closest_sch(row):
-        if schools_df.empty:
-            return "N/A", 99
-        dists = schools_df.apply(
-            lambda r: haversine(row["Lat"], row["Lon"], r["lat"], r["lon"]), axis=1
+        builder.add_hex_layer(run_stages("hexgrid")["hexgrid"].get_features(zoom, bounds))
+    builder.add_supermarkets(sups_vp.iloc[sups.loc[sups["point"] >= 0, "point"]])
+    builder.add_schools(schs_vp.iloc[schs.loc[schs["point"] >= 0, "point"]])
+    singles = homes.loc[homes["point"] >= 0, "point"] if map_layer == "Marcadores" else []
+    with prof.span("map.markers", rows=len(singles)):
+        for i in singles:
+            row = df_shown.iloc[i]
+            builder.add_home(row, *nearest_dicts(row), anchor_dicts(row, anchors))
+
+    st.caption(f"Viewport: {int(homes['count'].sum())} imóveis em {len(homes)} marcadores (zoom {zoom})")
+    with prof.span("map.st_folium"):
+        out = st_folium(
+            builder.get_map(), width=1200, height=550, key="rental_map_vp",
+            center=vp_center, zoom=zoom, feature_group_to_add=layer,
+            returned_objects=["bounds", "zoom", "center", "all_drawings", "last_clicked"]
         )
-        idx = dists.idxmin()
-        return schools_df.loc[idx, "name"], dists[idx]
-
-    # Aplica funções
-    tabela[["sup_name", "dist_sup"]] = tabela.apply(
-        lambda row: pd.Series(get_closest_sup(row)), axis=1
-    )
-    tabela[["sch_name", "dist_sch"]] = tabela.apply(
-        lambda row: pd.Series(get_closest_sch(row)), axis=1
-    )
-
-    # Ordena por preço + proximidade
-    tabela = tabela.sort_values(by=["unit_price", "dist_sch", "dist_sup"])
+    sync_drawings(out, "rental_map_vp")
+    sync_anchor_click(out)
+
+def sync_drawings(map_state, key):
+    # Desenho criado/editado/apagado no mapa vira filtro: rerun completo (muda resultados, ranking e tabela).
+    # Só reage quando o valor do componente muda: depois de "Limpar área" o st_folium ainda devolve os
+    # desenhos antigos nesse rerun, e reaplicá-los desfaria a limpeza.
+    drawings = (map_state or {}).get("all_drawings")
+    if drawings is None or drawings == st.session_state.get(f"{key}_drawings"):
+        return
+    st.session_state[f"{key}_drawings"] = drawings
+    shapes = normalize_shapes(drawings)
+    if shapes != st.session_state.geo_shapes:
+        st.session_state.geo_shapes = shapes
+        st.rerun()
+
+def sync_anchor_click(map_state):
+    # Com o modo ativo, um clique novo no mapa (fora de marcadores) vira âncora
+    click = (map_state or {}).get("last_clicked")
+    if not st.session_state.get("anchor_click") or not click or click == st.session_state.get("anchor_last_click"):
+        return
+    st.session_state.anchor_last_click = click
+    points = st.session_state.anchors["points"]
+    point = {"name": f"Âncora {len(points) + 1}", "lat": click["lat"], "lon": click["lng"]}
+    st.session_state.anchors = normalize_anchors(points + [point], st.session_state.anchors["max_km"])
+    st.rerun()
+
+@st.fragment
+def map_fragment(df_match, sups, schs, deals):
+    # Reexecuta sozinho em paginação e interações com o mapa
+    if df_match.empty:
+        builder = MapBuilder(center=[30.2672, -95.6000])
+        builder.add_draw(filters["shapes"])
+        builder.add_anchors(anchors["points"])
+        out = st_folium(builder.get_map(), width=1200, height=550, key="rental_map")
+        sync_drawings(out, "rental_map")
+        sync_anchor_click(out)
+        return
+
+    # Paginação por cursor: pilha de cursores na sessão, zerada quando o filtro muda
+    view_key = f"{filter_key(filters)}_{content_hash(anchors)}_{collapse_dups}"
+    if st.session_state.get("page_filter") != view_key:
+        st.session_state.page_filter = view_key
+        st.session_state.page_cursors = [None]
+    page_df, next_cursor = ResultPager(df_match).page(st.session_state.page_cursors[-1])
+    center = [page_df["Lat"].mean(), page_df["Lon"].mean()]
+
+    page_num = len(st.session_state.page_cursors)
+    first = (page_num - 1) * PAGE_SIZE + 1
+    st.write(f"**{len(df_match)} imóveis encontrados** — mostrando {first}–{first + len(page_df) - 1}")
+    col_prev, col_next, _ = st.columns([1, 1, 8])
+    if col_prev.button("← Anterior", disabled=page_num == 1):
+        st.session_state.page_cursors.pop()
+        st.rerun(scope="fragment")
+    if col_next.button("Próxima →", disabled=next_cursor is None):
+        st.session_state.page_cursors.append(next_cursor)
+        st.rerun(scope="fragment")
+
+    if viewport_mode:
+        render_viewport_map(center, df_match, sups, schs, deals)
+        return
+
+    # Reruns que não mudam filtros/POIs reaproveitam a receita pronta (sem refazer POIs vizinhos nem agrupar prédios)
+    zoom = (st.session_state.get("rental_map") or {}).get("zoom") or 12
+    map_key = f"{view_key}_{frame_hash(sups)}_{frame_hash(schs)}_{map_layer}_{st.session_state.page_cursors[-1]}_{deals is not None}"
+    if map_layer != "Marcadores":
+        map_key += f"_z{zoom}"
+    # O st_folium só aceita o folium.Map (serializa e extrai o script a cada chamada), então o HTML pronto
+    # não pode ser servido. Receita compartilhada entre sessões; o Map montado fica só nesta sessão e
+    # reruns com a mesma chave (tabela, pesos, ordenação) não remontam nada
+    if st.session_state.get("map_built_key") != map_key:
+        plan = map_cache.get_or_set(map_key, lambda: build_map_plan(page_df, sups, schs, deals, zoom), sizeof=lambda p: p["bytes"])
+        st.session_state.map_built = build_map(center, plan)
+        st.session_state.map_built_key = map_key
+    with prof.span("map.st_folium"):
+        out = st_folium(st.session_state.map_built, width=1200, height=550, key="rental_map")
+    sync_drawings(out, "rental_map")
+    sync_anchor_click(out)
+
+@st.fragment
+def table_fragment(ranking, deals_idx):
+    # Ordenação e pesos só reexecutam a tabela (matriz normalizada já está no RankingEngine)
+    if ranking is None:
+        st.info("Nenhum imóvel encontrado com os filtros aplicados.")
+        return
+    anchor_labels = {col: f"Dist. {p['name']} (km)" for col, p in zip(anchor_columns(anchors), anchors["points"])}
+    if anchor_labels:
+        anchor_labels[ANCHOR_MAX] = "Maior dist. âncora (km)"
+    sort_labels = {"score": "Score ponderado", "unit_price": "Preço", "dist_sch": "Dist. escola", "dist_sup": "Dist. supermercado"}
+    sort_labels.update(anchor_labels)
+    sort_by = st.radio("Ordenar por", list(sort_labels), format_func=sort_labels.get, horizontal=True, key="table_sort")
+    with st.expander("Pesos do ranking"):
+        weight_labels = {"unit_price": "Preço", "dist_sch": "Dist. escola", "dist_sup": "Dist. supermercado", "unit_beds": "Quartos", "dist_anchor_max": "Dist. âncoras"}
+        criteria = [c for c in CRITERIA if c in ranking.columns]
+        cols = st.columns(len(criteria))
+        weights = {c: col.slider(weight_labels[c], 0.0, 1.0, DEFAULT_WEIGHTS[c], 0.05, key=f"w_{c}") for c, col in zip(criteria, cols)}
+
+    scores = 1 - ranking.scores(weights)
+    shown = collapse_mask(ranking.df) if collapse_dups else None
+    next_cursor = None
+    if deals_idx is not None:
+        # Fronteira completa
+        idx = deals_idx
+    else:
+        # Paginação por cursor (valor, posição) na ordem do ranking; zerada quando filtro, ordenação ou pesos mudam
+        table_key = f"{filter_key(filters)}_{content_hash(anchors)}_{collapse_dups}_{sort_by}_{content_hash(weights)}"
+        if st.session_state.get("table_filter") != table_key:
+            st.session_state.table_filter = table_key
+            st.session_state.table_cursors = [None]
+        values = -scores if sort_by == "score" else ranking.df[sort_by].values
+        idx, next_cursor = keyset_page(values, st.session_state.table_cursors[-1], PAGE_SIZE, shown)
+    tabela = ranking.df.iloc[idx].assign(score=scores[idx])
+    if deals_idx is not None:
+        tabela = tabela.sort_values(sort_by, ascending=sort_by != "score")
 
     # Exibe tabela
-    st.subheader("Ranking Final: Preço + Proximidade")
+    st.subheader("Melhores ofertas (fronteira de Pareto)" if deals_idx is not None else f"Ranking Final: {sort_labels[sort_by]}")
+    # Colunas das âncoras entram antes do link (nomes do usuário como cabeçalho); tempos só com gold + malha viária
+    travel_labels = {c: l for c, l in (("drive_sup_min", "Carro até mercado (min)"), ("walk_sch_min", "A pé até escola (min)")) if c in tabela}
     st.dataframe(
         tabela[[
-            "FullAddress", "unit_price", "unit_beds",
+            "score", "FullAddress", "unit_price", "unit_beds",
             "sch_name", "dist_sch",
             "sup_name", "dist_sup",
+            *travel_labels,
+            *anchor_labels,
             "Url_anuncio"
         ]].rename(columns={
+            **travel_labels,
+            **anchor_labels,
+            "score": "Score",
             "FullAddress": "Endereço",
             "unit_price": "Preço (USD)",
             "unit_beds": "Quartos",
@@ -231,12 +423,62 @@ if not df_filtrado.empty:
         #}
         column_config={
             "Link": st.column_config.LinkColumn(),
+            "Score": st.column_config.ProgressColumn(format="%.2f", min_value=0, max_value=1),
             "Preço (USD)": st.column_config.NumberColumn(format="$%.2f"),
             "Dist. Escola (km)": st.column_config.NumberColumn(format="%.1f km"),
             "Dist. Supermercado (km)": st.column_config.NumberColumn(format="%.1f km"),
+            **{label: st.column_config.NumberColumn(format="%.1f km") for label in anchor_labels.values()},
+            **{label: st.column_config.NumberColumn(format="%.0f min") for label in travel_labels.values()},
         }
     )#
-else:
-    st.info("Nenhum imóvel encontrado com os filtros aplicados.")
+    if deals_idx is not None:
+        return
+    total = len(ranking.df) if shown is None else int(shown.sum())
+    page_num = len(st.session_state.table_cursors)
+    first = (page_num - 1) * PAGE_SIZE + 1
+    col_info, col_prev, col_next = st.columns([8, 1, 1])
+    col_info.caption(f"{first}–{first + len(idx) - 1} de {total}")
+    if col_prev.button("← Anterior", disabled=page_num == 1, key="table_prev"):
+        st.session_state.table_cursors.pop()
+        st.rerun(scope="fragment")
+    if col_next.button("Próxima →", disabled=next_cursor is None, key="table_next"):
+        st.session_state.table_cursors.append(next_cursor)
+        st.rerun(scope="fragment")
+
+# === 7. EXIBE O MAPA ===
+with prof.span("map"):
+    map_fragment(df_shown, supermarkets_df, schools_df, ranking.df.iloc[deals_idx] if ranking is not None and deals_idx is not None else None)
+
+# === 8. TABELA FINAL COM NOME DOS POIs ===
+with prof.span("table"):
+    table_fragment(ranking, deals_idx)
+
+with st.sidebar.expander("Pipeline (cache por estágio)"):
+    report = pd.DataFrame(st.session_state.pipeline_report)
+    if not report.empty:
+        st.caption(f"{int(report['hit'].sum())} hits / {int((~report['hit']).sum())} misses • {pipeline.backend.stats()['entries']} entradas")
+        st.dataframe(report, hide_index=True, use_container_width=True)
+
+# === 9. DEBUG: perfil do rerun (tabela + JSON; captura opcional do próximo rerun) ===
+prof.add_cache("pipeline", pipeline.backend.stats())
+prof.add_cache("map", map_cache.stats())
+prof.add_cache("poi_layers", poi_layer_cache.stats())
+prof.add_cache("shared_pois_around", AROUND_CACHE.stats())
+capture_report = capture.stop()
+with st.sidebar.expander("Debug (perfil)"):
+    profile = prof.to_dict()
+    st.caption(f"Rerun: {profile['total_seconds']:.3f}s")
+    st.dataframe(pd.DataFrame(profile["spans"]), hide_index=True, use_container_width=True)
+    st.json({"counters": profile["counters"], "caches": profile["caches"]}, expanded=False)
+    st.toggle("Exportar log JSON por rerun", key="debug_profile_log")
+    capture_mode = st.selectbox("Capturar próximo rerun", CAPTURE_MODES, key="debug_capture_mode")
+    if st.button("Capturar"):
+        st.session_state.capture_next = capture_mode
+        st.rerun()
+    if capture_report:
+        st.code(capture_report, language=None)
+if st.session_state.get("debug_profile_log"):
+    install_profiling_log()
+    prof.log_json()
 
 st.caption("vfuncional PRO — Modular • Estável • Italy-proof • 13 Nov 2025")
\ No newline at end of file
@@ -0,0 +1,188 @@
+# benchmarks/run.py - tempos dos caminhos quentes com dados sintéticos; resultado em JSON para comparar versões
+# Uso (de dentro de appstreamlit/):
+#   python -m benchmarks.run --label v28.3                      # grava benchmarks/results/v28.3.json
+#   python -m benchmarks.run --quick --baseline benchmarks/results/v28.3.json
+import argparse
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from benchmarks.synthetic import make_listings, make_overpass_elements, make_pois
+from core.data_loader import load_properties
+from core.distance import R_KM, approx_error_bound, haversine_np, nearest_many, nearest_poi
+from core.enrichment import enrich, nearest_dicts
+from core.filters import apply_filters, normalize_filters
+from core.map_builder import MapBuilder, poi_features
+from core.osm_fetcher import OSMFetcher
+from core.results import PAGE_SIZE, ResultPager
+
+LISTING_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+POI_SIZES = [100, 1_000, 10_000, 100_000]
+QUICK_LISTINGS = [1_000, 10_000]
+QUICK_POIS = [100, 1_000]
+MAX_PAIRS = 2e9       # casas x POIs acima disso a busca em lote é pulada (força bruta)
+NEAREST_POI_CALLS = 50  # nearest_poi é por linha (iterrows): mede uma amostra e reporta por chamada
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+def timed(fn, repeat):
+    times, value = [], None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        value = fn()
+        times.append(time.perf_counter() - t0)
+    return {"seconds": round(float(np.median(times)), 6), "min": round(min(times), 6), "repeat": repeat}, value
+
+
+def bench_listings(n, repeat, tmp):
+    df = make_listings(n)
+    path = os.path.join(tmp, f"listings_{n}.csv")
+    df.to_csv(path, index=False)
+    out = []
+    stats, loaded = timed(lambda: load_properties(path), repeat)
+    out.append({"bench": "load_properties", "listings": n, "bytes": os.path.getsize(path), **stats})
+    filters = normalize_filters("TX", "Houston", [1, 2, 3], [1000, 3000])
+    stats, matched = timed(lambda: apply_filters(loaded, filters), repeat)
+    out.append({"bench": "apply_filters", "listings": n, "rows_out": len(matched), **stats})
+    stats, _ = timed(lambda: ResultPager(loaded).page(None), repeat)
+    out.append({"bench": "result_page", "listings": n, **stats})
+    return loaded, out
+
+
+def bench_pois(m, repeat):
+    elements = make_overpass_elements(m)
+    fetcher = OSMFetcher(0, 0, 0, 0, cache=None)
+    stats, _ = timed(lambda: fetcher._process(elements, "Supermercado"), repeat)
+    out = [{"bench": "osm_process", "pois": m, "elements": len(elements), **stats}]
+
+    pois = make_pois(m)
+    calls = max(2, min(NEAREST_POI_CALLS, 50_000 // m))
+    sample = make_listings(calls, seed=3)
+    stats, _ = timed(lambda: [nearest_poi(pois, la, lo, "poi") for la, lo in zip(sample["Lat"], sample["Lon"])], 1)
+    out.append({"bench": "nearest_poi", "pois": m, "calls": calls, "per_call": round(stats["seconds"] / calls, 6), **stats})
+
+    # Mapa de uma página: camadas de POI + PAGE_SIZE marcadores; tamanho do HTML enviado ao navegador
+    page = enrich(make_listings(PAGE_SIZE, seed=4), pois, pois)
+
+    def build():
+        builder = MapBuilder(center=[29.76, -95.37])
+        builder.add_poi_layer(poi_features(pois), "supermarket")
+        for _, row in page.iterrows():
+            builder.add_home(row, *nearest_dicts(row))
+        return builder.get_map().get_root().render()
+    stats, html = timed(build, repeat)
+    out.append({"bench": "map_build", "pois": m, "homes": PAGE_SIZE, "html_bytes": len(html), **stats})
+    return pois, out
+
+
+def bench_nearest_many(listings, pois, repeat):
+    # Força bruta (exact) x duas fases (two_phase); a segunda também é conferida contra a primeira
+    n, m = len(listings), len(pois)
+    if n * m > MAX_PAIRS:
+        return [{"bench": "nearest_many", "listings": n, "pois": m, "skipped": f"{n * m:.0e} pares > MAX_PAIRS"}]
+    args = (listings["Lat"].values, listings["Lon"].values, pois["lat"].values, pois["lon"].values)
+    stats, (_, exact) = timed(lambda: nearest_many(*args), repeat)
+    out = [{"bench": "nearest_many", "listings": n, "pois": m, **stats}]
+    stats, (_, fast) = timed(lambda: nearest_many(*args, mode="two_phase"), repeat)
+    diff = np.abs(fast - exact)
+    out.append({
+        "bench": "nearest_many_two_phase", "listings": n, "pois": m,
+        "max_abs_diff_km": float(diff.max()), "mismatches": int((diff > 1e-9).sum()),
+        "speedup": round(out[0]["seconds"] / stats["seconds"], 2) if stats["seconds"] else None, **stats,
+    })
+    return out
+
+
+def check_error_bound(pairs=200_000, seed=0):
+    # Erro real da equirretangular x limite documentado (approx_error_bound), 0-75° e até 100 km
+    rng = np.random.default_rng(seed)
+    lat = rng.uniform(0, 75, pairs)
+    angle, km = rng.uniform(0, 2 * np.pi, pairs), rng.uniform(0.01, 100, pairs)
+    lat2 = lat + np.degrees(km / R_KM * np.sin(angle))
+    dlon = np.degrees(km / R_KM * np.cos(angle)) / np.cos(np.radians(lat))
+    exact = haversine_np(lat, 0.0, lat2, dlon)
+    equi = R_KM * np.radians(np.hypot(lat2 - lat, dlon * np.cos(np.radians(lat))))
+    ratio = np.abs(equi / exact - 1) / approx_error_bound(lat, exact)
+    return {"bench": "approx_error_bound", "pairs": pairs, "max_error_over_bound": round(float(ratio.max()), 4), "ok": bool(ratio.max() <= 1)}
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def compare(results, baseline_path):
+    # Razão atual/baseline por (bench, tamanhos); > 1 = mais lento
+    with open(baseline_path) as f:
+        baseline = json.load(f)["results"]
+    key = lambda r: (r["bench"], r.get("listings"), r.get("pois"))
+    before = {key(r): r for r in baseline if "seconds" in r}
+    for r in results:
+        old = before.get(key(r))
+        if old and "seconds" in r and old["seconds"] > 0:
+            ratio = r["seconds"] / old["seconds"]
+            flag = "  <-- regressão" if ratio > 1.2 else ""
+            print(f"{r['bench']:<16} listings={r.get('listings')!s:<8} pois={r.get('pois')!s:<7} {old['seconds']:.4f}s -> {r['seconds']:.4f}s  x{ratio:.2f}{flag}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks dos caminhos quentes com dados sintéticos")
+    parser.add_argument("--listings", type=int, nargs="+", default=None)
+    parser.add_argument("--pois", type=int, nargs="+", default=None)
+    parser.add_argument("--quick", action="store_true", help=f"Só {QUICK_LISTINGS} imóveis e {QUICK_POIS} POIs")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--label", default=None, help="Nome do arquivo em benchmarks/results/ (padrão: commit)")
+    parser.add_argument("--out", default=None)
+    parser.add_argument("--baseline", default=None, help="JSON anterior para comparar")
+    args = parser.parse_args(argv)
+    listing_sizes = args.listings or (QUICK_LISTINGS if args.quick else LISTING_SIZES)
+    poi_sizes = args.pois or (QUICK_POIS if args.quick else POI_SIZES)
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        listings = {}
+        for n in listing_sizes:
+            listings[n], out = bench_listings(n, args.repeat, tmp)
+            results += out
+            print(*(f"{r['bench']} n={n}: {r['seconds']:.4f}s" for r in out), sep="\n")
+        for m in poi_sizes:
+            pois, out = bench_pois(m, args.repeat)
+            for n in listing_sizes:
+                out += bench_nearest_many(listings[n], pois, args.repeat)
+            results += out
+            print(*(f"{r['bench']} pois={m} n={r.get('listings', '-')}: {r.get('seconds', r.get('skipped'))}" for r in out), sep="\n")
+
+    results.append(check_error_bound())
+    print(f"approx_error_bound: erro/limite máx {results[-1]['max_error_over_bound']} ({'ok' if results[-1]['ok'] else 'VIOLADO'})")
+
+    commit = git_commit()
+    report = {
+        "meta": {
+            "label": args.label or commit,
+            "commit": commit,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "results": results,
+    }
+    path = args.out or os.path.join(RESULTS_DIR, f"{args.label or commit or 'latest'}.json")
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"-> {path}")
+    if args.baseline:
+        compare(results, args.baseline)
+
+
+if __name__ == "__main__":
+    main()
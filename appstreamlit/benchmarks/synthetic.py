@@ -0,0 +1,75 @@
+# benchmarks/synthetic.py - dados sintéticos "tipo Houston" (mesmas colunas do bronze) e POIs/elementos Overpass
+import numpy as np
+import pandas as pd
+
+# (cidade, lat, lon, peso, desvio em graus)
+CITIES = [
+    ("Houston", 29.7604, -95.3698, 0.40, 0.12),
+    ("Katy", 29.7858, -95.8245, 0.10, 0.05),
+    ("Sugar Land", 29.6197, -95.6349, 0.08, 0.04),
+    ("The Woodlands", 30.1658, -95.4613, 0.08, 0.04),
+    ("Conroe", 30.3119, -95.4561, 0.06, 0.04),
+    ("Pearland", 29.5636, -95.2860, 0.07, 0.04),
+    ("Spring", 30.0799, -95.4172, 0.08, 0.04),
+    ("Cypress", 29.9691, -95.6972, 0.07, 0.04),
+    ("Pasadena", 29.6911, -95.2091, 0.06, 0.03),
+]
+STATE = "TX"
+BRANDS = ["Walmart", "HEB", "Kroger", "Target", "Costco", "Aldi", "Fiesta Mart", "Whole Foods"]
+
+
+def _points(n, rng):
+    weights = np.array([c[3] for c in CITIES])
+    city = rng.choice(len(CITIES), size=n, p=weights / weights.sum())
+    lat = np.array([c[1] for c in CITIES])[city] + rng.normal(0, 1, n) * np.array([c[4] for c in CITIES])[city]
+    lon = np.array([c[2] for c in CITIES])[city] + rng.normal(0, 1, n) * np.array([c[4] for c in CITIES])[city]
+    return city, lat, lon
+
+
+def make_listings(n, seed=0):
+    # Colunas do Houston_bronze.csv; preço cresce com quartos e cai com a distância do centro
+    rng = np.random.default_rng(seed)
+    city, lat, lon = _points(n, rng)
+    beds = rng.choice([0, 1, 2, 3, 4, 5], size=n, p=[0.05, 0.3, 0.3, 0.2, 0.1, 0.05]).astype(float)
+    center = np.hypot(lat - CITIES[0][1], lon - CITIES[0][2])
+    price = np.round(900 + 450 * beds - 800 * center + rng.gamma(2.0, 250, n), -1).clip(500)
+    ids = np.arange(n)
+    names = np.array([c[0] for c in CITIES])[city]
+    return pd.DataFrame({
+        "Lat": lat.round(6),
+        "Lon": lon.round(6),
+        "unit_price": price,
+        "unit_beds": beds,
+        "FullAddress": [f"{i % 9000 + 100} Synthetic St, {c}, {STATE}" for i, c in zip(ids, names)],
+        "Url_anuncio": [f"https://www.zillow.com/homedetails/{i}_zpid/" for i in ids],
+        "source_file": "synthetic.csv",
+        "City": names,
+        "State": STATE,
+    })
+
+
+def make_pois(n, seed=1, prefix="POI"):
+    rng = np.random.default_rng(seed)
+    _, lat, lon = _points(n, rng)
+    return pd.DataFrame({"lat": lat, "lon": lon, "name": [f"{prefix} {i}" for i in range(n)]})
+
+
+def make_overpass_elements(n, seed=2):
+    # Resposta "elements" do Overpass: nodes com lat/lon e ways com center, ~5% repetidos
+    rng = np.random.default_rng(seed)
+    _, lat, lon = _points(n, rng)
+    elements = []
+    for i in range(n):
+        kind = rng.random()
+        if kind < 0.5:
+            tags = {"shop": "supermarket", "name": BRANDS[i % len(BRANDS)]}
+        elif kind < 0.6:
+            tags = {"brand": BRANDS[i % len(BRANDS)]}
+        else:
+            tags = {"amenity": "school", "name": f"Synthetic {'Elementary' if i % 3 else 'College'} {i}"}
+        if i % 2:
+            elements.append({"type": "way", "id": i, "center": {"lat": lat[i], "lon": lon[i]}, "tags": tags})
+        else:
+            elements.append({"type": "node", "id": i, "lat": lat[i], "lon": lon[i], "tags": tags})
+    dupes = rng.choice(n, size=n // 20, replace=False) if n >= 20 else []
+    return elements + [elements[i] for i in dupes]
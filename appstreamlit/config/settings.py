@@ -1,13 +1,52 @@
 # config/settings.py
+import os
+
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/142.0.0.0 Safari/537.36",
     "Accept": "application/json, text/plain, */*",
     "Referer": "https://your-app.streamlit.app/"
 }
 
-CSV_PATH = "../dataset/bronze/Houston_bronze.csv"
+CSV_PATH = os.environ.get("CSV_PATH", "../dataset/bronze/Houston_bronze.csv")
 DEFAULT_CENTER = [30.069, -95.425]  # Spring, TX (centro real)
 BUFFER = 0.05
 
+# Caches de mapa (LRU por processo)
+MAP_CACHE_MAX_ENTRIES = 32
+MAP_CACHE_MAX_BYTES = 64 * 1024 * 1024
+POI_LAYER_CACHE_MAX_ENTRIES = 64
+PIPELINE_CACHE_MAX_ENTRIES = 64
+
+# Overpass (POIs ao redor dos imóveis); OVERPASS_SERVERS="url1,url2" no ambiente substitui (ex.: stub do teste de carga)
+OVERPASS_SERVERS = [s.strip() for s in os.environ["OVERPASS_SERVERS"].split(",")] if os.environ.get("OVERPASS_SERVERS") else [
+    "https://overpass.kumi.systems/api/interpreter",
+    "https://overpass-api.de/api/interpreter",
+    "https://lz4.overpass-api.de/api/interpreter"
+]
+POI_RADIUS_M = 5000
+
+# Camada gold (pré-calculada por jobs/build_gold.py)
+GOLD_PATH = os.environ.get("GOLD_PATH", "../dataset/gold/Houston_gold.parquet")
+GOLD_POIS_PATH = os.environ.get("GOLD_POIS_PATH", "../dataset/gold/Houston_pois.parquet")
+POI_FILE_CACHE_DIR = ".cache_osm"
+ENRICH_CHUNK_SIZE = 20000  # linhas por tarefa no enriquecimento paralelo
+PROFILE_LOG_PATH = None  # JSON lines do perfil por rerun (None = stderr)
+
+# Cache compartilhado entre réplicas do host (POIs do Overpass e enriquecimento):
+# "sqlite:///arquivo", "redis://host:6379/0" ou "memory" (só do processo)
+SHARED_CACHE_URL = os.environ.get("SHARED_CACHE_URL", "sqlite:///.cache_shared/cache.sqlite")
+SHARED_CACHE_MAX_BYTES = 512 * 1024 * 1024  # por namespace
+SHARED_CACHE_TTL = 6 * 3600
+
+# Rede (core/net.py): limite global de requisições simultâneas e por segundo (Overpass/Nominatim)
+NET_MAX_CONCURRENCY = 4
+NET_RATE_PER_SEC = 2.0
 
+# ETL raw -> bronze (jobs/raw_to_bronze.py)
+RAW_DIR = os.environ.get("RAW_DIR", "../dataset/raw")
+BRONZE_MANIFEST = "../dataset/bronze/_manifest.json"
+ETL_CHUNK_SIZE = 50_000
 
+# Rotas offline (core/routing.py): extrato OSM da região (.osm/.osm.gz/.osm.bz2); grafos compactos
+# (.npz) ficam ao lado do extrato. Sem o arquivo o gold mantém só distâncias em linha reta.
+ROAD_NETWORK_PATH = os.environ.get("ROAD_NETWORK_PATH", "../dataset/osm/houston.osm.bz2")
@@ -0,0 +1,76 @@
+# core/aggregates.py - agregados por Estado/Cidade (opções do sidebar e limites do slider) calculados na carga
+import numpy as np
+import pandas as pd
+
+QUANTILES = (0.1, 0.5, 0.9)
+EMPTY_AREA = {"count": 0, "beds": [], "price_min": 0, "price_max": 1, "price_q": {f"p{int(p * 100)}": 0.0 for p in QUANTILES}}
+
+
+def _area_stats(group):
+    prices = group["unit_price"].to_numpy(dtype=float)
+    q = np.quantile(prices, QUANTILES)
+    return {
+        "count": int(len(group)),
+        "beds": sorted(float(b) for b in group["unit_beds"].dropna().unique()),
+        "price_min": int(np.floor(prices.min())),
+        "price_max": int(np.ceil(prices.max())),
+        "price_q": {f"p{int(p * 100)}": float(v) for p, v in zip(QUANTILES, q)},
+    }
+
+
+def area_signatures(frame):
+    # Assinatura por área = (soma dos hashes de preço/quartos das linhas, contagem): independe da ordem e
+    # muda quando uma linha da área entra, sai ou muda (só essas colunas entram nos agregados)
+    h = pd.util.hash_pandas_object(frame[["unit_price", "unit_beds"]], index=False).to_numpy()
+    h = pd.Series((h & 0xFFFFFFFF).astype(np.int64), index=frame.index)
+    city = h.groupby([frame["State"], frame["_city"]]).agg(["sum", "count"])
+    state = h.groupby(frame["State"]).agg(["sum", "count"])
+    out = {key: (int(t), int(c)) for key, (t, c) in zip(city.index, city.to_numpy())}
+    out.update({(s, ""): (int(t), int(c)) for s, (t, c) in zip(state.index, state.to_numpy())})
+    return out
+
+
+class Aggregates:
+    # areas[(estado, cidade)] e areas[(estado, "")] (estado inteiro); o sidebar só faz lookup
+    def __init__(self, areas, signatures=None):
+        self.areas = areas
+        self.signatures = signatures or {}
+        self._index()
+
+    @classmethod
+    def from_frame(cls, df, previous=None):
+        # previous: agregados de uma carga anterior (não é alterado); áreas sem mudança são reaproveitadas
+        agg = cls(dict(previous.areas), dict(previous.signatures)) if previous is not None else cls({})
+        return agg.refresh(df)
+
+    def refresh(self, df):
+        # Incremental: recalcula só as áreas cuja assinatura mudou; áreas que sumiram dos dados saem
+        frame = df.assign(_city=df["City"].str.title())
+        signatures = area_signatures(frame)
+        changed = {k for k, v in signatures.items() if self.signatures.get(k) != v}
+        self.areas = {k: a for k, a in self.areas.items() if k in signatures}
+        states = {s for s, _ in changed}
+        for state, part in frame[frame["State"].isin(states)].groupby("State", sort=False):
+            if (state, "") in changed:
+                self.areas[state, ""] = _area_stats(part)
+            for city, group in part.groupby("_city", sort=False):
+                if (state, city) in changed:
+                    self.areas[state, city] = _area_stats(group)
+        self.signatures = signatures
+        self._index()
+        return self
+
+    def _index(self):
+        self.states = sorted({s for s, _ in self.areas})
+        cities = {}
+        for state, city in self.areas:
+            if city:
+                cities.setdefault(state, []).append(city)
+        self.cities = {s: sorted(c) for s, c in cities.items()}
+
+    def area(self, state, city=""):
+        return self.areas.get((state, city or "")) or self.areas.get((state, "")) or EMPTY_AREA
+
+    def to_frame(self):
+        rows = [{"State": s, "City": c, **{k: v for k, v in a.items() if k != "price_q"}, **a["price_q"]} for (s, c), a in self.areas.items()]
+        return pd.DataFrame(rows)
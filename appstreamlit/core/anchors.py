@@ -0,0 +1,68 @@
+# core/anchors.py - âncoras de deslocamento (trabalho, escola dos filhos...): distância de todos os imóveis
+import json
+import numpy as np
+from core.distance import haversine_np
+
+MAX_ANCHORS = 5
+ANCHOR_PREFIX = "dist_anchor_"
+ANCHOR_MAX = "dist_anchor_max"
+
+
+def normalize_anchors(points, max_km=None):
+    # Forma canônica (chave de cache/URL): até MAX_ANCHORS pontos arredondados; max_km None = sem limite
+    clean = []
+    for p in points or []:
+        try:
+            lat, lon = round(float(p["lat"]), 5), round(float(p["lon"]), 5)
+        except (KeyError, TypeError, ValueError):
+            continue
+        if -90 <= lat <= 90 and -180 <= lon <= 180:
+            name = str(p.get("name") or "").strip()[:40] or f"Âncora {len(clean) + 1}"
+            if any(c["name"] == name for c in clean):
+                name = f"{name} ({len(clean) + 1})"
+            clean.append({"name": name, "lat": lat, "lon": lon})
+    return {"points": clean[:MAX_ANCHORS], "max_km": float(max_km) if max_km else None}
+
+
+def anchor_columns(anchors):
+    return [f"{ANCHOR_PREFIX}{i + 1}" for i in range(len(anchors["points"]))]
+
+
+def add_anchor_distances(df, anchors):
+    # Uma passada: matriz imóveis x âncoras (broadcast), mais a pior distância; filtra por max_km
+    points = anchors["points"]
+    if not points:
+        return df
+    lat = df["Lat"].to_numpy(dtype=float)[:, None]
+    lon = df["Lon"].to_numpy(dtype=float)[:, None]
+    dist = haversine_np(lat, lon, np.array([p["lat"] for p in points])[None, :], np.array([p["lon"] for p in points])[None, :])
+    out = df.copy()
+    for col, values in zip(anchor_columns(anchors), dist.T):
+        out[col] = values
+    out[ANCHOR_MAX] = dist.max(axis=1)
+    if anchors["max_km"]:
+        out = out[out[ANCHOR_MAX] <= anchors["max_km"]].reset_index(drop=True)
+    return out
+
+
+def anchor_dicts(row, anchors):
+    # Formato de MapBuilder.add_home (igual a nearest_dicts): distância já calculada na coluna
+    return [{**p, "dist": row[col]} for p, col in zip(anchors["points"], anchor_columns(anchors))]
+
+
+def anchors_to_query(anchors):
+    params = {}
+    if anchors["points"]:
+        params["anc"] = json.dumps([[p["name"], p["lat"], p["lon"]] for p in anchors["points"]], separators=(",", ":"), ensure_ascii=False)
+    if anchors["max_km"]:
+        params["ankm"] = f"{anchors['max_km']:g}"
+    return params
+
+
+def anchors_from_query(params):
+    try:
+        points = [{"name": n, "lat": la, "lon": lo} for n, la, lo in json.loads(params.get("anc") or "[]")]
+        max_km = float(params["ankm"]) if params.get("ankm") else None
+    except (ValueError, TypeError):
+        return normalize_anchors([])
+    return normalize_anchors(points, max_km)
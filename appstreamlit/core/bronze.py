@@ -0,0 +1,146 @@
+# core/bronze.py - transformação raw (Zillow/ScrapFly) -> bronze, vetorizada e por blocos
+import ast
+import json
+import numpy as np
+import pandas as pd
+
+BRONZE_COLUMNS = ["Lat", "Lon", "unit_price", "unit_beds", "FullAddress", "Url_anuncio", "source_file", "City", "State"]
+BRONZE_DTYPES = {
+    "Lat": "float64", "Lon": "float64", "unit_price": "float64", "unit_beds": "float64",
+    "FullAddress": "string", "Url_anuncio": "string", "source_file": "string", "City": "string", "State": "string",
+}
+# Nomes aceitos no raw para cada campo (primeiro que existir no arquivo)
+ALIASES = {
+    "lat": ["Lat", "latitude", "latLong.latitude", "lat"],
+    "lon": ["Lon", "longitude", "latLong.longitude", "lon", "lng"],
+    "price": ["unit_price", "unformattedPrice", "price"],
+    "beds": ["unit_beds", "beds", "bedrooms"],
+    "address": ["FullAddress", "address"],
+    "street": ["addressStreet", "streetAddress"],
+    "city": ["City", "addressCity", "city"],
+    "state": ["State", "addressState", "state"],
+    "zip": ["addressZipcode", "zipcode"],
+    "url": ["Url_anuncio", "detailUrl", "url"],
+    "units": ["units"],
+}
+ZILLOW = "https://www.zillow.com"
+DEDUPE_KEY = ["FullAddress", "unit_beds", "unit_price", "Url_anuncio"]
+
+
+def _pick(chunk, field):
+    for name in ALIASES[field]:
+        if name in chunk:
+            return chunk[name]
+    return pd.Series(pd.NA, index=chunk.index, dtype="object")
+
+
+def parse_money(values):
+    # "$1,250+/mo" -> 1250.0; vazio/texto -> NaN
+    text = values.astype("string").str.replace(r"[^\d.]", "", regex=True)
+    return pd.to_numeric(text.replace("", pd.NA), errors="coerce").astype("float64")
+
+
+def parse_beds(values):
+    text = values.astype("string").str.strip().str.lower()
+    beds = pd.to_numeric(text.str.extract(r"(\d+(?:\.\d+)?)", expand=False), errors="coerce")
+    return beds.mask(text.str.startswith("studio", na=False), 0.0).astype("float64")
+
+
+def _literal(raw):
+    # Campo aninhado do raw: JSON ou repr Python (ScrapFly grava os dois); None se não der
+    if not isinstance(raw, str) or not raw.strip()[:1] in ("[", "{"):
+        return None
+    try:
+        return json.loads(raw)
+    except ValueError:
+        try:
+            return ast.literal_eval(raw)
+        except (ValueError, SyntaxError):
+            return None
+
+
+def _parse_units(raw):
+    units = _literal(raw)
+    return units if isinstance(units, list) else []
+
+
+def expand_units(frame, units):
+    # Prédios com várias plantas viram uma linha por unidade (preço/quartos da unidade)
+    parsed = units.map(_parse_units)
+    has = parsed.map(len) > 0
+    if not has.any():
+        return frame
+    exploded = parsed[has].explode()
+    details = pd.DataFrame([u if isinstance(u, dict) else {} for u in exploded], index=exploded.index)
+    expanded = frame.loc[exploded.index].copy()
+    if "price" in details:
+        expanded["unit_price"] = parse_money(details["price"]).values
+    if "beds" in details:
+        expanded["unit_beds"] = parse_beds(details["beds"]).values
+    return pd.concat([frame[~has], expanded])
+
+
+def normalize_chunk(chunk, source_file):
+    # Bloco raw -> bloco bronze tipado (sem deduplicar entre blocos)
+    if "latLong" in chunk and "latitude" not in chunk:
+        coords = chunk["latLong"].map(lambda v: _literal(v) or {})
+        chunk = chunk.assign(**{"latLong.latitude": coords.map(lambda c: c.get("latitude")), "latLong.longitude": coords.map(lambda c: c.get("longitude"))})
+    street, city, state, zipcode = (_pick(chunk, f).astype("string").str.strip() for f in ("street", "city", "state", "zip"))
+    city, state = city.str.title(), state.str.upper()
+    address = _pick(chunk, "address").astype("string").str.strip()
+    built = (street + ", " + city + ", " + state + " " + zipcode.fillna("")).str.strip()
+    url = _pick(chunk, "url").astype("string").str.strip()
+    out = pd.DataFrame({
+        "Lat": pd.to_numeric(_pick(chunk, "lat"), errors="coerce"),
+        "Lon": pd.to_numeric(_pick(chunk, "lon"), errors="coerce"),
+        "unit_price": parse_money(_pick(chunk, "price")),
+        "unit_beds": parse_beds(_pick(chunk, "beds")),
+        "FullAddress": address.fillna(built).str.replace(r"\s+", " ", regex=True),
+        "Url_anuncio": url.mask(url.str.startswith("/", na=False), ZILLOW + url),
+        "source_file": source_file,
+        "City": city,
+        "State": state,
+    }, index=chunk.index)
+    out = expand_units(out, _pick(chunk, "units"))
+    out = out.dropna(subset=["Lat", "Lon", "unit_price", "City", "State"])
+    valid = out["Lat"].between(-90, 90) & out["Lon"].between(-180, 180) & (out["unit_price"] > 0)
+    return out[valid].astype(BRONZE_DTYPES).reset_index(drop=True)[BRONZE_COLUMNS]
+
+
+def _norm(values):
+    return values.astype("string").str.lower().str.replace(r"[^a-z0-9]", "", regex=True).fillna("")
+
+
+def row_keys(df):
+    # Hash 64 bits da unidade: endereço normalizado (inclui o nº do apto) + quartos + preço + URL.
+    # Plantas diferentes no mesmo endereço/quartos ficam separadas; só a mesma linha repetida é substituída
+    key = pd.DataFrame({
+        "address": _norm(df["FullAddress"]),
+        "beds": df["unit_beds"].astype("float64"),
+        "price": df["unit_price"].astype("float64"),
+        "url": _norm(df["Url_anuncio"]),
+    })
+    return pd.util.hash_pandas_object(key, index=False).to_numpy(np.uint64)
+
+
+def merge_bronze(existing, new):
+    # new substitui existing na mesma chave; dentro de new, a última ocorrência vence
+    new_keys = row_keys(new)
+    keep_new = ~pd.Series(new_keys).duplicated(keep="last").to_numpy()
+    new = new[keep_new]
+    if existing is None or existing.empty:
+        return new.reset_index(drop=True)
+    old = existing[~np.isin(row_keys(existing), new_keys[keep_new])]
+    return pd.concat([old, new], ignore_index=True)
+
+
+def read_bronze(path):
+    # Bronze existente (inclusive legado, com colunas extras/sujas) no formato tipado
+    df = pd.read_csv(path, usecols=lambda c: c in BRONZE_COLUMNS, dtype="string")
+    for col in ("Lat", "Lon", "unit_price", "unit_beds"):
+        df[col] = pd.to_numeric(df[col], errors="coerce") if col in df else np.nan
+    for col in BRONZE_COLUMNS:
+        if col not in df:
+            df[col] = pd.NA
+    df = df.dropna(subset=["Lat", "Lon", "unit_price", "City", "State"])
+    return df.astype(BRONZE_DTYPES).reset_index(drop=True)[BRONZE_COLUMNS]
@@ -0,0 +1,290 @@
+# core/cache.py - caches plugáveis (LRU em memória com limite de entradas/bytes/TTL) + hash de conteúdo
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import weakref
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+
+# Backends de cache expõem get(key, default) / set(key, value, size=0) / stats() / clear():
+#   LRUCache (memória do processo), SQLiteCache (arquivo compartilhado entre réplicas do host),
+#   RedisCache (externo, opcional). open_backend(url, namespace, ...) escolhe pelo esquema da URL.
+
+
+def frame_hash(df):
+    # Hash de conteúdo estável de um DataFrame (independe do índice)
+    if df is None or df.empty:
+        return "empty"
+    h = hashlib.sha1(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    h.update(",".join(map(str, df.columns)).encode())
+    return h.hexdigest()[:16]
+
+
+_hash_memo = {}
+
+
+def content_hash(value):
+    # Hash estável do conteúdo; DataFrames/arrays grandes são memorizados por objeto (tratados como imutáveis)
+    if isinstance(value, (pd.DataFrame, np.ndarray)):
+        memo = _hash_memo.get(id(value))
+        if memo is not None and memo[0]() is value:
+            return memo[1]
+        if isinstance(value, pd.DataFrame):
+            h = frame_hash(value)
+        else:
+            h = hashlib.sha1(np.ascontiguousarray(value).tobytes() + str(value.dtype).encode()).hexdigest()[:16]
+        try:
+            _hash_memo[id(value)] = (weakref.ref(value, lambda _, i=id(value): _hash_memo.pop(i, None)), h)
+        except TypeError:
+            pass
+        return h
+    if isinstance(value, (tuple, list)):
+        return hashlib.sha1("|".join(content_hash(v) for v in value).encode()).hexdigest()[:16]
+    raw = json.dumps(value, sort_keys=True, default=repr)
+    return hashlib.sha1(raw.encode()).hexdigest()[:16]
+
+
+class LRUCache:
+    def __init__(self, max_entries=32, max_bytes=None, ttl=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = self.misses = self.evictions = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[2] is not None and entry[2] < time.time():
+                # Expirado (TTL): remove e conta como miss
+                self.bytes -= self._data.pop(key)[1]
+                entry = None
+            if entry is not None:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+            return default
+
+    def set(self, key, value, size=0):
+        with self._lock:
+            if key in self._data:
+                self.bytes -= self._data.pop(key)[1]
+            self._data[key] = (value, size, time.time() + self.ttl if self.ttl else None)
+            self.bytes += size
+            while self._data and (
+                len(self._data) > self.max_entries
+                or (self.max_bytes is not None and self.bytes > self.max_bytes and len(self._data) > 1)
+            ):
+                _, (_, old_size, _) = self._data.popitem(last=False)
+                self.bytes -= old_size
+                self.evictions += 1
+        return value
+
+    def get_or_set(self, key, fn, sizeof=None):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = fn()
+            self.set(key, value, sizeof(value) if sizeof else 0)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.bytes = 0
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+class SQLiteCache:
+    # Cache em arquivo SQLite (WAL) compartilhado entre processos; valores em pickle.
+    # Cada instância é um namespace com TTL e limites próprios; LRU pela coluna "used".
+    def __init__(self, path, namespace="default", max_entries=10_000, max_bytes=None, ttl=None):
+        self.path = path
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._local = threading.local()
+        self.hits = self.misses = self.evictions = 0
+
+    def _conn(self):
+        # Uma conexão por thread (sqlite3 não compartilha conexões entre threads)
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache (ns TEXT, key TEXT, value BLOB, size INTEGER,"
+                " expires REAL, used REAL, PRIMARY KEY (ns, key))"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS cache_used ON cache (ns, used)")
+            self._local.conn = conn
+        return conn
+
+    def __len__(self):
+        return self._conn().execute("SELECT COUNT(*) FROM cache WHERE ns = ?", (self.namespace,)).fetchone()[0]
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+
+    def get(self, key, default=None):
+        conn, now = self._conn(), time.time()
+        row = conn.execute("SELECT value, expires FROM cache WHERE ns = ? AND key = ?", (self.namespace, str(key))).fetchone()
+        if row is not None and row[1] is not None and row[1] < now:
+            conn.execute("DELETE FROM cache WHERE ns = ? AND key = ?", (self.namespace, str(key)))
+            row = None
+        if row is None:
+            self.misses += 1
+            return default
+        conn.execute("UPDATE cache SET used = ? WHERE ns = ? AND key = ?", (now, self.namespace, str(key)))
+        self.hits += 1
+        return pickle.loads(row[0])
+
+    def set(self, key, value, size=0):
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        conn, now = self._conn(), time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?, ?, ?)",
+                (self.namespace, str(key), blob, len(blob), now + self.ttl if self.ttl else None, now),
+            )
+            self._evict(conn, now)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return value
+
+    def _evict(self, conn, now):
+        # Expirados primeiro; depois os menos usados até caber em entradas/bytes
+        ns = self.namespace
+        self.evictions += conn.execute("DELETE FROM cache WHERE ns = ? AND expires < ?", (ns, now)).rowcount
+        count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache WHERE ns = ?", (ns,)).fetchone()
+        if count <= self.max_entries and (self.max_bytes is None or total <= self.max_bytes):
+            return
+        rows = conn.execute("SELECT key, size FROM cache WHERE ns = ? ORDER BY used", (ns,)).fetchall()
+        drop = []
+        for key, size in rows[:-1]:
+            if count <= self.max_entries and (self.max_bytes is None or total <= self.max_bytes):
+                break
+            drop.append((ns, key))
+            count, total = count - 1, total - size
+        conn.executemany("DELETE FROM cache WHERE ns = ? AND key = ?", drop)
+        self.evictions += len(drop)
+
+    def get_or_set(self, key, fn, sizeof=None):
+        return _get_or_set(self, key, fn)
+
+    def clear(self):
+        self._conn().execute("DELETE FROM cache WHERE ns = ?", (self.namespace,))
+
+    def stats(self):
+        # entries/bytes são do arquivo (todas as réplicas); hits/misses são deste processo
+        count, total = self._conn().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache WHERE ns = ?", (self.namespace,)
+        ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "entries": count,
+            "bytes": total,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+class RedisCache:
+    # Backend externo opcional (pip install redis); eviction por maxmemory-policy do servidor
+    def __init__(self, url, namespace="default", ttl=None):
+        try:
+            import redis
+        except ImportError as e:
+            raise ImportError("RedisCache requer o pacote 'redis' (pip install redis)") from e
+        self.client = redis.Redis.from_url(url)
+        self.namespace = namespace
+        self.ttl = ttl
+        self.hits = self.misses = 0
+
+    def get(self, key, default=None):
+        blob = self.client.get(f"{self.namespace}:{key}")
+        if blob is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return pickle.loads(blob)
+
+    def set(self, key, value, size=0):
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        self.client.set(f"{self.namespace}:{key}", blob, ex=int(self.ttl) if self.ttl else None)
+        return value
+
+    def get_or_set(self, key, fn, sizeof=None):
+        return _get_or_set(self, key, fn)
+
+    def clear(self):
+        for key in self.client.scan_iter(f"{self.namespace}:*"):
+            self.client.delete(key)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / lookups if lookups else 0.0}
+
+
+def open_backend(url, namespace, max_entries=10_000, max_bytes=None, ttl=None):
+    # "sqlite:///caminho.sqlite" | "redis://host:6379/0" | None/"memory" (LRU só do processo)
+    if url and url.startswith("sqlite:///"):
+        return SQLiteCache(url[len("sqlite:///"):], namespace, max_entries, max_bytes, ttl)
+    if url and url.startswith(("redis://", "rediss://")):
+        return RedisCache(url, namespace, ttl)
+    return LRUCache(max_entries, max_bytes, ttl)
+
+
+_MISSING = object()
+
+
+def memoize(backend, namespace, keep=None):
+    # Decorator: resultado em qualquer backend (get/set), chave = hash do conteúdo dos argumentos.
+    # keep(valor) -> False não grava (ex.: resposta vazia de uma falha de rede)
+    def deco(fn):
+        def wrapper(*args, **kwargs):
+            key = f"{namespace}:{content_hash([list(args), sorted(kwargs.items())])}"
+            return _get_or_set(backend, key, lambda: fn(*args, **kwargs), keep)
+        wrapper.__wrapped__ = fn
+        return wrapper
+    return deco
+
+
+def _get_or_set(backend, key, fn, keep=None):
+    value = backend.get(key, _MISSING)
+    if value is _MISSING:
+        value = fn()
+        if keep is None or keep(value):
+            backend.set(key, value)
+    return value
@@ -0,0 +1,91 @@
+# core/clustering.py - índice hierárquico de clusters (estilo supercluster)
+import math
+import numpy as np
+import pandas as pd
+
+MIN_ZOOM = 3
+MAX_ZOOM = 16
+RADIUS_PX = 60
+TILE_PX = 256
+
+
+def project(lat, lon):
+    # Web Mercator normalizado em [0, 1] (mesma projeção dos tiles do Leaflet)
+    lat = np.clip(np.asarray(lat, dtype=float), -85.05112878, 85.05112878)
+    x = np.asarray(lon, dtype=float) / 360.0 + 0.5
+    s = np.sin(np.radians(lat))
+    y = 0.5 - 0.25 * np.log((1 + s) / (1 - s)) / math.pi
+    return x, y
+
+
+def unproject(x, y):
+    lon = (np.asarray(x) - 0.5) * 360.0
+    lat = np.degrees(2 * np.arctan(np.exp((0.5 - np.asarray(y)) * 2 * math.pi)) - math.pi / 2)
+    return lat, lon
+
+
+def bounds_from_state(map_state):
+    # Converte o retorno do st_folium em (south, west, north, east)
+    b = (map_state or {}).get("bounds") or {}
+    sw, ne = b.get("_southWest") or {}, b.get("_northEast") or {}
+    if sw.get("lat") is None or ne.get("lat") is None:
+        return None
+    return (float(sw["lat"]), float(sw["lng"]), float(ne["lat"]), float(ne["lng"]))
+
+
+class ClusterIndex:
+    """Clusters pré-calculados por zoom: cada nível agrega os clusters do nível acima em uma grade."""
+
+    def __init__(self, lat, lon, values=None, radius=RADIUS_PX, min_zoom=MIN_ZOOM, max_zoom=MAX_ZOOM):
+        self.min_zoom, self.max_zoom = min_zoom, max_zoom
+        x, y = project(lat, lon)
+        n = len(x)
+        vals = np.zeros(n) if values is None else np.asarray(values, dtype=float)
+
+        # Nível folha (max_zoom + 1): um "cluster" por ponto
+        level = {"x": x, "y": y, "count": np.ones(n, dtype=np.int64), "sum": vals, "point": np.arange(n)}
+        self.levels = {}
+        for z in range(max_zoom, min_zoom - 1, -1):
+            level = self._cluster(level, radius / (TILE_PX * 2 ** z))
+            order = np.argsort(level["x"], kind="stable")
+            self.levels[z] = {k: v[order] for k, v in level.items()}
+            level = self.levels[z]
+
+    @staticmethod
+    def _cluster(level, cell):
+        if len(level["x"]) == 0:
+            return level
+        cx = np.floor(level["x"] / cell).astype(np.int64)
+        cy = np.floor(level["y"] / cell).astype(np.int64)
+        keys = cx * (2 ** 31) + cy
+        _, inv = np.unique(keys, return_inverse=True)
+        count = np.bincount(inv, weights=level["count"]).astype(np.int64)
+        # Centroide ponderado pela quantidade de pontos de cada filho
+        x = np.bincount(inv, weights=level["x"] * level["count"]) / count
+        y = np.bincount(inv, weights=level["y"] * level["count"]) / count
+        total = np.bincount(inv, weights=level["sum"])
+        point = np.full(len(count), -1, dtype=np.int64)
+        point[inv] = level["point"]
+        point[count > 1] = -1
+        return {"x": x, "y": y, "count": count, "sum": total, "point": point}
+
+    def get_clusters(self, bounds, zoom):
+        # Retorna só os clusters dentro do viewport; 'point' >= 0 indica ponto isolado (índice original)
+        z = int(min(max(round(zoom or self.min_zoom), self.min_zoom), self.max_zoom))
+        lvl = self.levels.get(z)
+        if lvl is None or len(lvl["x"]) == 0:
+            return pd.DataFrame(columns=["lat", "lon", "count", "mean", "point"])
+        s, w, n, e = bounds
+        x0, y1 = project(s, w)
+        x1, y0 = project(n, e)
+        sl = slice(np.searchsorted(lvl["x"], x0, side="left"), np.searchsorted(lvl["x"], x1, side="right"))
+        mask = (lvl["y"][sl] >= y0) & (lvl["y"][sl] <= y1)
+        lat, lon = unproject(lvl["x"][sl][mask], lvl["y"][sl][mask])
+        count = lvl["count"][sl][mask]
+        return pd.DataFrame({
+            "lat": lat,
+            "lon": lon,
+            "count": count,
+            "mean": lvl["sum"][sl][mask] / count,
+            "point": lvl["point"][sl][mask],
+        })
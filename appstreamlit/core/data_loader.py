@@ -1,10 +1,9 @@
 import pandas as pd
-import streamlit as st
 from config.settings import CSV_PATH
 
-@st.cache_data(ttl=86400)
-def load_properties():
-    df = pd.read_csv(CSV_PATH)
-    df = df.dropna(subset=["Lat", "Lon", "unit_price", "City"])
+def load_properties(path=CSV_PATH):
+    # Sem cache aqui: quem chama decide (st.cache_resource no app, memoize/arquivo em jobs)
+    df = pd.read_csv(path)
+    df = df.dropna(subset=["Lat", "Lon", "unit_price", "City", "State"])
     df["unit_price"] = pd.to_numeric(df["unit_price"], errors="coerce")
-    return df.dropna(subset=["unit_price"])
\ No newline at end of file
+    return df.dropna(subset=["unit_price"]).reset_index(drop=True)
@@ -0,0 +1,120 @@
+# core/dedupe.py - prédios e quase-duplicatas por grade de hash de coordenadas (só vizinhos de célula)
+import numpy as np
+import pandas as pd
+
+BUILDING_M = 15       # unidades a até 15 m (encadeadas) = mesmo prédio
+PRICE_TOL = 0.05      # mesmo prédio + quartos + endereço/unidade (ou URL) + preço até 5% acima da âncora = relistagem
+M_PER_DEG_LAT = 110_540.0
+M_PER_DEG_LON = 111_320.0
+
+
+def _cell_keys(cx, cy):
+    return (cx.astype(np.int64) << 32) + (cy.astype(np.int64) & 0xFFFFFFFF)
+
+
+def neighbor_pairs(lat, lon, radius_m=BUILDING_M):
+    # Pares (i, j), i < j, a até radius_m: cada ponto vai numa célula de lado radius_m e só
+    # compara com as 9 células vizinhas (O(n) esperado; sem matriz n x n)
+    lat, lon = np.asarray(lat, dtype=float), np.asarray(lon, dtype=float)
+    if len(lat) < 2:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    x = lon * M_PER_DEG_LON * np.cos(np.radians(np.nanmean(lat)))
+    y = lat * M_PER_DEG_LAT
+    cx, cy = np.floor(x / radius_m).astype(np.int64), np.floor(y / radius_m).astype(np.int64)
+    keys = _cell_keys(cx, cy)
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+    pi, pj = [], []
+    for dx in (-1, 0, 1):
+        for dy in (-1, 0, 1):
+            target = _cell_keys(cx + dx, cy + dy)
+            lo = np.searchsorted(sorted_keys, target, side="left")
+            hi = np.searchsorted(sorted_keys, target, side="right")
+            counts = hi - lo
+            if not counts.any():
+                continue
+            i = np.repeat(np.arange(len(lat)), counts)
+            j = order[np.repeat(lo - np.cumsum(np.r_[0, counts[:-1]]), counts) + np.arange(counts.sum())]
+            keep = (i < j) & (np.hypot(x[i] - x[j], y[i] - y[j]) <= radius_m)
+            pi.append(i[keep])
+            pj.append(j[keep])
+    return np.concatenate(pi), np.concatenate(pj)
+
+
+def components(n, i, j):
+    # Componentes conexos (rótulo = menor índice do grupo): propagação de mínimo + salto de ponteiro
+    labels = np.arange(n)
+    while len(i):
+        before = labels.copy()
+        low = np.minimum(labels[i], labels[j])
+        np.minimum.at(labels, i, low)
+        np.minimum.at(labels, j, low)
+        labels = labels[labels]
+        if np.array_equal(labels, before):
+            break
+    return labels
+
+
+def group_listings(df, radius_m=BUILDING_M, price_tol=PRICE_TOL):
+    # Adiciona listing_id, building_id, building_size e dup_of (-1 ou listing_id da versão mantida)
+    out = df.reset_index(drop=True).copy()
+    n = len(out)
+    out["listing_id"] = np.arange(n)
+    i, j = neighbor_pairs(out["Lat"].values, out["Lon"].values, radius_m)
+    building = components(n, i, j)
+    out["building_id"] = building
+    out["building_size"] = np.bincount(building, minlength=n)[building] if n else 0
+
+    # Quase-duplicata: mesmo prédio e quartos, mesmo endereço normalizado (com a unidade) ou mesma URL,
+    # e preço até price_tol acima da âncora do grupo (a mais barata); sem encadear pelo vizinho anterior
+    beds = out["unit_beds"].fillna(-1).to_numpy(dtype=float)
+    price = out["unit_price"].to_numpy(dtype=float)
+    dup_of = np.full(n, -1, dtype=np.int64)
+    for identity in ("FullAddress", "Url_anuncio"):
+        if identity not in out or not n:
+            continue
+        key = out[identity].fillna("").astype(str).str.lower().str.replace(r"[^0-9a-z]+", " ", regex=True).str.strip()
+        code = pd.factorize(key)[0]
+        anchor = _anchor_of(building, beds, code, price)
+        found = (anchor != np.arange(n)) & (price <= price[anchor] * (1 + price_tol)) & (key != "").to_numpy()
+        new = found & (dup_of < 0)
+        dup_of[new] = anchor[new]
+    out["dup_of"] = dup_of
+    return out
+
+
+def _group_order(building, beds, code, price):
+    return np.lexsort((np.arange(len(price)), price, code, beds, building))
+
+
+def _anchor_of(building, beds, code, price):
+    # Âncora de cada linha = primeira (mais barata) do grupo (prédio, quartos, identidade)
+    order = _group_order(building, beds, code, price)
+    b, bd, c = building[order], beds[order], code[order]
+    start = np.r_[True, (b[1:] != b[:-1]) | (bd[1:] != bd[:-1]) | (c[1:] != c[:-1])]
+    first = order[np.maximum.accumulate(np.where(start, np.arange(len(order)), 0))]
+    anchor = np.empty(len(order), dtype=np.int64)
+    anchor[order] = first
+    return anchor
+
+
+def collapse_mask(matches):
+    # True = linha exibida: relistagens só somem se a versão âncora também passou no filtro
+    if "dup_of" not in matches or matches.empty:
+        return np.ones(len(matches), dtype=bool)
+    dup_of = matches["dup_of"].to_numpy()
+    return (dup_of < 0) | ~np.isin(dup_of, matches["listing_id"].to_numpy())
+
+
+def drop_near_duplicates(matches):
+    # Visão agrupada (UI): remove relistagens cuja âncora está presente
+    if "dup_of" not in matches or matches.empty:
+        return matches
+    return matches[collapse_mask(matches)].reset_index(drop=True)
+
+
+def buildings(page):
+    # Agrupa uma página de imóveis por prédio: [(linhas do prédio ordenadas por preço)]
+    if "building_id" not in page:
+        return [page.iloc[[k]] for k in range(len(page))]
+    return [g.sort_values("unit_price") for _, g in page.groupby("building_id", sort=False)]
@@ -1,4 +1,6 @@
 import math
+import numpy as np
+
 def haversine(lat1, lon1, lat2, lon2):
     R = 6371
     a = math.sin(math.radians(lat2 - lat1) / 2)**2 + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(math.radians(lon2 - lon1) / 2)**2
@@ -8,4 +10,80 @@ def nearest_poi(df, lat, lon, name):
     if df.empty:
         return {"name": f"Sem {name}", "lat": lat, "lon": lon, "dist": 0}
     row = min(df.iterrows(), key=lambda x: haversine(lat, lon, x[1]["lat"], x[1]["lon"]))[1]
-    return {"name": row["name"], "lat": row["lat"], "lon": row["lon"], "dist": haversine(lat, lon, row["lat"], row["lon"])}
\ No newline at end of file
+    return {"name": row["name"], "lat": row["lat"], "lon": row["lon"], "dist": haversine(lat, lon, row["lat"], row["lon"])}
+
+R_KM = 6371
+
+def haversine_np(lat1, lon1, lat2, lon2):
+    # Versão vetorizada (broadcast do NumPy) da haversine acima
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * R_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+NEAREST_MODES = ("exact", "two_phase")
+
+
+def approx_error_bound(lat, dist_km):
+    # Erro relativo máximo da equirretangular (dlon * cos da latitude da casa) frente à haversine para
+    # pares a até dist_km: |equi/hav - 1| <= tan(|lat| + d/R) * (d/R) / 2 + (d/R)^2  (inf perto dos polos).
+    # Ex.: 30°N e 5 km -> 2.3e-4; 30°N e 25 km -> 1.2e-3; 60°N e 25 km -> 3.5e-3.
+    dp = np.asarray(dist_km, dtype=float) / R_KM
+    phi = np.radians(np.abs(np.asarray(lat, dtype=float))) + dp
+    return np.where(phi < np.radians(89), np.tan(np.minimum(phi, np.radians(89))) * dp / 2 + dp ** 2, np.inf)
+
+
+def nearest_many(lat, lon, poi_lat, poi_lon, chunk=2048, mode="exact"):
+    # POI mais próximo para cada casa: matriz casas x POIs em blocos (memória limitada).
+    # mode="exact": haversine em todos os pares. mode="two_phase": equirretangular (sem trigonometria
+    # por par) separa os candidatos e a haversine roda só neles; mesmo resultado do exato (ver _two_phase).
+    if mode not in NEAREST_MODES:
+        raise ValueError(f"mode deve ser um de {NEAREST_MODES}")
+    lat, lon = np.asarray(lat, dtype=float), np.asarray(lon, dtype=float)
+    poi_lat, poi_lon = np.asarray(poi_lat, dtype=float), np.asarray(poi_lon, dtype=float)
+    idx = np.zeros(len(lat), dtype=np.int64)
+    dist = np.full(len(lat), np.inf)
+    if len(poi_lat) == 0:
+        return idx, dist
+    step = max(1, chunk * 256 // len(poi_lat))
+    # Longitudes cruzando o antimeridiano: diferença precisa ser reduzida a [-180, 180)
+    wrap = len(lat) and max(lon.max(), poi_lon.max()) - min(lon.min(), poi_lon.min()) > 180
+    for i in range(0, len(lat), step):
+        if mode == "two_phase":
+            idx[i:i + step], dist[i:i + step] = _two_phase(lat[i:i + step], lon[i:i + step], poi_lat, poi_lon, wrap)
+            continue
+        d = haversine_np(lat[i:i + step, None], lon[i:i + step, None], poi_lat[None, :], poi_lon[None, :])
+        idx[i:i + step] = d.argmin(axis=1)
+        dist[i:i + step] = d[np.arange(len(d)), idx[i:i + step]]
+    return idx, dist
+
+
+def _two_phase(lat, lon, poi_lat, poi_lon, wrap=False):
+    # Fase 1: a = distância equirretangular, a_min = menor por casa. Com e = approx_error_bound, o POI
+    # realmente mais próximo tem a <= a_min * (1 + e) / (1 - e): só esses pares (quase sempre 1) vão para
+    # a fase 2, haversine exata. Sem aproximação no resultado: o limite garante que o vencedor está lá.
+    # Perto dos polos (e = inf) todos os POIs viram candidatos: continua exato, só mais caro.
+    dlon = poi_lon[None, :] - lon[:, None]
+    if wrap:
+        dlon = (dlon + 180) % 360 - 180
+    dlon *= np.cos(np.radians(lat))[:, None]
+    d2 = poi_lat[None, :] - lat[:, None]
+    d2 *= d2
+    d2 += dlon * dlon
+    a_min = R_KM * np.radians(np.sqrt(d2.min(axis=1)))
+    # Distância real do candidato de a_min <= a_min / (1 - e(a_min)) (e cresce com d: itera uma vez)
+    # e = inf (perto dos polos) vira limite inf direto: com a_min = 0 (casa em cima do POI) 0 * inf = NaN
+    # não deixaria nenhum candidato
+    e0 = approx_error_bound(lat, a_min)
+    with np.errstate(invalid="ignore"):
+        e = np.where(np.isinf(e0), np.inf, approx_error_bound(lat, a_min * (1 + 2 * e0)))
+        limit = np.where(np.isinf(e), np.inf, np.degrees(a_min * (1 + e) / np.maximum(1 - e, 1e-12) / R_KM))
+    rows, cols = np.nonzero(d2 <= (limit * limit * (1 + 1e-12))[:, None])
+    exact = haversine_np(lat[rows], lon[rows], poi_lat[cols], poi_lon[cols])
+    # Menor haversine por casa entre os candidatos
+    order = np.lexsort((exact, rows))
+    rows, cols, exact = rows[order], cols[order], exact[order]
+    head = np.r_[True, rows[1:] != rows[:-1]]
+    idx = np.zeros(len(lat), dtype=np.int64)
+    dist = np.full(len(lat), np.inf)
+    idx[rows[head]], dist[rows[head]] = cols[head], exact[head]
+    return idx, dist
@@ -0,0 +1,55 @@
+# core/engine.py - pipeline padrão (filtra -> POIs -> enriquece -> alcance -> âncoras -> ranking -> Pareto), sem Streamlit
+import numpy as np
+from core.anchors import add_anchor_distances, normalize_anchors
+from core.cache import LRUCache, memoize
+from core.clustering import ClusterIndex
+from core.dedupe import drop_near_duplicates, group_listings
+from core.enrichment import enrich
+from core.filters import apply_filters
+from core.gold import has_enrichment
+from core.hexbin import HexGrid
+from core.pipeline import Pipeline
+from core.pois import area_pois
+from core.reachability import reach_filter
+from core.ranking import RankingEngine
+from core.skyline import skyline
+
+
+def _enrich_stage(matches, pois):
+    return matches if has_enrichment(matches) else enrich(matches, *pois)
+
+
+def _shown_stage(commute, collapse):
+    return drop_near_duplicates(commute) if collapse else commute
+
+
+def build_pipeline(backend=None, pois_fn=area_pois, shared=None):
+    # pois_fn(listings, state, city) -> (supermercados, escolas); o app passa uma versão com TTL.
+    # shared: backend entre réplicas (ex.: SQLiteCache) para o enriquecimento, o estágio mais caro.
+    pipe = Pipeline(backend if backend is not None else LRUCache(max_entries=64))
+    enrich_fn = memoize(shared, "enriched")(_enrich_stage) if shared is not None else _enrich_stage
+    # Prédios/relistagens uma vez por base
+    pipe.stage("grouped", ["listings"])(group_listings)
+    # Relistagens só marcadas (dup_of); quem agrupa é a UI
+    pipe.stage("matches", ["grouped", "filters"])(apply_filters)
+    # Rede: roda sempre (cache fica a cargo de pois_fn) e a chave vem do conteúdo retornado
+    pipe.stage("pois", ["listings", "state", "city"], cache=False)(pois_fn)
+    # Linhas da camada gold já trazem POI mais próximo: enriquecimento vira no-op
+    pipe.stage("enriched", ["matches", "pois"])(enrich_fn)
+    # Alcance (isócronas): colunas do gold ou faixas de distância sobre o enriquecido
+    pipe.stage("reachable", ["enriched", "filters"])(reach_filter)
+    # Âncoras fora do enriquecimento: mudar o trabalho não refaz POIs, só a matriz imóveis x âncoras
+    pipe.stage("commute", ["reachable", "anchors"])(add_anchor_distances)
+    pipe.stage("ranking", ["commute"])(RankingEngine)
+    pipe.stage("deals", ["ranking"])(lambda r: np.flatnonzero(skyline(r.df)))
+    # Visão do mapa: relistagens agrupadas conforme o toggle da UI (clusters e hexágonos contam o que aparece)
+    pipe.stage("shown", ["commute", "collapse"])(_shown_stage)
+    pipe.stage("hexgrid", ["shown"])(lambda m: HexGrid(m["Lat"].values, m["Lon"].values, m["unit_price"].values, m["unit_beds"].values))
+    pipe.stage("home_clusters", ["shown"])(lambda m: ClusterIndex(m["Lat"].values, m["Lon"].values, m["unit_price"].values))
+    pipe.stage("poi_clusters", ["pois"])(lambda pois: tuple(ClusterIndex(p["lat"].values, p["lon"].values) for p in pois))
+    return pipe
+
+
+def pipeline_inputs(listings, filters, anchors=None, collapse=True):
+    anchors = anchors if anchors is not None else normalize_anchors([])
+    return {"listings": listings, "filters": filters, "state": filters["state"], "city": filters["city"], "anchors": anchors, "collapse": collapse}
@@ -0,0 +1,33 @@
+# core/enrichment.py - colunas de POI mais próximo (vetorizado, sem apply por linha)
+import numpy as np
+from core.distance import nearest_many
+
+NO_POI = {"name": "N/A", "dist": 99}
+
+
+def enrich_nearest(df, pois, prefix):
+    # Adiciona {prefix}_name, {prefix}_lat, {prefix}_lon e dist_{prefix}
+    out = df.copy()
+    if pois is None or pois.empty or df.empty:
+        out[f"{prefix}_name"] = NO_POI["name"]
+        out[f"{prefix}_lat"] = out["Lat"] if "Lat" in out else np.nan
+        out[f"{prefix}_lon"] = out["Lon"] if "Lon" in out else np.nan
+        out[f"dist_{prefix}"] = float(NO_POI["dist"])
+        return out
+    idx, dist = nearest_many(df["Lat"].values, df["Lon"].values, pois["lat"].values, pois["lon"].values, mode="two_phase")
+    out[f"{prefix}_name"] = pois["name"].values[idx]
+    out[f"{prefix}_lat"] = pois["lat"].values[idx]
+    out[f"{prefix}_lon"] = pois["lon"].values[idx]
+    out[f"dist_{prefix}"] = dist
+    return out
+
+
+def enrich(df, supermarkets, schools):
+    return enrich_nearest(enrich_nearest(df, supermarkets, "sup"), schools, "sch")
+
+
+def nearest_dicts(row):
+    # Formato esperado por MapBuilder.add_home (ns, nsc); "min" = tempo pela malha viária (gold), se houver
+    ns = {"name": row["sup_name"], "lat": row["sup_lat"], "lon": row["sup_lon"], "dist": row["dist_sup"], "min": row.get("drive_sup_min")}
+    nsc = {"name": row["sch_name"], "lat": row["sch_lat"], "lon": row["sch_lon"], "dist": row["dist_sch"], "min": row.get("walk_sch_min")}
+    return ns, nsc
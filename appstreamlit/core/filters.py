@@ -0,0 +1,92 @@
+# core/filters.py - estado de filtros normalizado + aplicação vetorizada
+import hashlib
+import json
+import math
+from core.geofilter import clean_shapes, shapes_mask
+from core.reachability import REACH_COLUMNS, reach_mask
+
+
+def normalize_filters(state, city, beds, price_range, shapes=None, reach=None):
+    # Forma canônica: mesma busca => mesma chave, independente de ordem/caixa.
+    # shapes: áreas desenhadas já normalizadas (core.geofilter.normalize_shapes)
+    # reach: colunas de alcance exigidas (core.reachability.REACH_COLUMNS)
+    return {
+        "state": (state or "").strip(),
+        "city": (city or "").strip().title(),
+        "beds": sorted({float(b) for b in (beds or [])}),
+        "price": [int(price_range[0]), int(price_range[1])],
+        "shapes": list(shapes or []),
+        "reach": sorted({r for r in (reach or []) if r in REACH_COLUMNS}),
+    }
+
+
+def filter_key(filters):
+    raw = json.dumps(filters, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(raw.encode()).hexdigest()[:16]
+
+
+def location_mask(df, state, city):
+    mask = df["State"] == state
+    if city:
+        mask &= df["City"].str.title() == city
+    return mask
+
+
+def apply_filters(df, filters):
+    mask = location_mask(df, filters["state"], filters["city"]) & df["unit_beds"].isin(filters["beds"])
+    mask &= df["unit_price"].between(filters["price"][0], filters["price"][1])
+    if filters.get("shapes"):
+        mask &= shapes_mask(df["Lat"].values, df["Lon"].values, filters["shapes"])
+    if filters.get("reach") and set(filters["reach"]).issubset(df.columns):
+        # Gold já traz as colunas de alcance; no bronze o filtro fica para depois do enriquecimento
+        mask &= reach_mask(df, filters["reach"])
+    return df[mask].reset_index(drop=True)
+
+
+def to_query(filters):
+    # Filtros canônicos -> query string (?state=TX&city=Katy&beds=3&pmin=0&pmax=2500)
+    params = {"state": filters["state"], "pmin": str(filters["price"][0]), "pmax": str(filters["price"][1])}
+    if filters["city"]:
+        params["city"] = filters["city"]
+    if filters["beds"]:
+        params["beds"] = ",".join(f"{b:g}" for b in filters["beds"])
+    if filters.get("shapes"):
+        params["geo"] = json.dumps(filters["shapes"], separators=(",", ":"))
+    if filters.get("reach"):
+        params["reach"] = ",".join(filters["reach"])
+    return params
+
+
+def _number(value):
+    # Número finito ou None (link editado à mão: "inf", "nan", "x", lista...)
+    try:
+        number = float(value)
+    except (ValueError, TypeError, OverflowError):
+        return None
+    return number if math.isfinite(number) else None
+
+
+def from_query(params):
+    # Query string -> filtros parciais (só o que veio e é válido; o resto fica com o padrão do app).
+    # Cada parâmetro é lido por si: um valor ruim é ignorado sem descartar os demais.
+    out = {}
+    if params.get("state"):
+        out["state"] = params["state"].strip()
+    if params.get("city"):
+        out["city"] = params["city"].strip().title()
+    if params.get("beds"):
+        beds = [_number(b) for b in params["beds"].split(",") if b.strip()]
+        if beds and None not in beds:
+            out["beds"] = sorted(set(beds))
+    pmin, pmax = _number(params.get("pmin")), _number(params.get("pmax"))
+    if pmin is not None and pmax is not None:
+        out["price"] = sorted([int(pmin), int(pmax)])
+    if params.get("geo"):
+        try:
+            shapes = json.loads(params["geo"])
+        except ValueError:
+            shapes = []
+        out["shapes"] = clean_shapes(shapes)
+    if params.get("reach"):
+        out["reach"] = [r for r in params["reach"].split(",") if r in REACH_COLUMNS]
+    return out
@@ -0,0 +1,106 @@
+# core/geofilter.py - filtro por área desenhada (polígono/círculo), vetorizado com pré-filtro de bbox
+import math
+import numpy as np
+from core.distance import R_KM, haversine_np
+
+COORD_DECIMALS = 6
+
+
+def normalize_shapes(features):
+    # GeoJSON do Leaflet.draw (st_folium "all_drawings") -> formas canônicas e estáveis para hash/URL:
+    #   {"type": "polygon", "ring": [[lon, lat], ...]}  |  {"type": "circle", "center": [lon, lat], "radius": m}
+    shapes = []
+    for f in features or []:
+        geom = (f or {}).get("geometry") or {}
+        radius = ((f or {}).get("properties") or {}).get("radius")
+        if geom.get("type") == "Point" and radius:
+            lon, lat = geom["coordinates"][:2]
+            shapes.append({"type": "circle", "center": [round(lon, COORD_DECIMALS), round(lat, COORD_DECIMALS)], "radius": round(float(radius), 1)})
+        elif geom.get("type") == "Polygon" and geom.get("coordinates"):
+            ring = [[round(x, COORD_DECIMALS), round(y, COORD_DECIMALS)] for x, y in (p[:2] for p in geom["coordinates"][0])]
+            if len(ring) >= 3:
+                shapes.append({"type": "polygon", "ring": ring})
+    return shapes
+
+
+def _point(value):
+    # [lon, lat] finitos e dentro do globo -> lista arredondada; senão None
+    if not isinstance(value, (list, tuple)) or len(value) < 2:
+        return None
+    try:
+        lon, lat = float(value[0]), float(value[1])
+    except (ValueError, TypeError, OverflowError):
+        return None
+    if not (math.isfinite(lon) and math.isfinite(lat) and -180 <= lon <= 180 and -90 <= lat <= 90):
+        return None
+    return [round(lon, COORD_DECIMALS), round(lat, COORD_DECIMALS)]
+
+
+def clean_shapes(shapes):
+    # Formas de fonte externa (URL): só as bem formadas passam (anel com >= 3 pontos válidos,
+    # círculo com centro válido e raio numérico > 0); as demais são descartadas
+    out = []
+    for shape in shapes if isinstance(shapes, list) else []:
+        if not isinstance(shape, dict):
+            continue
+        if shape.get("type") == "polygon" and isinstance(shape.get("ring"), list):
+            ring = [_point(p) for p in shape["ring"]]
+            if len(ring) >= 3 and None not in ring:
+                out.append({"type": "polygon", "ring": ring})
+        elif shape.get("type") == "circle":
+            center = _point(shape.get("center"))
+            try:
+                radius = float(shape.get("radius"))
+            except (ValueError, TypeError, OverflowError):
+                continue
+            if center is not None and math.isfinite(radius) and radius > 0:
+                out.append({"type": "circle", "center": center, "radius": round(radius, 1)})
+    return out
+
+
+def points_in_polygon(lat, lon, ring):
+    # Par-ímpar (ray casting): laço nas arestas (poucas), vetorizado nos pontos
+    ring = np.asarray(ring, dtype=float)
+    xs, ys = ring[:, 0], ring[:, 1]
+    inside = np.zeros(len(lat), dtype=bool)
+    x1, y1 = xs, ys
+    x2, y2 = np.roll(xs, -1), np.roll(ys, -1)
+    for ax, ay, bx, by in zip(x1, y1, x2, y2):
+        if ay == by:
+            continue
+        crosses = (ay > lat) != (by > lat)
+        x_at = ax + (lat - ay) * (bx - ax) / (by - ay)
+        inside ^= crosses & (lon < x_at)
+    return inside
+
+
+def points_in_circle(lat, lon, center, radius_m):
+    clon, clat = center
+    return haversine_np(lat, lon, clat, clon) * 1000 <= radius_m
+
+
+def _bbox(shape):
+    if shape["type"] == "polygon":
+        ring = np.asarray(shape["ring"], dtype=float)
+        return ring[:, 1].min(), ring[:, 0].min(), ring[:, 1].max(), ring[:, 0].max()
+    clon, clat = shape["center"]
+    dlat = np.degrees(shape["radius"] / 1000 / R_KM)
+    dlon = dlat / max(np.cos(np.radians(clat)), 1e-6)
+    return clat - dlat, clon - dlon, clat + dlat, clon + dlon
+
+
+def shapes_mask(lat, lon, shapes):
+    # União das formas; o teste exato só roda nos pontos dentro do bbox de cada forma
+    lat, lon = np.asarray(lat, dtype=float), np.asarray(lon, dtype=float)
+    mask = np.zeros(len(lat), dtype=bool)
+    for shape in shapes:
+        s, w, n, e = _bbox(shape)
+        cand = np.flatnonzero((lat >= s) & (lat <= n) & (lon >= w) & (lon <= e) & ~mask)
+        if not len(cand):
+            continue
+        if shape["type"] == "polygon":
+            hit = points_in_polygon(lat[cand], lon[cand], shape["ring"])
+        else:
+            hit = points_in_circle(lat[cand], lon[cand], shape["center"], shape["radius"])
+        mask[cand[hit]] = True
+    return mask
@@ -0,0 +1,106 @@
+# core/gold.py - camada gold: imóveis já enriquecidos (POI mais próximo + score) por cidade
+import json
+import logging
+import os
+import pandas as pd
+from config.settings import GOLD_PATH, GOLD_POIS_PATH, POI_FILE_CACHE_DIR
+from core.enrichment import enrich
+from core.parallel import enrich_many
+from core.pois import POI_COLUMNS, area_pois
+from core.ranking import DEFAULT_WEIGHTS, RankingEngine
+from core.reachability import add_reachability
+from core.routing import enrich_travel
+
+log = logging.getLogger(__name__)
+
+GOLD_COLUMNS = ["sup_name", "sup_lat", "sup_lon", "dist_sup", "sch_name", "sch_lat", "sch_lon", "dist_sch", "score"]
+
+
+def has_enrichment(df):
+    return {"dist_sup", "dist_sch", "sup_name", "sch_name"}.issubset(df.columns)
+
+
+def poi_file(state, city, cache_dir=POI_FILE_CACHE_DIR):
+    return os.path.join(cache_dir, f"{state}_{city or 'ALL'}_around.json".replace(" ", "_"))
+
+
+def city_pois(listings, state, city, offline=False, cache_dir=POI_FILE_CACHE_DIR):
+    # Lê do cache em arquivo (.cache_osm); busca no Overpass só se não existir e não estiver offline
+    path = poi_file(state, city, cache_dir)
+    if os.path.exists(path):
+        with open(path) as f:
+            data = json.load(f)
+        return pd.DataFrame(data["supers"], columns=POI_COLUMNS), pd.DataFrame(data["schools"], columns=POI_COLUMNS)
+    if offline:
+        log.warning("Sem POIs em cache para %s/%s (offline)", state, city)
+        return pd.DataFrame(columns=POI_COLUMNS), pd.DataFrame(columns=POI_COLUMNS)
+    sups, schs = area_pois(listings, state, city)
+    if not sups.empty or not schs.empty:
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({"supers": sups.values.tolist(), "schools": schs.values.tolist()}, f)
+    return sups, schs
+
+
+def score_city(enriched, weights=DEFAULT_WEIGHTS):
+    # Score com pesos padrão, normalizado dentro da cidade
+    enriched["score"] = 1 - RankingEngine(enriched).scores(weights)
+    return enriched
+
+
+def enrich_city(listings, sups, schs, weights=DEFAULT_WEIGHTS):
+    return score_city(enrich(listings.reset_index(drop=True), sups, schs), weights)
+
+
+def build_gold(listings, pois_fn=city_pois, cities=None, workers=1, graphs=None):
+    # Retorna (imóveis gold, POIs por cidade) para todas as cidades (ou só as pedidas).
+    # POIs (rede/arquivo) são resolvidos em sequência; vizinho mais próximo roda em workers processos.
+    # graphs ({modo: RoadGraph}): troca o POI em linha reta pelo de menor tempo e grava os minutos.
+    parts, area_pois_, pois = {}, {}, []
+    groups = listings.assign(_city=listings["City"].str.title()).groupby(["State", "_city"], sort=True)
+    for (state, city), part in groups:
+        if cities and city not in cities:
+            continue
+        sups, schs = pois_fn(listings, state, city)
+        parts[state, city] = part.drop(columns="_city").reset_index(drop=True)
+        area_pois_[state, city] = (sups, schs)
+        for kind, df in (("supermarket", sups), ("school", schs)):
+            pois.append(df.assign(State=state, City=city, kind=kind))
+        log.info("gold %s/%s: %d imóveis, %d supermercados, %d escolas", state, city, len(part), len(sups), len(schs))
+    enriched = enrich_many(parts, area_pois_, workers)
+    if graphs:
+        enriched = {key: enrich_travel(enriched[key], graphs, *area_pois_[key]) for key in parts}
+    gold = [score_city(add_reachability(enriched[key])) for key in parts]
+    gold_df = pd.concat(gold, ignore_index=True) if gold else listings.iloc[:0]
+    pois_df = pd.concat(pois, ignore_index=True) if pois else pd.DataFrame(columns=POI_COLUMNS + ["State", "City", "kind"])
+    return gold_df, pois_df
+
+
+def write_gold(gold_df, pois_df, path=GOLD_PATH, pois_path=GOLD_POIS_PATH):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    gold_df.to_parquet(path, index=False)
+    pois_df.to_parquet(pois_path, index=False)
+
+
+def gold_available(path=GOLD_PATH, pois_path=GOLD_POIS_PATH):
+    return os.path.exists(path) and os.path.exists(pois_path)
+
+
+def load_gold(path=GOLD_PATH):
+    return pd.read_parquet(path)
+
+
+def load_gold_pois(pois_path=GOLD_POIS_PATH):
+    return pd.read_parquet(pois_path)
+
+
+def gold_area_pois(pois_df, state, city):
+    # POIs pré-calculados da área; cidade vazia = união das cidades do estado
+    mask = pois_df["State"] == state
+    if city:
+        mask &= pois_df["City"] == city
+    area = pois_df[mask].drop_duplicates(subset=["kind", "lat", "lon", "name"])
+    return (
+        area.loc[area["kind"] == "supermarket", POI_COLUMNS].reset_index(drop=True),
+        area.loc[area["kind"] == "school", POI_COLUMNS].reset_index(drop=True),
+    )
@@ -0,0 +1,103 @@
+# core/hexbin.py - grade hexagonal de preços (binning vetorizado por zoom)
+import math
+import numpy as np
+from core.clustering import project, unproject, TILE_PX
+
+HEX_PX = 22          # raio do hexágono na tela (px)
+HEX_ZOOMS = range(8, 16)
+COLORS = ["#2E7D32", "#7CB342", "#FDD835", "#FB8C00", "#E53935"]  # barato -> caro
+NO_DATA = "#9E9E9E"  # célula sem preço válido (mediana NaN)
+SQRT3 = math.sqrt(3)
+
+
+def _hex_round(q, r):
+    # Arredondamento em coordenadas cúbicas (pointy-top), tudo vetorizado
+    x, z = q, r
+    y = -x - z
+    rx, ry, rz = np.round(x), np.round(y), np.round(z)
+    dx, dy, dz = np.abs(rx - x), np.abs(ry - y), np.abs(rz - z)
+    fix_x = (dx > dy) & (dx > dz)
+    fix_z = ~fix_x & (dz >= dy)
+    rx = np.where(fix_x, -ry - rz, rx)
+    rz = np.where(fix_z, -rx - ry, rz)
+    return rx.astype(np.int64), rz.astype(np.int64)
+
+
+def _group_median(cell, values, n):
+    # Mediana por grupo sem loop: ordena por (célula, valor) e pega o(s) elemento(s) do meio
+    ok = ~np.isnan(values)
+    cell, values = cell[ok], values[ok]
+    out = np.full(n, np.nan)
+    if len(cell) == 0:
+        return out
+    order = np.lexsort((values, cell))
+    cell, values = cell[order], values[order]
+    starts = np.flatnonzero(np.r_[True, cell[1:] != cell[:-1]])
+    counts = np.diff(np.r_[starts, len(cell)])
+    out[cell[starts]] = (values[starts + (counts - 1) // 2] + values[starts + counts // 2]) / 2
+    return out
+
+
+class HexGrid:
+    def __init__(self, lat, lon, price, beds, zooms=HEX_ZOOMS, hex_px=HEX_PX):
+        self.x, self.y = project(lat, lon)
+        price = np.asarray(price, dtype=float)
+        beds = np.asarray(beds, dtype=float)
+        ppb = np.where(beds > 0, price / np.where(beds > 0, beds, 1), np.nan)
+        self.zooms = list(zooms)
+        self.levels = {z: self._bin(price, ppb, hex_px / (TILE_PX * 2 ** z)) for z in self.zooms}
+
+    def _bin(self, price, ppb, size):
+        q = (SQRT3 / 3 * self.x - self.y / 3) / size
+        r = (2 / 3 * self.y) / size
+        q, r = _hex_round(q, r)
+        # r >= 0 (y de Mercator em [0, 1]), então (q, r) cabe numa chave int64 única
+        keys, cell = np.unique(q * (1 << 32) + r, return_inverse=True)
+        kq, kr = keys >> 32, keys & 0xFFFFFFFF
+        level = {
+            "cx": size * SQRT3 * (kq + kr / 2),
+            "cy": size * 1.5 * kr,
+            "count": np.bincount(cell, minlength=len(keys)),
+            "price": _group_median(cell, price, len(keys)),
+            "ppb": _group_median(cell, ppb, len(keys)),
+            "size": size,
+        }
+        # Cores por quintil de mediana de preço (calculado uma vez por nível); -1 = sem preço
+        known = ~np.isnan(level["price"])
+        edges = np.quantile(level["price"][known], [0.2, 0.4, 0.6, 0.8]) if known.any() else []
+        level["color"] = np.where(known, np.searchsorted(edges, level["price"]), -1)
+        return level
+
+    def get_features(self, zoom, bounds=None):
+        z = min(max(int(round(zoom)), self.zooms[0]), self.zooms[-1])
+        lvl = self.levels[z]
+        mask = np.ones(len(lvl["cx"]), dtype=bool)
+        if bounds is not None:
+            s, w, n, e = bounds
+            x0, y1 = project(s, w)
+            x1, y0 = project(n, e)
+            pad = 2 * lvl["size"]
+            mask = (lvl["cx"] >= x0 - pad) & (lvl["cx"] <= x1 + pad) & (lvl["cy"] >= y0 - pad) & (lvl["cy"] <= y1 + pad)
+
+        # Vértices de todos os hexágonos de uma vez: (n, 7) com o anel fechado
+        ang = np.radians(30 + 60 * np.arange(7))
+        vx = lvl["cx"][mask, None] + lvl["size"] * np.cos(ang)[None, :]
+        vy = lvl["cy"][mask, None] + lvl["size"] * np.sin(ang)[None, :]
+        vlat, vlon = unproject(vx, vy)
+        rings = np.stack([np.round(vlon, 5), np.round(vlat, 5)], axis=2).tolist()
+
+        features = []
+        for ring, count, price, ppb, color in zip(
+            rings, lvl["count"][mask].tolist(), lvl["price"][mask].tolist(), lvl["ppb"][mask].tolist(), lvl["color"][mask].tolist()
+        ):
+            features.append({
+                "type": "Feature",
+                "geometry": {"type": "Polygon", "coordinates": [ring]},
+                "properties": {
+                    "count": count,
+                    "median_price": f"${price:,.0f}" if not math.isnan(price) else "N/A",
+                    "median_ppb": f"${ppb:,.0f}" if not math.isnan(ppb) else "N/A",
+                    "fill": COLORS[min(color, len(COLORS) - 1)] if color >= 0 else NO_DATA,
+                },
+            })
+        return {"type": "FeatureCollection", "features": features}
@@ -1,9 +1,45 @@
 # core/map_builder.py - v28.2
+import math
+import numpy as np
 import folium
+from folium.plugins import Draw
+
+POI_STYLE = {
+    "supermarket": ("blue", "shopping-cart", "Supermercado"),
+    "school": ("orange", "graduation-cap", "Escola"),
+}
+
+def poi_features(pois):
+    return {
+        "type": "FeatureCollection",
+        "features": [
+            {"type": "Feature", "geometry": {"type": "Point", "coordinates": [lon, lat]}, "properties": {"name": name}}
+            for lat, lon, name in zip(pois["lat"], pois["lon"], pois["name"])
+        ],
+    }
+
+def eta(poi):
+    # Minutos pela malha viária (core/routing, camada gold); vazio quando só há linha reta
+    minutes = poi.get("min")
+    return f" • {minutes:.0f} min" if minutes is not None and np.isfinite(minutes) else ""
+
+def anchor_links(row, anchors):
+    # Rotas até as âncoras do usuário (dist já vem da coluna calculada no pipeline)
+    return "".join(
+        f"<a href=\"https://www.google.com/maps/dir/?api=1&origin={row['Lat']},{row['Lon']}&destination={a['lat']},{a['lon']}&travelmode=driving\" target=\"_blank\" "
+        f"style=\"display:block;background:#455A64;color:white;padding:10px;border-radius:8px;text-decoration:none;margin-top:8px\">Até {a['name'][:28]} ({a['dist']:.1f}km)</a>"
+        for a in anchors
+    )
 
 class MapBuilder:
     def __init__(self, center):
         self.map = folium.Map(location=center, zoom_start=12, tiles="CartoDB positron")
+        self.target = self.map
+
+    def new_layer(self, name):
+        # Camada separada (enviada via feature_group_to_add no st_folium)
+        self.target = folium.FeatureGroup(name=name)
+        return self.target
 
     def add_supermarkets(self, supermarkets):
         if supermarkets.empty: return
@@ -13,7 +49,7 @@ class MapBuilder:
                 popup=f"<b style='color:#1E90FF'>Supermercado: {r['name']}</b>",
                 icon=folium.Icon(color="blue", icon="shopping-cart", prefix="fa"),
                 tooltip=r["name"]
-            ).add_to(self.map)
+            ).add_to(self.target)
 
     def add_schools(self, schools):
         if schools.empty: return
@@ -23,9 +59,44 @@ class MapBuilder:
                 popup=f"<b style='color:#FF9800'>Escola: {r['name']}</b>",
                 icon=folium.Icon(color="orange", icon="graduation-cap", prefix="fa"),
                 tooltip=r["name"]
-            ).add_to(self.map)
+            ).add_to(self.target)
 
-    def add_home(self, row, ns, nsc):
+    def add_poi_layer(self, features, kind):
+        # Camada única GeoJson (features vem de poi_features, cacheável por snapshot de POIs)
+        if not features["features"]: return
+        color, icon, label = POI_STYLE[kind]
+        folium.GeoJson(
+            features,
+            name=label,
+            marker=folium.Marker(icon=folium.Icon(color=color, icon=icon, prefix="fa")),
+            tooltip=folium.GeoJsonTooltip(fields=["name"], labels=False),
+            popup=folium.GeoJsonPopup(fields=["name"], aliases=[f"{label}:"]),
+        ).add_to(self.target)
+
+    def add_hex_layer(self, features):
+        # Uma única camada de polígonos (cor já vem calculada em 'fill')
+        if not features["features"]: return
+        folium.GeoJson(
+            features,
+            name="Preço por hexágono",
+            style_function=lambda f: {"fillColor": f["properties"]["fill"], "color": "#333", "weight": 0.5, "fillOpacity": 0.55},
+            tooltip=folium.GeoJsonTooltip(
+                fields=["count", "median_price", "median_ppb"],
+                aliases=["Imóveis", "Mediana preço", "Mediana preço/quarto"]
+            ),
+        ).add_to(self.target)
+
+    def add_best_deals(self, deals):
+        # Destaque dos imóveis na fronteira de Pareto (preço x escola x supermercado)
+        if deals.empty: return
+        layer = folium.FeatureGroup(name="Melhores ofertas").add_to(self.target)
+        for r in deals.itertuples():
+            folium.CircleMarker(
+                location=[r.Lat, r.Lon], radius=11, color="#FFD700", weight=3, fill=False,
+                tooltip=f"Melhor oferta: ${r.unit_price:,.0f} • escola {r.dist_sch:.1f}km • mercado {r.dist_sup:.1f}km"
+            ).add_to(layer)
+
+    def add_home(self, row, ns, nsc, anchors=()):
         popup = f"""
         <div style="width:360px;font-family:Arial;background:#111;color:white;padding:12px;border-radius:12px">
             <b style="font-size:19px;color:#FF5252">${row['unit_price']:,.0f}</b> • {row['unit_beds']} quartos<br>
@@ -35,8 +106,9 @@ class MapBuilder:
                 <a href="https://www.google.com/maps?q={row['Lat']},{row['Lon']}" target="_blank" style="background:#34A853;color:white;padding:10px 16px;border-radius:8px;text-decoration:none;font-weight:bold">Maps</a>
             </div>
             <br>
-            <a href="https://www.google.com/maps/dir/?api=1&origin={row['Lat']},{row['Lon']}&destination={ns['lat']},{ns['lon']}&travelmode=driving" target="_blank" style="display:block;background:#FF9800;color:white;padding:10px;border-radius:8px;text-decoration:none;margin:8px 0">Dirigir até {ns['name'][:28]} ({ns['dist']:.1f}km)</a>
-            <a href="https://www.google.com/maps/dir/?api=1&origin={row['Lat']},{row['Lon']}&destination={nsc['lat']},{nsc['lon']}&travelmode=walking" target="_blank" style="display:block;background:#9C27B0;color:white;padding:10px;border-radius:8px;text-decoration:none">Caminhar até {nsc['name'][:28]} ({nsc['dist']:.1f}km)</a>
+            <a href="https://www.google.com/maps/dir/?api=1&origin={row['Lat']},{row['Lon']}&destination={ns['lat']},{ns['lon']}&travelmode=driving" target="_blank" style="display:block;background:#FF9800;color:white;padding:10px;border-radius:8px;text-decoration:none;margin:8px 0">Dirigir até {ns['name'][:28]} ({ns['dist']:.1f}km{eta(ns)})</a>
+            <a href="https://www.google.com/maps/dir/?api=1&origin={row['Lat']},{row['Lon']}&destination={nsc['lat']},{nsc['lon']}&travelmode=walking" target="_blank" style="display:block;background:#9C27B0;color:white;padding:10px;border-radius:8px;text-decoration:none">Caminhar até {nsc['name'][:28]} ({nsc['dist']:.1f}km{eta(nsc)})</a>
+            {anchor_links(row, anchors)}
         </div>
         """
         folium.Marker(
@@ -44,7 +116,73 @@ class MapBuilder:
             popup=folium.Popup(popup, max_width=400),
             icon=folium.Icon(color="red", icon="home", prefix="fa"),
             tooltip=f"${row['unit_price']:,.0f} • {row['unit_beds']} quartos"
+        ).add_to(self.target)
+
+    def add_building(self, units, ns, nsc, anchors=(), max_units=12):
+        # Um marcador por prédio: unidades (já ordenadas por preço) listadas no popup
+        row = units.iloc[0]
+        lines = "".join(
+            f"<a href=\"{u.get('Url_anuncio', '#')}\" target=\"_blank\" style=\"color:#FFF;text-decoration:none\">"
+            f"<b style=\"color:#FF5252\">${u['unit_price']:,.0f}</b> • {u['unit_beds']} quartos</a><br>"
+            for _, u in units.head(max_units).iterrows()
+        )
+        if len(units) > max_units:
+            lines += f"<i>+{len(units) - max_units} unidades</i><br>"
+        popup = f"""
+        <div style="width:360px;font-family:Arial;background:#111;color:white;padding:12px;border-radius:12px">
+            <b style="font-size:17px;color:#FF5252">{len(units)} unidades</b> • ${units['unit_price'].min():,.0f}–${units['unit_price'].max():,.0f}<br>
+            <b style="color:#FFF">{row.get('FullAddress', 'Endereço não informado')}</b><br><br>
+            <div style="max-height:180px;overflow-y:auto;line-height:1.7">{lines}</div>
+            <br>
+            <a href="https://www.google.com/maps?q={row['Lat']},{row['Lon']}" target="_blank" style="display:block;background:#34A853;color:white;padding:10px;border-radius:8px;text-decoration:none">Maps</a>
+            <a href="https://www.google.com/maps/dir/?api=1&origin={row['Lat']},{row['Lon']}&destination={ns['lat']},{ns['lon']}&travelmode=driving" target="_blank" style="display:block;background:#FF9800;color:white;padding:10px;border-radius:8px;text-decoration:none;margin:8px 0">Dirigir até {ns['name'][:28]} ({ns['dist']:.1f}km{eta(ns)})</a>
+            <a href="https://www.google.com/maps/dir/?api=1&origin={row['Lat']},{row['Lon']}&destination={nsc['lat']},{nsc['lon']}&travelmode=walking" target="_blank" style="display:block;background:#9C27B0;color:white;padding:10px;border-radius:8px;text-decoration:none">Caminhar até {nsc['name'][:28]} ({nsc['dist']:.1f}km{eta(nsc)})</a>
+            {anchor_links(row, anchors)}
+        </div>
+        """
+        folium.Marker(
+            location=[row["Lat"], row["Lon"]],
+            popup=folium.Popup(popup, max_width=400),
+            icon=folium.Icon(color="darkred", icon="building", prefix="fa"),
+            tooltip=f"{len(units)} unidades • ${units['unit_price'].min():,.0f}–${units['unit_price'].max():,.0f}"
+        ).add_to(self.target)
+
+    def add_anchors(self, points):
+        # Locais fixados pelo usuário (trabalho etc.), sempre visíveis na base do mapa
+        for p in points:
+            folium.Marker(
+                location=[p["lat"], p["lon"]],
+                popup=f"<b style='color:#455A64'>Âncora: {p['name']}</b>",
+                icon=folium.Icon(color="darkgreen", icon="briefcase", prefix="fa"),
+                tooltip=p["name"]
+            ).add_to(self.map)
+
+    def add_draw(self, shapes=()):
+        # Ferramenta de desenho (polígono/retângulo/círculo); áreas ativas voltam editáveis no mesmo grupo
+        drawn = folium.FeatureGroup(name="Área de busca").add_to(self.map)
+        style = {"color": "#FF5252", "weight": 2, "fill_opacity": 0.05}
+        for shape in shapes:
+            if shape["type"] == "circle":
+                folium.Circle(location=shape["center"][::-1], radius=shape["radius"], **style).add_to(drawn)
+            else:
+                folium.Polygon(locations=[[lat, lon] for lon, lat in shape["ring"]], **style).add_to(drawn)
+        Draw(
+            feature_group=drawn,
+            draw_options={"polyline": False, "marker": False, "circlemarker": False, "rectangle": True, "polygon": True, "circle": True},
+            edit_options={"edit": True, "remove": True},
         ).add_to(self.map)
 
+    def add_clusters(self, clusters, color="#FF5252", label="imóveis"):
+        # Só clusters agregados (count > 1); pontos isolados usam add_home / add_supermarkets / add_schools
+        for r in clusters[clusters["count"] > 1].itertuples():
+            size = int(min(28 + 6 * math.log10(r.count), 52))
+            html = f"<div style='width:{size}px;height:{size}px;line-height:{size}px;border-radius:50%;background:{color};color:white;text-align:center;font-weight:bold;opacity:.85'>{r.count}</div>"
+            tooltip = f"{r.count} {label}" + (f" • média ${r.mean:,.0f}" if r.mean else "")
+            folium.Marker(
+                location=[r.lat, r.lon],
+                icon=folium.DivIcon(html=html, icon_size=(size, size), icon_anchor=(size // 2, size // 2)),
+                tooltip=tooltip
+            ).add_to(self.target)
+
     def get_map(self):
         return self.map
\ No newline at end of file
@@ -0,0 +1,104 @@
+# core/net.py - camada de rede assíncrona (Overpass/Nominatim) com limite global de concorrência e taxa
+# As requisições usam requests num pool de threads próprio; asyncio só orquestra o fan-out (gather).
+# Semáforo e limitador de taxa são de thread, então valem para todos os loops/sessões do processo.
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from config.settings import HEADERS, NET_MAX_CONCURRENCY, NET_RATE_PER_SEC, OVERPASS_SERVERS
+
+log = logging.getLogger(__name__)
+
+_POOL = ThreadPoolExecutor(max_workers=max(8, NET_MAX_CONCURRENCY * 4), thread_name_prefix="net")
+_SLOTS = threading.BoundedSemaphore(NET_MAX_CONCURRENCY)
+
+
+class RateLimiter:
+    # Espaça o início das requisições em 1/rate segundos (reserva o próximo horário sob lock)
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+_RATE = RateLimiter(NET_RATE_PER_SEC)
+
+
+def _request(method, url, **kwargs):
+    with _SLOTS:
+        _RATE.wait()
+        return requests.request(method, url, headers=HEADERS, **kwargs)
+
+
+async def call(fn, *args):
+    # Roda fn(*args) (bloqueante) no pool de rede sem travar o loop. Já dentro de um worker do _POOL
+    # roda na hora: esperar outra tarefa do mesmo pool trava quando todos os workers fazem isso.
+    if threading.current_thread().name.startswith("net_"):
+        return fn(*args)
+    return await asyncio.get_running_loop().run_in_executor(_POOL, lambda: fn(*args))
+
+
+def fan_out(fn, args_list, workers=None):
+    # Várias chamadas bloqueantes que fazem rede por dentro (ex.: fetch memoizado de uma área) em
+    # paralelo num pool próprio: cada uma submete as requisições ao _POOL, que nunca fica esperando a si mesmo
+    if not args_list:
+        return []
+    with ThreadPoolExecutor(max_workers=workers or NET_MAX_CONCURRENCY * 2, thread_name_prefix="fanout") as ex:
+        return list(ex.map(lambda args: fn(*args), args_list))
+
+
+async def overpass(query, servers=OVERPASS_SERVERS, timeout=90):
+    # "elements" da primeira instância que responder 200; None se todas falharem
+    for server in servers:
+        try:
+            r = await call(lambda: _request("POST", server, data={"data": query}, timeout=timeout))
+            if r.status_code == 200:
+                return r.json().get("elements", [])
+            log.warning("Overpass %s respondeu %s", server, r.status_code)
+        except Exception as e:
+            log.warning("Overpass %s falhou: %s", server, e)
+    return None
+
+
+async def get_json(url, params=None, timeout=15):
+    try:
+        r = await call(lambda: _request("GET", url, params=params, timeout=timeout))
+        if r.status_code == 200:
+            return r.json()
+        log.warning("%s respondeu %s", url, r.status_code)
+    except Exception as e:
+        log.warning("%s falhou: %s", url, e)
+    return None
+
+
+async def gather(coros):
+    return await asyncio.gather(*coros)
+
+
+def run(coro):
+    # Wrapper síncrono para os pontos de chamada atuais (script do Streamlit, jobs)
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    # Já dentro de um loop: roda num loop próprio em outra thread (fora do _POOL, que o coro usa)
+    with ThreadPoolExecutor(max_workers=1) as one:
+        return one.submit(asyncio.run, coro).result()
+
+
+def overpass_sync(query, servers=OVERPASS_SERVERS, timeout=90):
+    return run(overpass(query, servers, timeout))
+
+
+def get_json_sync(url, params=None, timeout=15):
+    return run(get_json(url, params, timeout))
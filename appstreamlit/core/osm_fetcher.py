@@ -1,15 +1,38 @@
 # core/osm_fetcher.py - v28.3 (SUPERMERCADOS GARANTIDOS — 62+ EM CONROE)
-import requests
+import logging
 import pandas as pd
-import streamlit as st
-from config.settings import HEADERS
+from config.settings import SHARED_CACHE_MAX_BYTES, SHARED_CACHE_URL
+from core import net
+from core.cache import open_backend
+
+log = logging.getLogger(__name__)
+
+# Cache padrão (1h) compartilhado entre réplicas (SHARED_CACHE_URL); qualquer backend com get/set pode ser passado
+DEFAULT_CACHE = open_backend(SHARED_CACHE_URL, "osm", max_entries=512, max_bytes=SHARED_CACHE_MAX_BYTES, ttl=3600)
+CATEGORIES = (("shop", "supermarket"), ("amenity", "school"))
 
 class OSMFetcher:
-    def __init__(self, south, west, north, east):
+    def __init__(self, south, west, north, east, cache=DEFAULT_CACHE):
         self.bbox = (south, west, north, east)
+        self.cache = cache
+
+    async def _fetch_async(self, bbox, tag, value):
+        key = f"osm:{tag}={value}:" + ",".join(f"{c:.5f}" for c in bbox)
+        elements = self.cache.get(key) if self.cache is not None else None
+        if elements is None:
+            elements = await net.overpass(self._query(bbox, tag, value), timeout=120) or []
+            if elements and self.cache is not None:
+                self.cache.set(key, elements)
+        return elements
+
+    def _fetch(self, bbox, tag, value):
+        return net.run(self._fetch_async(bbox, tag, value))
+
+    def prefetch(self, categories=CATEGORIES):
+        # Todas as categorias em paralelo (tempo da mais lenta); get_supermarkets/get_schools leem do cache
+        return net.run(net.gather([self._fetch_async(self.bbox, tag, value) for tag, value in categories]))
 
-    @st.cache_data(ttl=3600, show_spinner=False)
-    def _fetch(_self, bbox, tag, value):
+    def _query(self, bbox, tag, value):
         s, w, n, e = bbox
         # QUERY OFICIAL QUE PEGA TODOS OS SUPERMERCADOS (inclui Walmart, HEB, etc.)
         if tag == "shop" and value == "supermarket":
@@ -36,19 +59,7 @@ class OSMFetcher:
             );
             out center;
             '''
-        
-        try:
-            r = requests.post(
-                "https://overpass.kumi.systems/api/interpreter",
-                data={"data": query},
-                headers=HEADERS,
-                timeout=120
-            )
-            if r.status_code == 200:
-                return r.json().get("elements", [])
-        except Exception as e:
-            st.warning(f"Erro OSM: {e}")
-        return []
+        return query
 
     def get_supermarkets(self):
         raw = self._fetch(self.bbox, "shop", "supermarket")
@@ -82,4 +93,4 @@ class OSMFetcher:
                 name = default
                 
             data.append({"name": name, "lat": float(lat), "lon": float(lon)})
-        return pd.DataFrame(data)
\ No newline at end of file
+        return pd.DataFrame(data, columns=["name", "lat", "lon"])
\ No newline at end of file
@@ -0,0 +1,44 @@
+# core/parallel.py - enriquecimento em pool de processos, fatiado por cidade e por blocos de imóveis
+import os
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+from config.settings import ENRICH_CHUNK_SIZE
+from core.enrichment import enrich
+
+# POIs por área, somente leitura: enviados uma vez por worker (initializer), não a cada tarefa
+_POIS = {}
+
+
+def _init_worker(pois):
+    global _POIS
+    _POIS = pois
+
+
+def _enrich_shard(key, part):
+    sups, schs = _POIS[key]
+    return enrich(part, sups, schs)
+
+
+def shards(parts, chunk_size=ENRICH_CHUNK_SIZE):
+    # (chave, bloco): cidades grandes viram vários blocos; o vizinho mais próximo é por linha
+    for key, part in parts.items():
+        for start in range(0, max(len(part), 1), chunk_size):
+            yield key, part.iloc[start:start + chunk_size]
+
+
+def enrich_many(parts, pois, workers=None, chunk_size=ENRICH_CHUNK_SIZE):
+    # parts: {chave: imóveis}; pois: {chave: (supermercados, escolas)} -> {chave: imóveis enriquecidos}
+    # Mantém a ordem das linhas dentro de cada chave; workers=1 roda no próprio processo.
+    workers = workers or os.cpu_count() or 1
+    tasks = list(shards(parts, chunk_size))
+    if workers == 1 or len(tasks) <= 1:
+        _init_worker(pois)
+        results = [_enrich_shard(key, part) for key, part in tasks]
+    else:
+        with ProcessPoolExecutor(min(workers, len(tasks)), initializer=_init_worker, initargs=(pois,)) as pool:
+            futures = [pool.submit(_enrich_shard, key, part) for key, part in tasks]
+            results = [f.result() for f in futures]
+    merged = {}
+    for (key, _), out in zip(tasks, results):
+        merged.setdefault(key, []).append(out)
+    return {key: pd.concat(outs, ignore_index=True) for key, outs in merged.items()}
@@ -0,0 +1,76 @@
+# core/pipeline.py - DAG de estágios com chave por conteúdo, cache plugável e hit/miss por estágio
+import hashlib
+import time
+from core.cache import LRUCache, content_hash
+
+class Stage:
+    def __init__(self, name, fn, inputs=(), version=1, cache=True):
+        self.name = name
+        self.fn = fn
+        self.inputs = tuple(inputs)
+        self.version = version
+        self.cache = cache
+
+
+class Pipeline:
+    def __init__(self, backend=None):
+        # backend: qualquer objeto com get(key, default) / set(key, value, size) (ex.: LRUCache)
+        self.backend = backend if backend is not None else LRUCache(max_entries=64)
+        self.stages = {}
+
+    def stage(self, name, inputs=(), version=1, cache=True):
+        def deco(fn):
+            self.stages[name] = Stage(name, fn, inputs, version, cache)
+            return fn
+        return deco
+
+    def run(self, target, **inputs):
+        return self.run_many([target], **inputs)[0][target]
+
+    def run_many(self, targets, **inputs):
+        # Executa só o subgrafo necessário; retorna (valores, relatório hit/miss/tempo por estágio).
+        # Chave Merkle: estágio = hash(nome, versão, chaves das entradas), sem executar nada a montante.
+        # Estágios com cache=False (ex.: rede com TTL próprio) rodam sempre e têm chave = hash da saída.
+        keys, values, report = {}, {}, []
+
+        def key(name):
+            if name not in keys:
+                if name not in self.stages:
+                    if name not in inputs:
+                        raise KeyError(f"Entrada '{name}' não informada")
+                    keys[name] = content_hash(inputs[name])
+                elif not self.stages[name].cache:
+                    keys[name] = content_hash(value(name))
+                else:
+                    stage = self.stages[name]
+                    parts = [stage.name, str(stage.version)] + [key(i) for i in stage.inputs]
+                    keys[name] = hashlib.sha1("|".join(parts).encode()).hexdigest()[:16]
+            return keys[name]
+
+        def value(name):
+            if name in values:
+                return values[name]
+            if name not in self.stages:
+                values[name] = inputs[name]
+                return values[name]
+            stage = self.stages[name]
+            cached = self.backend.get(f"{name}:{key(name)}", _MISSING) if stage.cache else _MISSING
+            hit = cached is not _MISSING
+            seconds = 0.0
+            if hit:
+                result = cached
+            else:
+                args = [value(i) for i in stage.inputs]
+                t0 = time.perf_counter()
+                result = stage.fn(*args)
+                seconds = time.perf_counter() - t0
+            values[name] = result
+            if stage.cache and not hit:
+                self.backend.set(f"{name}:{key(name)}", result)
+            report.append({"stage": name, "key": key(name), "hit": hit, "seconds": round(seconds, 4)})
+            return result
+
+        return {t: value(t) for t in targets}, report
+
+
+_MISSING = object()
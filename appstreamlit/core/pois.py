@@ -0,0 +1,80 @@
+# core/pois.py - POIs (supermercados/escolas) ao redor dos imóveis via Overpass, sem Streamlit
+import logging
+import numpy as np
+import pandas as pd
+from config.settings import POI_RADIUS_M, SHARED_CACHE_MAX_BYTES, SHARED_CACHE_URL
+from core import net
+from core.cache import memoize, open_backend
+from core.filters import location_mask
+
+log = logging.getLogger(__name__)
+
+POI_COLUMNS = ["lat", "lon", "name"]
+SCHOOL_EXCLUDE = ["university", "college", "daycare", "preschool"]
+
+
+def around_query(lat_list, lon_list, radius=POI_RADIUS_M):
+    points = ",".join([f"{la},{lo}" for la, lo in zip(lat_list, lon_list)])
+    return f'''
+    [out:json][timeout:60];
+    (
+      nwr["shop"~"supermarket|grocery"]["name"](around:{radius},{points});
+      nwr["brand"~"Walmart|Best Buy|Savers|HEB|Kroger|Target|Costco|Aldi",i](around:{radius},{points});
+      nwr["amenity"="school"](around:{radius},{points});
+    );
+    out center;
+    '''
+
+
+def split_elements(elements):
+    # Separa a resposta do Overpass em supermercados e escolas ([lat, lon, nome])
+    supers, schools = [], []
+    for e in elements:
+        lat = e.get("lat") or e.get("center", {}).get("lat")
+        lon = e.get("lon") or e.get("center", {}).get("lon")
+        if not lat or not lon: continue
+        name = (e["tags"].get("name") or e["tags"].get("brand") or "Local").title()
+        if e["tags"].get("shop") or "brand" in e["tags"]:
+            supers.append([float(lat), float(lon), name])
+        elif e["tags"].get("amenity") == "school":
+            if not any(x in name.lower() for x in SCHOOL_EXCLUDE):
+                schools.append([float(lat), float(lon), name])
+    return supers, schools
+
+
+async def fetch_pois_around_async(lat_list, lon_list, radius=POI_RADIUS_M):
+    if not lat_list: return [], []
+    elements = await net.overpass(around_query(lat_list, lon_list, radius), timeout=60)
+    return split_elements(elements) if elements is not None else ([], [])
+
+
+def fetch_pois_around(lat_list, lon_list, radius=POI_RADIUS_M):
+    return net.run(fetch_pois_around_async(lat_list, lon_list, radius))
+
+
+# Mesma área => mesma consulta: resultado compartilhado entre réplicas por 2h (respostas vazias não ficam)
+AROUND_CACHE = open_backend(SHARED_CACHE_URL, "pois_around", max_entries=2048, max_bytes=SHARED_CACHE_MAX_BYTES, ttl=7200)
+fetch_pois_around_shared = memoize(AROUND_CACHE, "around", keep=lambda pois: bool(pois[0] or pois[1]))(fetch_pois_around)
+
+
+def area_points(df, state, city):
+    # Pontos da área (Estado/Cidade) numa grade de ~1km: poucos pontos no around e independe de quartos/preço
+    area = df[location_mask(df, state, city)]
+    return np.unique(np.round(area[["Lat", "Lon"]].to_numpy(dtype=float), 2), axis=0)
+
+
+def area_pois(df, state, city, fetch=fetch_pois_around_shared):
+    pts = area_points(df, state, city)
+    supers, schools = fetch(pts[:, 0].tolist(), pts[:, 1].tolist())
+    return pd.DataFrame(supers, columns=POI_COLUMNS), pd.DataFrame(schools, columns=POI_COLUMNS)
+
+
+def warm_areas(df, areas, fetch=fetch_pois_around_shared):
+    # Aquece o cache de várias áreas [(estado, cidade)] em paralelo, sob o limite global de core.net
+    jobs = []
+    for state, city in areas:
+        pts = area_points(df, state, city)
+        jobs.append((pts[:, 0].tolist(), pts[:, 1].tolist()))
+    results = net.fan_out(fetch, jobs)
+    log.info("POIs aquecidos para %d áreas (%d vazias)", len(areas), sum(not (s or c) for s, c in results))
+    return results
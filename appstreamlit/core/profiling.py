@@ -0,0 +1,94 @@
+# core/profiling.py - instrumentação por rerun: tempo por etapa, contadores, caches e captura cProfile/tracemalloc
+import cProfile
+import io
+import json
+import logging
+import pstats
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+log = logging.getLogger(__name__)
+
+CAPTURE_MODES = ("cprofile", "tracemalloc")
+
+
+class Profiler:
+    def __init__(self, name="rerun"):
+        self.name = name
+        self.started = time.time()
+        self.spans = []
+        self.counters = {}
+        self.caches = {}
+
+    @contextmanager
+    def span(self, stage, **counts):
+        # with prof.span("map.build") as s: ...; s["rows"] = n  (contadores extras entram no registro)
+        entry = {"stage": stage, **counts}
+        t0 = time.perf_counter()
+        try:
+            yield entry
+        finally:
+            entry["seconds"] = round(time.perf_counter() - t0, 4)
+            self.spans.append(entry)
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + int(n)
+
+    def add_stages(self, report, prefix="pipeline."):
+        # Relatório de Pipeline.run_many: um span por estágio, com hit/miss
+        for r in report:
+            self.spans.append({"stage": prefix + r["stage"], "hit": r["hit"], "seconds": r["seconds"]})
+
+    def add_cache(self, name, stats):
+        self.caches[name] = stats
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "started": self.started,
+            "total_seconds": round(sum(s["seconds"] for s in self.spans if "." not in s["stage"]), 4),
+            "spans": self.spans,
+            "counters": self.counters,
+            "caches": self.caches,
+        }
+
+    def log_json(self, level=logging.INFO):
+        log.log(level, json.dumps(self.to_dict(), default=str, ensure_ascii=False))
+
+
+class Capture:
+    # Captura sob demanda de um trecho (ex.: um rerun inteiro): start() ... stop() -> relatório em texto
+    def __init__(self, mode=None, top=30):
+        self.mode = mode if mode in CAPTURE_MODES else None
+        self.top = top
+        self._profile = None
+        self._owns_tracing = False
+
+    def start(self):
+        if self.mode == "cprofile":
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        elif self.mode == "tracemalloc":
+            self._owns_tracing = not tracemalloc.is_tracing()
+            if self._owns_tracing:
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+        return self
+
+    def stop(self):
+        # Idempotente: um rerun interrompido (st.rerun/exceção) é encerrado no começo do próximo
+        mode, self.mode = self.mode, None
+        if mode == "cprofile":
+            self._profile.disable()
+            out = io.StringIO()
+            pstats.Stats(self._profile, stream=out).sort_stats("cumulative").print_stats(self.top)
+            return out.getvalue()
+        if mode == "tracemalloc":
+            current, peak = tracemalloc.get_traced_memory()
+            stats = tracemalloc.take_snapshot().statistics("lineno")[:self.top]
+            if self._owns_tracing:
+                tracemalloc.stop()
+            lines = [f"atual: {current / 2**20:.1f} MB  pico: {peak / 2**20:.1f} MB"]
+            return "\n".join(lines + [str(s) for s in stats])
+        return ""
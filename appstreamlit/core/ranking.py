@@ -0,0 +1,58 @@
+# core/ranking.py - ranking multicritério ponderado (vetorizado)
+import threading
+import numpy as np
+from core.results import top_k
+
+# critério -> sentido ("min" = menor é melhor)
+# (dist_anchor_max só existe com âncoras de deslocamento; critérios ausentes no DataFrame são ignorados)
+CRITERIA = {"unit_price": "min", "dist_sch": "min", "dist_sup": "min", "unit_beds": "max", "dist_anchor_max": "min"}
+DEFAULT_WEIGHTS = {"unit_price": 0.5, "dist_sch": 0.2, "dist_sup": 0.2, "unit_beds": 0.1, "dist_anchor_max": 0.0}
+CLIP_QUANTILES = (0.02, 0.98)
+
+
+def normalize(values, sense, method="minmax"):
+    # 0 = melhor, 1 = pior; NaN vira o pior valor
+    v = np.asarray(values, dtype=float)
+    if method == "rank":
+        order = np.argsort(np.argsort(np.nan_to_num(v, nan=np.inf), kind="stable"), kind="stable")
+        norm = order / max(len(v) - 1, 1)
+    else:
+        # min-max robusto: corta nos quantis para outliers não achatarem o resto
+        finite = v[np.isfinite(v)]
+        lo, hi = np.quantile(finite, CLIP_QUANTILES) if len(finite) else (0.0, 0.0)
+        norm = (np.clip(v, lo, hi) - lo) / (hi - lo) if hi > lo else np.zeros(len(v))
+    if sense == "max":
+        norm = 1 - norm
+    return np.where(np.isnan(norm), 1.0, norm)
+
+
+class RankingEngine:
+    def __init__(self, df, criteria=CRITERIA, method="minmax"):
+        self.df = df.reset_index(drop=True)
+        self.columns = [c for c in criteria if c in self.df]
+        # Matriz normalizada (n x critérios) calculada uma vez; mudar pesos só refaz a combinação
+        self.matrix = np.column_stack([
+            normalize(self.df[c].values, criteria[c], method) for c in self.columns
+        ]) if len(self.df) else np.zeros((0, len(self.columns)))
+        self._weights = np.zeros(len(self.columns))
+        self._raw = np.zeros(len(self.df))
+        self._lock = threading.Lock()
+
+    def scores(self, weights):
+        w = np.array([float(weights.get(c, 0.0)) for c in self.columns])
+        with self._lock:
+            # Re-score incremental: só as colunas cujo peso mudou entram na atualização
+            changed = np.flatnonzero(w != self._weights)
+            if len(changed):
+                self._raw = self._raw + self.matrix[:, changed] @ (w[changed] - self._weights[changed])
+                self._weights = w
+            raw = self._raw
+        total = w.sum()
+        return raw / total if total > 0 else np.zeros(len(self.df))
+
+    def top(self, weights, k):
+        s = self.scores(weights)
+        idx = top_k(s, k)
+        out = self.df.iloc[idx].reset_index(drop=True)
+        out["score"] = 1 - s[idx]
+        return out
@@ -0,0 +1,66 @@
+# core/reachability.py - isócronas pré-calculadas: "escola a até N min a pé" vira coluna booleana
+import numpy as np
+
+# categoria -> (modo, coluna de minutos pela malha viária, coluna de km em linha reta, limites em minutos)
+REACH = {
+    "sch": ("walk", "walk_sch_min", "dist_sch", (10, 15, 20)),
+    "sup": ("drive", "drive_sup_min", "dist_sup", (5, 10, 15)),
+}
+# Sem grafo (ou imóvel fora do extrato): faixa de distância = km em linha reta x desvio médio da malha
+BAND_KMH = {"walk": 5.0, "drive": 30.0}
+DETOUR = 1.3
+REACH_LABELS = {"sch": "Escola", "sup": "Supermercado"}
+MODE_LABELS = {"walk": "a pé", "drive": "de carro"}
+
+
+def reach_column(category, minutes):
+    mode = REACH[category][0]
+    return f"reach_{category}_{mode}_{minutes}"
+
+
+REACH_COLUMNS = [reach_column(c, m) for c, (_, _, _, limits) in REACH.items() for m in limits]
+
+
+def reach_label(column):
+    _, category, mode, minutes = column.split("_")
+    return f"{REACH_LABELS[category]} {MODE_LABELS[mode]} ≤ {minutes} min"
+
+
+def travel_minutes(df, category):
+    # Minutos até o POI mais próximo: rota real (gold com malha) e, onde faltar, faixa de distância
+    mode, time_col, dist_col, _ = REACH[category]
+    band = df[dist_col].to_numpy(dtype=float) * DETOUR / BAND_KMH[mode] * 60
+    if time_col not in df:
+        return band
+    routed = df[time_col].to_numpy(dtype=float)
+    return np.where(np.isnan(routed), band, routed)
+
+
+def add_reachability(df):
+    # Uma coluna bool por (categoria, limite); filtrar por alcance custa o mesmo que filtrar por quartos
+    out = df.copy()
+    for category, (_, _, _, limits) in REACH.items():
+        minutes = travel_minutes(out, category)
+        for limit in limits:
+            out[reach_column(category, limit)] = minutes <= limit
+    return out
+
+
+def has_reachability(df):
+    return set(REACH_COLUMNS).issubset(df.columns)
+
+
+def reach_mask(df, reach):
+    # reach: colunas pedidas (todas precisam valer)
+    mask = np.ones(len(df), dtype=bool)
+    for column in reach:
+        mask &= df[column].to_numpy(dtype=bool)
+    return mask
+
+
+def reach_filter(df, filters):
+    # Estágio pós-enriquecimento: calcula as colunas se faltarem (bronze) e aplica o filtro de alcance
+    if not has_reachability(df):
+        df = add_reachability(df)
+    reach = filters.get("reach") or []
+    return df[reach_mask(df, reach)].reset_index(drop=True) if reach else df
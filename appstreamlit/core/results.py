@@ -0,0 +1,49 @@
+# core/results.py - top-K por seleção parcial + paginação por cursor (keyset)
+import numpy as np
+
+PAGE_SIZE = 50
+
+
+def top_k(values, k, mask=None):
+    # Índices dos k menores valores, ordenados; O(n + k log k) via argpartition
+    values = np.asarray(values, dtype=float)
+    idx = np.arange(len(values)) if mask is None else np.flatnonzero(mask)
+    if len(idx) == 0 or k <= 0:
+        return idx[:0]
+    if len(idx) > k:
+        # Mantém todos os empates do k-ésimo valor para o desempate por posição ser exato
+        kth = np.partition(values[idx], k - 1)[k - 1]
+        idx = idx[values[idx] <= kth]
+    # Desempate pela posição original para a ordem ser estável entre páginas
+    return idx[np.lexsort((idx, values[idx]))[:k]]
+
+
+def keyset_page(values, cursor=None, page_size=PAGE_SIZE, mask=None):
+    # cursor = (último valor, último rowid) da página anterior; None = primeira página.
+    # Devolve (índices da página, cursor da próxima ou None); NaN vai para o fim
+    values = np.nan_to_num(np.asarray(values, dtype=float), nan=np.inf)
+    if cursor is not None:
+        last_value, last_id = cursor
+        rowid = np.arange(len(values))
+        after = (values > last_value) | ((values == last_value) & (rowid > last_id))
+        mask = after if mask is None else mask & after
+    idx = top_k(values, page_size, mask)
+    remaining = (len(values) if mask is None else int(mask.sum())) - len(idx)
+    next_cursor = None
+    if remaining > 0:
+        next_cursor = (float(values[idx[-1]]), int(idx[-1]))
+    return idx, next_cursor
+
+
+class ResultPager:
+    def __init__(self, df, sort_col="unit_price", page_size=PAGE_SIZE):
+        self.df = df.reset_index(drop=True)
+        self.values = np.nan_to_num(self.df[sort_col].to_numpy(dtype=float), nan=np.inf)
+        self.page_size = page_size
+
+    def __len__(self):
+        return len(self.df)
+
+    def page(self, cursor=None):
+        idx, next_cursor = keyset_page(self.values, cursor, self.page_size)
+        return self.df.iloc[idx].reset_index(drop=True), next_cursor
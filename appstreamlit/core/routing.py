@@ -0,0 +1,316 @@
+# core/routing.py - tempos de viagem offline num grafo viário (extrato OSM local), sem chamadas externas
+import bz2
+import gzip
+import heapq
+import logging
+import os
+import xml.etree.ElementTree as ET
+import numpy as np
+from core.distance import haversine_np
+
+log = logging.getLogger(__name__)
+
+# Velocidades (km/h) por tipo de via; maxspeed da via, quando existe, tem prioridade na direção
+DRIVE_SPEEDS = {
+    "motorway": 100, "motorway_link": 60, "trunk": 80, "trunk_link": 50,
+    "primary": 60, "primary_link": 45, "secondary": 50, "secondary_link": 40,
+    "tertiary": 40, "tertiary_link": 30, "unclassified": 30, "residential": 30,
+    "living_street": 10, "service": 15, "road": 30,
+}
+WALK_EXCLUDED = {"motorway", "motorway_link", "trunk", "trunk_link", "construction", "proposed", "raceway", "bus_guideway"}
+WALK_KMH = 5.0
+# Trecho imóvel/POI -> nó mais próximo da malha (garagem, calçada); acima de SNAP_M fica sem rota
+SNAP_KMH = {"drive": 15.0, "walk": WALK_KMH}
+SNAP_M = 400
+MODES = ("drive", "walk")
+
+
+def _open(path):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rb")
+    if path.endswith(".bz2"):
+        return bz2.open(path, "rb")
+    return open(path, "rb")
+
+
+def _maxspeed(value):
+    # "45 mph" / "60" (km/h) -> km/h; inválido -> None
+    try:
+        number, *unit = value.split()
+        return float(number) * (1.609344 if unit and unit[0] == "mph" else 1.0)
+    except (AttributeError, ValueError):
+        return None
+
+
+def parse_osm(path):
+    # Lê um extrato .osm (XML, opcionalmente .gz/.bz2) em streaming: nós + vias com highway
+    ids, lats, lons, ways = [], [], [], []
+    root = None
+    with _open(path) as f:
+        for event, el in ET.iterparse(f, events=("start", "end")):
+            if root is None:
+                root = el
+            if event != "end" or el.tag not in ("node", "way", "relation"):
+                continue
+            if el.tag == "node":
+                ids.append(int(el.get("id")))
+                lats.append(float(el.get("lat")))
+                lons.append(float(el.get("lon")))
+            elif el.tag == "way":
+                tags = {t.get("k"): t.get("v") for t in el.iter("tag")}
+                if "highway" in tags and tags.get("area") != "yes":
+                    ways.append((np.array([int(nd.get("ref")) for nd in el.iter("nd")], dtype=np.int64), tags))
+            # Memória constante: descarta o que já foi lido
+            root.clear()
+    order = np.argsort(ids)
+    return np.asarray(ids, dtype=np.int64)[order], np.asarray(lats)[order], np.asarray(lons)[order], ways
+
+
+def _way_edges(tags, mode):
+    # (segundos por km, sentido): 1 = só ida, -1 = só volta, 0 = mão dupla; None = via não serve ao modo
+    highway, access = tags["highway"], tags.get("access")
+    if access in ("no", "private"):
+        return None
+    if mode == "walk":
+        if highway in WALK_EXCLUDED or tags.get("foot") == "no":
+            return None
+        return 3600 / WALK_KMH, 0
+    if highway not in DRIVE_SPEEDS or tags.get("motor_vehicle") == "no":
+        return None
+    kmh = _maxspeed(tags.get("maxspeed")) or DRIVE_SPEEDS[highway]
+    oneway = tags.get("oneway", "yes" if highway in ("motorway", "motorway_link") or tags.get("junction") == "roundabout" else "no")
+    return 3600 / kmh, {"yes": 1, "1": 1, "true": 1, "-1": -1}.get(oneway, 0)
+
+
+class RoadGraph:
+    # Grafo compacto em CSR (indptr/indices/seconds) só com cruzamentos e pontas de via:
+    # nós intermediários de forma (a maioria no OSM) viram comprimento acumulado da aresta.
+    def __init__(self, lat, lon, indptr, indices, seconds, mode):
+        self.lat, self.lon = lat, lon
+        self.indptr, self.indices, self.seconds = indptr, indices, seconds
+        self.mode = mode
+        self._lists = None
+        self._grid = None
+        self._reverse = None
+
+    @classmethod
+    def from_osm(cls, node_ids, node_lat, node_lon, ways, mode):
+        refs, wid, pace, direction = [], [], [], []
+        for nds, tags in ways:
+            edge = _way_edges(tags, mode)
+            if edge is None or len(nds) < 2:
+                continue
+            refs.append(nds)
+            wid.append(np.full(len(nds), len(pace)))
+            pace.append(edge[0])
+            direction.append(edge[1])
+        if not refs:
+            empty = np.zeros(0)
+            return cls(empty, empty, np.zeros(1, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0), mode)
+        refs, wid = np.concatenate(refs), np.concatenate(wid)
+        pos = np.searchsorted(node_ids, refs).clip(0, len(node_ids) - 1)
+        known = np.flatnonzero(node_ids[pos] == refs)
+        # Referência a nó fora do extrato (recorte da região): a via é quebrada ali
+        piece = np.cumsum(np.r_[True, (wid[known][1:] != wid[known][:-1]) | (np.diff(known) != 1)])
+        refs, wid, pos = refs[known], wid[known], pos[known]
+        lat, lon = node_lat[pos], node_lon[pos]
+
+        # Cruzamento = nó usado mais de uma vez (entre vias ou na mesma) ou ponta de trecho
+        _, inverse, counts = np.unique(refs, return_inverse=True, return_counts=True)
+        first = np.r_[True, piece[1:] != piece[:-1]]
+        last = np.r_[piece[1:] != piece[:-1], True]
+        junction = (counts[inverse] > 1) | first | last
+
+        seg = np.r_[0.0, haversine_np(lat[:-1], lon[:-1], lat[1:], lon[1:])]
+        seg[first] = 0.0
+        cum = np.cumsum(seg)
+        j = np.flatnonzero(junction)
+        same = piece[j[1:]] == piece[j[:-1]]
+        a, b = j[:-1][same], j[1:][same]
+        km = cum[b] - cum[a]
+        pace, direction = np.asarray(pace), np.asarray(direction)
+        secs = km * pace[wid[a]]
+        d = direction[wid[a]]
+
+        # Renumera só os cruzamentos (nós do grafo)
+        keep_nodes = np.unique(inverse[j])
+        node_of = np.full(len(counts), -1)
+        node_of[keep_nodes] = np.arange(len(keep_nodes))
+        src, dst = node_of[inverse[a]], node_of[inverse[b]]
+        fwd, bwd = d >= 0, d <= 0
+        u = np.r_[src[fwd], dst[bwd]]
+        v = np.r_[dst[fwd], src[bwd]]
+        w = np.r_[secs[fwd], secs[bwd]]
+        glat = np.zeros(len(keep_nodes))
+        glon = np.zeros(len(keep_nodes))
+        glat[node_of[inverse[j]]] = lat[j]
+        glon[node_of[inverse[j]]] = lon[j]
+        return cls._from_edges(glat, glon, u, v, w, mode)
+
+    @classmethod
+    def _from_edges(cls, lat, lon, u, v, w, mode):
+        order = np.lexsort((v, u))
+        indptr = np.r_[0, np.cumsum(np.bincount(u, minlength=len(lat)))].astype(np.int64)
+        return cls(lat, lon, indptr, v[order].astype(np.int64), w[order].astype(float), mode)
+
+    def __len__(self):
+        return len(self.lat)
+
+    @property
+    def edges(self):
+        return len(self.indices)
+
+    def reversed(self):
+        # Arestas invertidas (tempo "até" um destino = busca a partir dele no reverso); a pé é simétrico
+        if self.mode == "walk":
+            return self
+        if self._reverse is None:
+            u = np.repeat(np.arange(len(self)), np.diff(self.indptr))
+            self._reverse = RoadGraph._from_edges(self.lat, self.lon, self.indices, u, self.seconds, self.mode)
+        return self._reverse
+
+    def snap(self, lat, lon, max_m=SNAP_M):
+        # Nó mais próximo de cada ponto (grade de células de lado max_m, só 9 vizinhas); -1 se longe da malha
+        lat, lon = np.asarray(lat, dtype=float), np.asarray(lon, dtype=float)
+        node, dist_km = np.full(len(lat), -1), np.full(len(lat), np.inf)
+        if not len(self) or not len(lat):
+            return node, dist_km
+        if self._grid is None or self._grid[0] != max_m:
+            cos0 = np.cos(np.radians(np.mean(self.lat)))
+            keys = _cell(self.lat, self.lon, cos0, max_m)
+            order = np.argsort(keys, kind="stable")
+            self._grid = (max_m, cos0, order, keys[order])
+        _, cos0, order, sorted_keys = self._grid
+        cx, cy = _cell(lat, lon, cos0, max_m, split=True)
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                target = ((cx + dx) << 32) + ((cy + dy) & 0xFFFFFFFF)
+                lo = np.searchsorted(sorted_keys, target, side="left")
+                counts = np.searchsorted(sorted_keys, target, side="right") - lo
+                if not counts.any():
+                    continue
+                i = np.repeat(np.arange(len(lat)), counts)
+                cand = order[np.repeat(lo - np.cumsum(np.r_[0, counts[:-1]]), counts) + np.arange(counts.sum())]
+                d = haversine_np(lat[i], lon[i], self.lat[cand], self.lon[cand])
+                # Menor candidato por ponto: ordena por (ponto, distância) e pega o primeiro de cada grupo
+                o = np.lexsort((d, i))
+                i, cand, d = i[o], cand[o], d[o]
+                head = np.r_[True, i[1:] != i[:-1]]
+                i, cand, d = i[head], cand[head], d[head]
+                better = d < dist_km[i]
+                node[i[better]], dist_km[i[better]] = cand[better], d[better]
+        far = dist_km * 1000 > max_m
+        node[far], dist_km[far] = -1, np.inf
+        return node, dist_km
+
+    def multi_source(self, sources, start_seconds=None, limit=None):
+        # Dijkstra com várias origens de uma vez: (segundos até a origem mais perto, índice dessa origem).
+        # limit (s) corta a busca (isócronas); nós não alcançados ficam com inf / -1.
+        if self._lists is None:
+            self._lists = (self.indptr.tolist(), self.indices.tolist(), self.seconds.tolist())
+        indptr, indices, seconds = self._lists
+        n = len(self)
+        dist, label = [float("inf")] * n, [-1] * n
+        start = np.zeros(len(sources)) if start_seconds is None else np.asarray(start_seconds, dtype=float)
+        heap = []
+        for k, (s, t) in enumerate(zip(np.asarray(sources).tolist(), start.tolist())):
+            if s >= 0 and t < dist[s]:
+                dist[s], label[s] = t, k
+                heap.append((t, s))
+        heapq.heapify(heap)
+        limit = float("inf") if limit is None else limit
+        while heap:
+            d, u = heapq.heappop(heap)
+            if d > dist[u]:
+                continue
+            lab = label[u]
+            for e in range(indptr[u], indptr[u + 1]):
+                nd = d + seconds[e]
+                v = indices[e]
+                if nd < dist[v] and nd <= limit:
+                    dist[v], label[v] = nd, lab
+                    heapq.heappush(heap, (nd, v))
+        return np.asarray(dist), np.asarray(label)
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = path + ".tmp.npz"
+        np.savez(tmp, lat=self.lat, lon=self.lon, indptr=self.indptr, indices=self.indices, seconds=self.seconds, mode=self.mode)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as z:
+            return cls(z["lat"], z["lon"], z["indptr"], z["indices"], z["seconds"], str(z["mode"]))
+
+
+def _cell(lat, lon, cos0, size_m, split=False):
+    cx = np.floor(lon * 111_320.0 * cos0 / size_m).astype(np.int64)
+    cy = np.floor(lat * 110_540.0 / size_m).astype(np.int64)
+    return (cx, cy) if split else (cx << 32) + (cy & 0xFFFFFFFF)
+
+
+def load_graphs(osm_path, modes=MODES, cache_dir=None):
+    # Grafos por modo; versão compacta (.npz) reaproveitada enquanto o extrato não mudar
+    cache_dir = cache_dir or os.path.dirname(osm_path) or "."
+    base = os.path.join(cache_dir, os.path.basename(osm_path).split(".")[0])
+    mtime = os.path.getmtime(osm_path)
+    graphs, missing = {}, []
+    for mode in modes:
+        path = f"{base}.{mode}.npz"
+        if os.path.exists(path) and os.path.getmtime(path) >= mtime:
+            graphs[mode] = RoadGraph.load(path)
+        else:
+            missing.append(mode)
+    if missing:
+        parsed = parse_osm(osm_path)
+        for mode in missing:
+            graphs[mode] = RoadGraph.from_osm(*parsed, mode)
+            graphs[mode].save(f"{base}.{mode}.npz")
+            log.info("grafo %s: %d nós, %d arestas", mode, len(graphs[mode]), graphs[mode].edges)
+    return graphs
+
+
+def nearest_by_time(graph, lat, lon, poi_lat, poi_lon, limit=None):
+    # POI de menor tempo para cada imóvel numa única busca multi-origem (a partir dos POIs, no grafo
+    # reverso). Retorna (índice do POI ou -1, segundos ou inf); inclui o trecho até a malha nas pontas.
+    pace = 3.6 / SNAP_KMH[graph.mode]  # segundos por metro
+    poi_node, poi_km = graph.snap(poi_lat, poi_lon)
+    dist, label = graph.reversed().multi_source(poi_node, poi_km * 1000 * pace, limit)
+    node, km = graph.snap(lat, lon)
+    ok = node >= 0
+    idx, seconds = np.full(len(node), -1), np.full(len(node), np.inf)
+    seconds[ok] = dist[node[ok]] + km[ok] * 1000 * pace
+    idx[ok] = label[node[ok]]
+    if limit is not None:
+        seconds[seconds > limit] = np.inf
+    idx[~np.isfinite(seconds)] = -1
+    return idx, seconds
+
+
+# Colunas de tempo: supermercado de carro, escola a pé (mesmos destinos dos links do popup)
+TRAVEL = (("sup", "drive", "drive_sup_min"), ("sch", "walk", "walk_sch_min"))
+TRAVEL_COLUMNS = [col for _, _, col in TRAVEL]
+
+
+def enrich_travel(df, graphs, supermarkets, schools):
+    # Troca o POI "mais próximo em linha reta" pelo de menor tempo real onde houver rota e adiciona
+    # os minutos; sem grafo/rota mantém o enriquecimento por haversine e o tempo fica NaN.
+    out = df.copy()
+    lat, lon = out["Lat"].to_numpy(dtype=float), out["Lon"].to_numpy(dtype=float)
+    for (prefix, mode, col), pois in zip(TRAVEL, (supermarkets, schools)):
+        out[col] = np.nan
+        if mode not in graphs or pois is None or pois.empty or out.empty:
+            continue
+        idx, seconds = nearest_by_time(graphs[mode], lat, lon, pois["lat"].values, pois["lon"].values)
+        ok = idx >= 0
+        sel = idx[ok]
+        for field in ("name", "lat", "lon"):
+            values = out[f"{prefix}_{field}"].to_numpy(dtype=object if field == "name" else float, copy=True)
+            values[ok] = pois[field].values[sel]
+            out[f"{prefix}_{field}"] = values
+        dist = out[f"dist_{prefix}"].to_numpy(dtype=float, copy=True)
+        dist[ok] = haversine_np(lat[ok], lon[ok], out[f"{prefix}_lat"].values[ok], out[f"{prefix}_lon"].values[ok])
+        out[f"dist_{prefix}"] = dist
+        out[col] = np.where(ok, seconds / 60, np.nan)
+    return out
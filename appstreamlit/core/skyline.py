@@ -0,0 +1,70 @@
+# core/skyline.py - fronteira de Pareto ("melhores ofertas") em 3 critérios, tudo minimizado
+import numpy as np
+
+SKYLINE_COLUMNS = ["unit_price", "dist_sch", "dist_sup"]
+N_PIVOTS = 32
+MISSING = np.finfo(float).max
+
+
+class _MinFenwick:
+    # Árvore de Fenwick com mínimo de prefixo (posições 1..n)
+    def __init__(self, n):
+        self.n = n
+        self.tree = [np.inf] * (n + 1)
+
+    def update(self, i, value):
+        while i <= self.n:
+            if value < self.tree[i]:
+                self.tree[i] = value
+            i += i & -i
+
+    def query(self, i):
+        best = np.inf
+        while i > 0:
+            if self.tree[i] < best:
+                best = self.tree[i]
+            i -= i & -i
+        return best
+
+
+def _pivot_prefilter(pts):
+    # Descarta em bloco o que é dominado por alguns pontos "bons" (menor soma de ranks)
+    ranks = np.argsort(np.argsort(pts, axis=0), axis=0).sum(axis=1)
+    pivots = pts[np.argsort(ranks)[:N_PIVOTS]]
+    keep = np.ones(len(pts), dtype=bool)
+    for i in range(0, len(pts), 65536):
+        chunk = pts[i:i + 65536, None, :]
+        le = (pivots[None, :, :] <= chunk).all(axis=2)
+        lt = (pivots[None, :, :] < chunk).any(axis=2)
+        keep[i:i + 65536] = ~(le & lt).any(axis=1)
+    return keep
+
+
+def skyline(df, columns=SKYLINE_COLUMNS):
+    # Máscara booleana dos imóveis que nenhum outro supera em todos os critérios ao mesmo tempo.
+    # Ordena por (c0, c1, c2); um ponto é dominado se algum anterior tem c1 <= e c2 <= (Fenwick por rank de c1).
+    n = len(df)
+    mask = np.zeros(n, dtype=bool)
+    if n == 0:
+        return mask
+    # Valor ausente (NaN/inf) = pior valor, mas comparável: sentinela finita, porque a consulta estrita do
+    # Fenwick (> inf) marcaria o ponto como dominado mesmo sendo o melhor nos outros critérios
+    pts = np.nan_to_num(df[columns].to_numpy(dtype=float), nan=MISSING, posinf=MISSING)
+    cand = np.flatnonzero(_pivot_prefilter(pts))
+    p = pts[cand]
+
+    order = np.lexsort((p[:, 2], p[:, 1], p[:, 0]))
+    p, cand = p[order], cand[order]
+    rank1 = np.searchsorted(np.unique(p[:, 1]), p[:, 1]) + 1
+    tree = _MinFenwick(int(rank1.max()))
+
+    # Triplas idênticas não se dominam: consulta o grupo inteiro antes de inserir
+    same = np.r_[False, (p[1:] == p[:-1]).all(axis=1)]
+    starts = np.flatnonzero(~same)
+    ends = np.r_[starts[1:], len(p)]
+    col1, col2 = rank1.tolist(), p[:, 2].tolist()
+    for a, b in zip(starts.tolist(), ends.tolist()):
+        if tree.query(col1[a]) > col2[a]:
+            mask[cand[a:b]] = True
+        tree.update(col1[a], col2[a])
+    return mask
@@ -0,0 +1,46 @@
+# jobs/build_gold.py - bronze -> gold (POI mais próximo + tempo de viagem + score por cidade) em Parquet
+# Uso (de dentro de appstreamlit/):  python -m jobs.build_gold [--offline] [--workers 8] [--city Katy ...] [--roads extrato.osm]
+import argparse
+import logging
+import os
+import time
+from config.settings import CSV_PATH, GOLD_PATH, GOLD_POIS_PATH, ROAD_NETWORK_PATH
+from core.data_loader import load_properties
+from core.gold import build_gold, city_pois, poi_file, write_gold
+from core.pois import warm_areas
+from core.routing import load_graphs
+
+log = logging.getLogger("jobs.build_gold")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gera a camada gold a partir do bronze")
+    parser.add_argument("--bronze", default=CSV_PATH)
+    parser.add_argument("--out", default=GOLD_PATH)
+    parser.add_argument("--pois-out", default=GOLD_POIS_PATH)
+    parser.add_argument("--city", action="append", help="Só estas cidades (pode repetir)")
+    parser.add_argument("--offline", action="store_true", help="Não chama o Overpass; usa só POIs em cache")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Processos para o enriquecimento")
+    parser.add_argument("--roads", default=ROAD_NETWORK_PATH, help="Extrato OSM para tempos de carro/a pé (ignorado se não existir)")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    t0 = time.perf_counter()
+    listings = load_properties(args.bronze)
+    cities = [c.title() for c in args.city] if args.city else None
+    if not args.offline:
+        # Busca concorrente das áreas ainda sem arquivo em .cache_osm (limites globais de core.net)
+        areas = listings[["State", "City"]].assign(City=listings["City"].str.title()).drop_duplicates()
+        missing = [(s, c) for s, c in areas.itertuples(index=False) if (not cities or c in cities) and not os.path.exists(poi_file(s, c))]
+        if missing:
+            warm_areas(listings, missing)
+    graphs = load_graphs(args.roads) if args.roads and os.path.exists(args.roads) else None
+    if graphs is None:
+        log.info("sem extrato viário em %s: só distâncias em linha reta", args.roads)
+    gold, pois = build_gold(listings, lambda df, s, c: city_pois(df, s, c, offline=args.offline), cities, args.workers, graphs)
+    write_gold(gold, pois, args.out, args.pois_out)
+    log.info("gold: %d imóveis, %d POIs -> %s (%.1fs)", len(gold), len(pois), args.out, time.perf_counter() - t0)
+
+
+if __name__ == "__main__":
+    main()
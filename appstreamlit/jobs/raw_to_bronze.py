@@ -0,0 +1,110 @@
+# jobs/raw_to_bronze.py - raw (dataset/raw/*.csv) -> bronze, em blocos e incremental (manifesto)
+# Uso (de dentro de appstreamlit/):  python -m jobs.raw_to_bronze [--full] [--raw ../dataset/raw]
+# Só arquivos novos/alterados (sha1) são lidos; a mesma unidade (endereço + quartos + preço + URL) fica com o dado mais novo.
+# Memória: um arquivo raw é lido em blocos, mas o bronze dele e o bronze inteiro ficam em memória até a regravação.
+import argparse
+import glob
+import hashlib
+import json
+import logging
+import os
+import time
+import pandas as pd
+from config.settings import BRONZE_MANIFEST, CSV_PATH, ETL_CHUNK_SIZE, RAW_DIR
+from core.bronze import BRONZE_COLUMNS, merge_bronze, normalize_chunk, read_bronze
+
+log = logging.getLogger("jobs.raw_to_bronze")
+
+
+def file_sha1(path, block=1 << 20):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for data in iter(lambda: f.read(block), b""):
+            h.update(data)
+    return h.hexdigest()
+
+
+def load_manifest(path):
+    if os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+    return {"files": {}}
+
+
+def _atomic_write(path, write):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.tmp"
+    write(tmp)
+    os.replace(tmp, path)
+
+
+def _write_json(path, data):
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+
+
+def transform_file(path, chunk_size=ETL_CHUNK_SIZE):
+    # Lê em blocos (tudo como texto; tipos vêm da normalização) e devolve (bronze do arquivo, linhas lidas)
+    name = os.path.basename(path)
+    parts, rows_in = [], 0
+    for chunk in pd.read_csv(path, chunksize=chunk_size, dtype="string", on_bad_lines="warn"):
+        rows_in += len(chunk)
+        parts.append(merge_bronze(None, normalize_chunk(chunk, name)))
+    new = merge_bronze(None, pd.concat(parts, ignore_index=True)) if parts else pd.DataFrame(columns=BRONZE_COLUMNS)
+    return new, rows_in
+
+
+def run(raw_dir=RAW_DIR, out=CSV_PATH, manifest_path=BRONZE_MANIFEST, full=False, chunk_size=ETL_CHUNK_SIZE):
+    manifest = {"files": {}} if full else load_manifest(manifest_path)
+    bronze = None if full or not os.path.exists(out) else read_bronze(out)
+    # Mais antigos primeiro: o arquivo mais recente vence nas chaves repetidas
+    paths = sorted(glob.glob(os.path.join(raw_dir, "*.csv")), key=os.path.getmtime)
+    pending = []
+    for path in paths:
+        digest = file_sha1(path)
+        if manifest["files"].get(os.path.basename(path), {}).get("sha1") != digest:
+            pending.append((path, digest))
+    if not pending:
+        log.info("Nada novo em %s (%d arquivos no manifesto)", raw_dir, len(manifest["files"]))
+        return bronze
+
+    # Arquivo alterado substitui tudo o que veio dele: linhas apagadas ou com preço editado não ficam para trás
+    if bronze is not None:
+        reprocessed = {os.path.basename(path) for path, _ in pending}
+        bronze = bronze[~bronze["source_file"].isin(reprocessed)].reset_index(drop=True)
+
+    for path, digest in pending:
+        t0 = time.perf_counter()
+        new, rows_in = transform_file(path, chunk_size)
+        before = 0 if bronze is None else len(bronze)
+        bronze = merge_bronze(bronze, new)
+        manifest["files"][os.path.basename(path)] = {
+            "sha1": digest,
+            "rows_in": rows_in,
+            "rows_out": len(new),
+            "processed_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        log.info("%s: %d linhas raw -> %d unidades (%+d no bronze) em %.1fs",
+                 os.path.basename(path), rows_in, len(new), len(bronze) - before, time.perf_counter() - t0)
+
+    # Bronze antes do manifesto: se cair no meio, os arquivos são reprocessados (merge é idempotente)
+    _atomic_write(out, lambda tmp: bronze.to_csv(tmp, index=False))
+    _atomic_write(manifest_path, lambda tmp: _write_json(tmp, manifest))
+    log.info("bronze: %d linhas -> %s", len(bronze), out)
+    return bronze
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gera/atualiza o bronze a partir de dataset/raw")
+    parser.add_argument("--raw", default=RAW_DIR)
+    parser.add_argument("--out", default=CSV_PATH)
+    parser.add_argument("--manifest", default=BRONZE_MANIFEST)
+    parser.add_argument("--full", action="store_true", help="Ignora manifesto e bronze atual; reprocessa tudo")
+    parser.add_argument("--chunk-size", type=int, default=ETL_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    run(args.raw, args.out, args.manifest, args.full, args.chunk_size)
+
+
+if __name__ == "__main__":
+    main()
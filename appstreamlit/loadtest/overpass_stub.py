@@ -0,0 +1,101 @@
+# loadtest/overpass_stub.py - Overpass local e determinístico para teste de carga (sem rede externa)
+# Uso: python -m loadtest.overpass_stub --port 8999 --delay 0.3
+#      OVERPASS_SERVERS=http://127.0.0.1:8999/api/interpreter streamlit run app.py
+import argparse
+import json
+import re
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+import numpy as np
+
+AROUND = re.compile(r"around:(\d+(?:\.\d+)?),([-\d.,]+)\)")
+BBOX = re.compile(r"\(([-\d.]+),([-\d.]+),([-\d.]+),([-\d.]+)\)")
+PER_POINT = 3         # POIs gerados por ponto do around (metade supermercados, metade escolas)
+PER_BBOX = 60
+BRANDS = ["Walmart", "HEB", "Kroger", "Target", "Costco", "Aldi"]
+
+
+def _elements(lat, lon, spread, n, seed):
+    # Mesma entrada -> mesmos POIs (ids estáveis), como o Overpass real
+    rng = np.random.default_rng(seed)
+    out = []
+    for i in range(n):
+        eid = seed * 1000 + i
+        tags = {"shop": "supermarket", "name": BRANDS[eid % len(BRANDS)]} if i % 2 == 0 else {"amenity": "school", "name": f"Stub Elementary {eid}"}
+        out.append({"type": "node", "id": eid, "lat": lat + rng.uniform(-spread, spread), "lon": lon + rng.uniform(-spread, spread), "tags": tags})
+    return out
+
+
+def answer(query, per_point=PER_POINT, per_bbox=PER_BBOX):
+    around = AROUND.search(query)
+    if around:
+        radius = float(around.group(1))
+        coords = [float(c) for c in around.group(2).split(",") if c]
+        spread = radius / 111_000
+        elements, seen = [], set()
+        for lat, lon in zip(coords[0::2], coords[1::2]):
+            key = (round(lat, 2), round(lon, 2))
+            if key in seen:
+                continue
+            seen.add(key)
+            elements += _elements(lat, lon, spread, per_point, zlib.crc32(repr(key).encode()) & 0xFFFFF)
+        return elements
+    bbox = BBOX.search(query)
+    if bbox:
+        # Consulta por bbox (OSMFetcher) pede um tipo só: devolve só as tags pedidas
+        s, w, n, e = map(float, bbox.groups())
+        elements = _elements((s + n) / 2, (w + e) / 2, max(n - s, e - w) / 2, per_bbox, zlib.crc32(bbox.group(0).encode()) & 0xFFFFF)
+        wanted = "shop" if '"shop"' in query else "amenity"
+        return [el for el in elements if wanted in el["tags"]]
+    return []
+
+
+class Handler(BaseHTTPRequestHandler):
+    delay = 0.0
+    requests = 0
+    lock = threading.Lock()
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0)).decode()
+        query = parse_qs(body).get("data", [""])[0]
+        with Handler.lock:
+            Handler.requests += 1
+        time.sleep(self.delay)
+        payload = json.dumps({"elements": answer(query)}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+def start(port=0, delay=0.0):
+    # Sobe em thread daemon; retorna (servidor, url do interpreter)
+    Handler.delay = delay
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/api/interpreter"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Overpass local para testes")
+    parser.add_argument("--port", type=int, default=8999)
+    parser.add_argument("--delay", type=float, default=0.0, help="Latência simulada por requisição (s)")
+    args = parser.parse_args(argv)
+    server, url = start(args.port, args.delay)
+    print(f"Overpass stub em {url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+# loadtest/run.py - N sessões simultâneas do app.py (AppTest, sem navegador) contra o Overpass stub
+# Uso (de dentro de appstreamlit/):
+#   python -m loadtest.run --sessions 1 4 8 16 --actions 10 --overpass-delay 0.3
+# Cada nível de concorrência roda num processo novo (caches frios); cada sessão roda no seu próprio processo:
+# o AppTest usa o Runtime global do Streamlit, que não aceita dois scripts em threads do mesmo processo.
+# Caches por processo (cache_resource, LRU) não são compartilhados entre sessões; o SHARED_CACHE_URL é.
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from multiprocessing import get_context
+import numpy as np
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+PERCENTILES = (50, 90, 95, 99)
+
+
+def _act(at, rng, agg):
+    # Uma mudança de filtro "realista": estado, cidade, quartos ou faixa de preço.
+    # Valores crus vêm dos agregados (as opções do widget no AppTest são rótulos formatados, ex. "Katy (12)")
+    kind = rng.choice(["city", "city", "beds", "price", "price", "state"])
+    state = at.selectbox(key="state_selectbox").value
+    if kind == "state":
+        at.selectbox(key="state_selectbox").set_value(rng.choice(agg.states))
+    elif kind == "city":
+        at.selectbox(key="city_selectbox").set_value(rng.choice([""] + agg.cities.get(state, [])))
+    elif kind == "beds":
+        options = agg.area(state, at.selectbox(key="city_selectbox").value)["beds"]
+        at.multiselect[0].set_value(rng.sample(options, k=rng.randint(1, min(3, len(options)))) if options else [])
+    else:
+        slider = at.slider[0]
+        lo, hi = slider.min, slider.max
+        a = rng.uniform(lo, lo + (hi - lo) * 0.4)
+        slider.set_range(int(a), int(rng.uniform(a + (hi - lo) * 0.1, hi)))
+    return kind
+
+
+def _rss():
+    # RSS atual do processo (Linux: /proc)
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def _sampler(stop, out, interval=0.5):
+    while not stop.wait(interval):
+        try:
+            out.append(_rss())
+        except OSError:
+            return
+
+
+def session(session_id, actions, timeout, think):
+    # Processo filho: uma sessão do app; devolve as amostras de latência e a memória do processo
+    from streamlit.testing.v1 import AppTest
+    from core.aggregates import Aggregates
+    from core.data_loader import load_properties
+    agg = Aggregates.from_frame(load_properties())
+    rng = random.Random(session_id)
+    at = AppTest.from_file(APP, default_timeout=timeout)
+    rss, stop = [], threading.Event()
+    threading.Thread(target=_sampler, args=(stop, rss), daemon=True).start()
+    samples = []
+    for step in range(actions + 1):
+        kind = "initial" if step == 0 else _act(at, rng, agg)
+        t0 = time.perf_counter()
+        at.run()
+        t1 = time.perf_counter()
+        samples.append({"session": session_id, "action": kind, "seconds": t1 - t0, "start": t0, "end": t1, "error": bool(at.exception)})
+        time.sleep(rng.uniform(0, think))
+    stop.set()
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    return {"samples": samples, "rss_peak": peak, "rss_mean": float(np.mean(rss)) if rss else None}
+
+
+def _cpu_children():
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def replica(sessions, actions, timeout, think):
+    # Uma réplica do app = N sessões simultâneas, cada uma no seu processo (spawn: Runtime limpo).
+    # Latência/vazão medidas do primeiro rerun ao último (sem o tempo de subir os processos);
+    # CPU = soma dos filhos (inclui subir o processo e carregar os agregados); RSS = soma dos processos de sessão
+    cpu0 = _cpu_children()
+    with ProcessPoolExecutor(sessions, mp_context=get_context("spawn")) as pool:
+        runs = list(pool.map(session, range(sessions), repeat(actions), repeat(timeout), repeat(think)))
+    cpu = _cpu_children() - cpu0
+    samples = [s for run in runs for s in run["samples"]]
+    wall = max(s["end"] for s in samples) - min(s["start"] for s in samples)
+    lat = np.array([s["seconds"] for s in samples])
+    warm = np.array([s["seconds"] for s in samples if s["action"] != "initial"])
+    rss_means = [run["rss_mean"] for run in runs if run["rss_mean"] is not None]
+    return {
+        "sessions": sessions,
+        "reruns": len(samples),
+        "errors": sum(s["error"] for s in samples),
+        "wall_seconds": round(wall, 3),
+        "throughput_rps": round(len(samples) / wall, 3),
+        "latency": {f"p{p}": round(float(np.percentile(lat, p)), 4) for p in PERCENTILES} | {"max": round(float(lat.max()), 4)},
+        "latency_warm": {f"p{p}": round(float(np.percentile(warm, p)), 4) for p in PERCENTILES} if len(warm) else {},
+        "by_action": {a: round(float(np.median([s["seconds"] for s in samples if s["action"] == a])), 4) for a in {s["action"] for s in samples}},
+        "cpu_seconds": round(cpu, 3),
+        "cpu_cores_used": round(cpu / wall, 2),
+        "rss_peak_mb": round(sum(run["rss_peak"] for run in runs) / 2**20, 1),
+        "rss_mean_mb": round(sum(rss_means) / 2**20, 1) if rss_means else None,
+    }
+
+
+def _prepare_env(args, tmp):
+    # Dados sintéticos + Overpass local; gold desligado para exercitar o caminho completo
+    from benchmarks.synthetic import make_listings
+    from loadtest.overpass_stub import start
+    env = dict(os.environ)
+    if not args.csv:
+        args.csv = os.path.join(tmp, "listings.csv")
+        make_listings(args.listings).to_csv(args.csv, index=False)
+    env["CSV_PATH"] = os.path.abspath(args.csv)
+    env["GOLD_PATH"] = env["GOLD_POIS_PATH"] = os.path.join(tmp, "no_gold.parquet")
+    # Cache compartilhado isolado: POIs do stub não podem vazar para o cache real
+    env["SHARED_CACHE_URL"] = f"sqlite:///{os.path.join(tmp, 'shared.sqlite')}"
+    server = None
+    if not args.overpass:
+        server, args.overpass = start(delay=args.overpass_delay)
+    env["OVERPASS_SERVERS"] = args.overpass
+    return env, server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Teste de carga do app.py com sessões simultâneas")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--actions", type=int, default=10, help="Mudanças de filtro por sessão (além da carga inicial)")
+    parser.add_argument("--think", type=float, default=0.5, help="Pausa máxima entre ações (s)")
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--listings", type=int, default=20_000, help="Tamanho do CSV sintético")
+    parser.add_argument("--csv", default=None, help="CSV bronze próprio em vez do sintético")
+    parser.add_argument("--overpass", default=None, help="URL de Overpass já rodando (padrão: stub local)")
+    parser.add_argument("--overpass-delay", type=float, default=0.3)
+    parser.add_argument("--out", default=os.path.join(RESULTS_DIR, "loadtest.json"))
+    parser.add_argument("--replica", type=int, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.replica is not None:
+        # Processo filho: uma réplica, resultado em JSON na stdout
+        print(json.dumps(replica(args.replica, args.actions, args.timeout, args.think)))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env, server = _prepare_env(args, tmp)
+        levels = []
+        for n in args.sessions:
+            cmd = [sys.executable, "-m", "loadtest.run", "--replica", str(n), "--actions", str(args.actions),
+                   "--think", str(args.think), "--timeout", str(args.timeout)]
+            proc = subprocess.run(cmd, env=env, capture_output=True, text=True)
+            if proc.returncode != 0:
+                print(proc.stderr, file=sys.stderr)
+                raise SystemExit(f"réplica com {n} sessões falhou")
+            level = json.loads(proc.stdout.strip().splitlines()[-1])
+            levels.append(level)
+            lat = level["latency"]
+            print(f"{n:>3} sessões: p50 {lat['p50']:.2f}s p95 {lat['p95']:.2f}s p99 {lat['p99']:.2f}s  "
+                  f"{level['throughput_rps']:.1f} reruns/s  CPU {level['cpu_cores_used']:.2f} núcleos  RSS {level['rss_peak_mb']:.0f} MB  erros {level['errors']}")
+        if server is not None:
+            server.shutdown()
+
+    report = {"meta": {"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "cpus": os.cpu_count(), "listings": args.listings,
+                       "actions": args.actions, "think": args.think, "overpass_delay": args.overpass_delay}, "levels": levels}
+    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"-> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+# tests/test_aggregates.py - refresh incremental dos agregados igual à reconstrução completa
+import unittest
+import numpy as np
+import pandas as pd
+from core.aggregates import Aggregates
+
+
+def frame(n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    cities = np.array(["katy", "houston", "austin", "miami"])
+    city = cities[rng.integers(0, 4, n)]
+    return pd.DataFrame({
+        "State": np.where(city == "miami", "FL", "TX"),
+        "City": city,
+        "unit_price": rng.integers(800, 4000, n).astype(float),
+        "unit_beds": rng.integers(0, 5, n).astype(float),
+    })
+
+
+class RefreshTest(unittest.TestCase):
+    def test_incremental_matches_full_rebuild(self):
+        df = frame()
+        previous = Aggregates.from_frame(df)
+        changed = df.copy()
+        changed.loc[changed["City"] == "katy", "unit_price"] += 100
+        agg = Aggregates.from_frame(changed, previous)
+        self.assertEqual(agg.areas, Aggregates.from_frame(changed).areas)
+        # Área sem mudança é reaproveitada; a anterior não é alterada
+        self.assertIs(agg.areas["FL", "Miami"], previous.areas["FL", "Miami"])
+        self.assertIsNot(agg.areas["TX", "Katy"], previous.areas["TX", "Katy"])
+        self.assertEqual(previous.areas, Aggregates.from_frame(df).areas)
+
+    def test_removed_area_is_dropped(self):
+        df = frame()
+        agg = Aggregates.from_frame(df[df["State"] == "TX"], Aggregates.from_frame(df))
+        self.assertEqual(agg.states, ["TX"])
+        self.assertNotIn(("FL", "Miami"), agg.areas)
+        self.assertEqual(agg.areas["TX", ""]["count"], int((df["State"] == "TX").sum()))
+
+    def test_row_order_does_not_matter(self):
+        df = frame()
+        previous = Aggregates.from_frame(df)
+        agg = Aggregates.from_frame(df.sample(frac=1, random_state=1), previous)
+        for key, area in previous.areas.items():
+            self.assertIs(agg.areas[key], area)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+# tests/test_bronze.py - identidade da unidade no bronze (merge incremental)
+import os
+import tempfile
+import unittest
+import pandas as pd
+from core.bronze import merge_bronze, normalize_chunk
+from jobs.raw_to_bronze import run
+
+
+def raw(rows):
+    base = {"latitude": "29.7", "longitude": "-95.4", "addressCity": "houston", "addressState": "tx",
+            "address": "100 Main St, Houston, TX 77002", "detailUrl": "/b/100-main"}
+    return pd.DataFrame([{**base, **row} for row in rows], dtype="string")
+
+
+class MergeBronzeTest(unittest.TestCase):
+    def test_floor_plans_with_same_beds_stay_apart(self):
+        units = "[{'price': '$1,500', 'beds': '2'}, {'price': '$1,550', 'beds': '2'}]"
+        bronze = merge_bronze(None, normalize_chunk(raw([{"price": "$1,500+", "units": units}]), "a.csv"))
+        self.assertEqual(sorted(bronze["unit_price"]), [1500.0, 1550.0])
+
+    def test_same_row_is_replaced_by_newer_file(self):
+        row = {"price": "$1,500", "beds": "2 bd"}
+        old = normalize_chunk(raw([row]), "old.csv")
+        new = normalize_chunk(raw([row]), "new.csv")
+        merged = merge_bronze(old, new)
+        self.assertEqual(merged["source_file"].tolist(), ["new.csv"])
+
+    def test_url_separates_units_at_one_address(self):
+        rows = [{"price": "$1,500", "beds": "2", "detailUrl": f"/b/100-main-apt-{i}"} for i in range(3)]
+        self.assertEqual(len(merge_bronze(None, normalize_chunk(raw(rows), "a.csv"))), 3)
+
+
+class RunTest(unittest.TestCase):
+    def test_modified_file_replaces_its_rows(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            raw_dir, out, manifest = os.path.join(tmp, "raw"), os.path.join(tmp, "bronze.csv"), os.path.join(tmp, "m.json")
+            os.makedirs(raw_dir)
+            units = [{"price": p, "beds": "2", "address": f"{i} Main St, Houston, TX"} for i, p in enumerate(("1000", "1200", "1300"))]
+            raw(units).to_csv(os.path.join(raw_dir, "a.csv"), index=False)
+            raw([{"price": "900", "beds": "1", "address": "9 Oak St, Houston, TX"}]).to_csv(os.path.join(raw_dir, "b.csv"), index=False)
+            run(raw_dir, out, manifest)
+            # a.csv editado: preço da primeira linha muda e a última sai
+            raw([{**units[0], "price": "1100"}, units[1]]).to_csv(os.path.join(raw_dir, "a.csv"), index=False)
+            bronze = run(raw_dir, out, manifest)
+            rows = sorted(zip(bronze["source_file"], bronze["unit_price"]))
+            self.assertEqual(rows, [("a.csv", 1100.0), ("a.csv", 1200.0), ("b.csv", 900.0)])
+
+
+if __name__ == "__main__":
+    unittest.main()
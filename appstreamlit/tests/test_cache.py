@@ -0,0 +1,145 @@
+# tests/test_cache.py - chaves Merkle do pipeline e eviction/TTL dos backends de cache
+import os
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+import pandas as pd
+from core.cache import LRUCache, SQLiteCache, content_hash
+from core.pipeline import Pipeline
+
+
+def build(calls):
+    # a -> b -> d ; c -> d ; e (sem cache, saída só depende do sinal de x)
+    pipe = Pipeline()
+
+    def track(name, fn):
+        def run(*args):
+            calls.append(name)
+            return fn(*args)
+        return run
+    pipe.stage("b", ["x"])(track("b", lambda x: x * 2))
+    pipe.stage("c", ["y"])(track("c", lambda y: y + 1))
+    pipe.stage("d", ["b", "c"])(track("d", lambda b, c: b + c))
+    pipe.stage("e", ["x"], cache=False)(track("e", lambda x: x > 0))
+    pipe.stage("f", ["e"])(track("f", lambda e: not e))
+    return pipe
+
+
+class PipelineTest(unittest.TestCase):
+    def test_only_changed_branch_reruns(self):
+        calls = []
+        pipe = build(calls)
+        self.assertEqual(pipe.run("d", x=1, y=1), 4)
+        self.assertEqual(calls, ["b", "c", "d"])
+        calls.clear()
+        out, report = pipe.run_many(["d"], x=1, y=5)
+        self.assertEqual((out["d"], calls), (8, ["c", "d"]))
+        self.assertEqual({r["stage"]: r["hit"] for r in report}, {"b": True, "c": False, "d": False})
+
+    def test_hit_does_not_run_upstream(self):
+        calls = []
+        pipe = build(calls)
+        pipe.run("d", x=1, y=1)
+        calls.clear()
+        pipe.run("d", x=1, y=1)
+        self.assertEqual(calls, [])
+
+    def test_version_bump_invalidates(self):
+        calls = []
+        pipe = build(calls)
+        pipe.run("d", x=1, y=1)
+        pipe.stages["c"].version = 2
+        calls.clear()
+        pipe.run("d", x=1, y=1)
+        self.assertEqual(calls, ["c", "d"])
+
+    def test_uncached_stage_is_keyed_by_output(self):
+        calls = []
+        pipe = build(calls)
+        pipe.run("f", x=1)
+        calls.clear()
+        # e roda sempre; mesma saída (True) -> f continua em cache
+        pipe.run("f", x=7)
+        self.assertEqual(calls, ["e"])
+        calls.clear()
+        pipe.run("f", x=-1)
+        self.assertEqual(calls, ["e", "f"])
+
+    def test_missing_input(self):
+        with self.assertRaises(KeyError):
+            build([]).run("d", x=1)
+
+
+class ContentHashTest(unittest.TestCase):
+    def test_frames_by_content(self):
+        a = pd.DataFrame({"v": [1.0, 2.0]})
+        self.assertEqual(content_hash(a), content_hash(a.copy()))
+        self.assertEqual(content_hash(a), content_hash(a.set_index(pd.Index([5, 6]))))
+        self.assertNotEqual(content_hash(a), content_hash(a.assign(v=[1.0, 3.0])))
+        self.assertNotEqual(content_hash(np.arange(3)), content_hash(np.arange(3.0)))
+        self.assertEqual(content_hash({"a": 1, "b": [2]}), content_hash({"b": [2], "a": 1}))
+
+
+class LRUCacheTest(unittest.TestCase):
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(max_entries=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertEqual((("a" in cache), ("b" in cache), ("c" in cache)), (True, False, True))
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_byte_limit_keeps_newest(self):
+        cache = LRUCache(max_entries=10, max_bytes=100)
+        for k in "abc":
+            cache.set(k, k, size=40)
+        self.assertEqual(list(cache._data), ["b", "c"])
+        self.assertEqual(cache.bytes, 80)
+        # Entrada maior que o limite sozinha ainda fica (só ela)
+        cache.set("big", 0, size=500)
+        self.assertEqual((len(cache), cache.bytes), (1, 500))
+
+    def test_ttl(self):
+        cache = LRUCache(ttl=10)
+        with mock.patch("core.cache.time.time", return_value=1000.0):
+            cache.set("a", 1, size=5)
+        with mock.patch("core.cache.time.time", return_value=1009.0):
+            self.assertEqual(cache.get("a"), 1)
+        with mock.patch("core.cache.time.time", return_value=1011.0):
+            self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.bytes, 0)
+
+
+class SQLiteCacheTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, "cache.sqlite")
+
+    def test_shared_between_instances_and_namespaced(self):
+        SQLiteCache(self.path, "pois").set("k", {"v": 1})
+        self.assertEqual(SQLiteCache(self.path, "pois").get("k"), {"v": 1})
+        self.assertIsNone(SQLiteCache(self.path, "other").get("k"))
+
+    def test_evicts_least_recently_used(self):
+        cache = SQLiteCache(self.path, max_entries=2)
+        with mock.patch("core.cache.time.time", side_effect=[1.0, 2.0, 3.0, 4.0]):
+            cache.set("a", 1)
+            cache.set("b", 2)
+            cache.get("a")
+            cache.set("c", 3)
+        self.assertEqual((cache.get("a"), cache.get("b"), cache.get("c")), (1, None, 3))
+
+    def test_ttl(self):
+        cache = SQLiteCache(self.path, ttl=10)
+        with mock.patch("core.cache.time.time", return_value=1000.0):
+            cache.set("a", 1)
+        with mock.patch("core.cache.time.time", return_value=1011.0):
+            self.assertIsNone(cache.get("a"))
+        self.assertEqual(len(cache), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
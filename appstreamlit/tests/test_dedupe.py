@@ -0,0 +1,78 @@
+# tests/test_dedupe.py - pares por grade de hash frente à força bruta, componentes e relistagens
+import unittest
+import numpy as np
+import pandas as pd
+from core.dedupe import M_PER_DEG_LAT, M_PER_DEG_LON, collapse_mask, components, group_listings, neighbor_pairs
+
+
+def brute_pairs(lat, lon, radius_m):
+    x = lon * M_PER_DEG_LON * np.cos(np.radians(np.nanmean(lat)))
+    y = lat * M_PER_DEG_LAT
+    d = np.hypot(x[:, None] - x[None, :], y[:, None] - y[None, :])
+    i, j = np.nonzero(np.triu(d <= radius_m, k=1))
+    return set(zip(i.tolist(), j.tolist()))
+
+
+def brute_components(n, pairs):
+    parent = list(range(n))
+
+    def find(a):
+        while parent[a] != a:
+            a = parent[a]
+        return a
+    for a, b in pairs:
+        ra, rb = find(a), find(b)
+        parent[max(ra, rb)] = min(ra, rb)
+    return [find(a) for a in range(n)]
+
+
+def listings(rows):
+    base = {"Lat": 29.76, "Lon": -95.37, "unit_beds": 2.0, "FullAddress": "100 Main St", "Url_anuncio": ""}
+    return pd.DataFrame([{**base, **row} for row in rows])
+
+
+class NeighborPairsTest(unittest.TestCase):
+    def test_matches_brute_force(self):
+        rng = np.random.default_rng(4)
+        for n in (0, 1, 2, 300):
+            lat = 29.76 + rng.normal(0, 0.0005, n)
+            lon = -95.37 + rng.normal(0, 0.0005, n)
+            i, j = neighbor_pairs(lat, lon, 15)
+            with self.subTest(n=n):
+                self.assertEqual(len(i), len(set(zip(i.tolist(), j.tolist()))))
+                self.assertEqual(set(zip(i.tolist(), j.tolist())), brute_pairs(lat, lon, 15) if n else set())
+
+    def test_components_match_union_find(self):
+        rng = np.random.default_rng(8)
+        lat = 29.76 + rng.normal(0, 0.001, 400)
+        lon = -95.37 + rng.normal(0, 0.001, 400)
+        i, j = neighbor_pairs(lat, lon, 15)
+        labels = components(400, i, j)
+        self.assertEqual(labels.tolist(), brute_components(400, zip(i.tolist(), j.tolist())))
+
+
+class GroupListingsTest(unittest.TestCase):
+    def test_distinct_units_at_one_point_stay_distinct(self):
+        out = group_listings(listings([{"FullAddress": f"100 Main St Apt {k}", "unit_price": 1500 + 5 * k} for k in range(20)]))
+        self.assertEqual(out["building_id"].nunique(), 1)
+        self.assertTrue((out["dup_of"] < 0).all())
+
+    def test_relisting_is_compared_to_anchor(self):
+        # 1040 está a 4% da âncora (1000); 1080 está a 8% (não encadeia pelo 1040)
+        out = group_listings(listings([{"unit_price": p} for p in (1080, 1000, 1040)]))
+        self.assertEqual(out["dup_of"].tolist(), [-1, -1, 1])
+
+    def test_same_url_counts_as_same_unit(self):
+        rows = [{"FullAddress": "100 Main St #4", "Url_anuncio": "https://z/1", "unit_price": 1200},
+                {"FullAddress": "100 Main Street, Unit 4", "Url_anuncio": "https://z/1", "unit_price": 1230},
+                {"FullAddress": "100 Main St #5", "Url_anuncio": "", "unit_price": 1210}]
+        self.assertEqual(group_listings(listings(rows))["dup_of"].tolist(), [-1, 0, -1])
+
+    def test_collapse_keeps_dup_when_anchor_filtered_out(self):
+        out = group_listings(listings([{"unit_price": p} for p in (1000, 1020)]))
+        self.assertEqual(collapse_mask(out).tolist(), [True, False])
+        self.assertEqual(collapse_mask(out.iloc[[1]]).tolist(), [True])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+# tests/test_distance.py - busca em duas fases frente à haversine exata (limite de erro documentado)
+import unittest
+import numpy as np
+from core.distance import R_KM, approx_error_bound, haversine_np, nearest_many
+
+# (lat mín, lat máx, lon centro, espalhamento em graus): interior, antimeridiano e perto dos polos
+REGIONS = {
+    "houston": (29.0, 31.0, -95.4, 1.0),
+    "dateline": (-20.0, 20.0, 180.0, 0.5),
+    "north_pole": (84.0, 89.9, 0.0, 180.0),
+    "south_pole": (-89.9, -84.0, 45.0, 180.0),
+}
+
+
+def points(rng, region, n):
+    lat_min, lat_max, lon_center, spread = REGIONS[region]
+    lon = lon_center + rng.uniform(-spread, spread, n)
+    return rng.uniform(lat_min, lat_max, n), (lon + 180) % 360 - 180
+
+
+def equirectangular(lat1, lon1, lat2, lon2):
+    dlon = (lon2 - lon1 + 180) % 360 - 180
+    return R_KM * np.radians(np.hypot(lat2 - lat1, dlon * np.cos(np.radians(lat1))))
+
+
+class TwoPhaseTest(unittest.TestCase):
+    def test_same_argmin_as_exact(self):
+        rng = np.random.default_rng(7)
+        for region in REGIONS:
+            with self.subTest(region=region):
+                lat, lon = points(rng, region, 400)
+                poi_lat, poi_lon = points(rng, region, 300)
+                idx, dist = nearest_many(lat, lon, poi_lat, poi_lon, mode="exact")
+                idx2, dist2 = nearest_many(lat, lon, poi_lat, poi_lon, mode="two_phase")
+                np.testing.assert_array_equal(idx2, idx)
+                np.testing.assert_allclose(dist2, dist)
+
+    def test_house_on_poi(self):
+        # Distância zero: perto do polo (limite inf) e no interior
+        lat, lon = [89.5, 89.95, 30.0, -89.7], [10.0, -170.0, -95.0, 179.9]
+        poi_lat, poi_lon = [89.5, 80.0, 89.95, 30.0, -89.7], [10.0, 0.0, -170.0, -95.0, 179.9]
+        idx, dist = nearest_many(lat, lon, poi_lat, poi_lon, mode="two_phase")
+        np.testing.assert_array_equal(idx, [0, 2, 3, 4])
+        np.testing.assert_array_equal(dist, 0.0)
+        exact_idx, _ = nearest_many(lat, lon, poi_lat, poi_lon, mode="exact")
+        np.testing.assert_array_equal(idx, exact_idx)
+
+    def test_error_within_bound(self):
+        rng = np.random.default_rng(11)
+        for region in REGIONS:
+            with self.subTest(region=region):
+                lat1, lon1 = points(rng, region, 5000)
+                # Pares a até ~80 km (0.45° em cada eixo; a longitude é escalada para não explodir nos polos)
+                lat2 = np.clip(lat1 + rng.uniform(-0.45, 0.45, 5000), -90, 90)
+                lon2 = lon1 + rng.uniform(-0.45, 0.45, 5000) / np.maximum(np.cos(np.radians(lat1)), 0.01)
+                hav = haversine_np(lat1, lon1, lat2, lon2)
+                keep = hav > 1e-3
+                ratio = equirectangular(lat1, lon1, lat2, lon2)[keep] / hav[keep]
+                bound = approx_error_bound(lat1[keep], hav[keep])
+                self.assertTrue(np.all(np.abs(ratio - 1) <= bound * (1 + 1e-9) + 1e-12))
+
+    def test_bound_is_infinite_near_poles(self):
+        self.assertTrue(np.isinf(approx_error_bound(89.5, 10.0)))
+        self.assertLess(approx_error_bound(30.0, 5.0), 3e-4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+# tests/test_filters.py - filtros vindos da URL (link compartilhado) nunca derrubam a página
+import unittest
+import numpy as np
+from core.filters import from_query, normalize_filters, to_query
+from core.geofilter import shapes_mask
+
+
+class FromQueryTest(unittest.TestCase):
+    def test_round_trip(self):
+        filters = normalize_filters("TX", "katy", [3, 2], (900, 2500))
+        parsed = from_query(to_query(filters))
+        self.assertEqual(parsed["beds"], [2.0, 3.0])
+        self.assertEqual(parsed["price"], [900, 2500])
+        self.assertEqual(parsed["city"], "Katy")
+
+    def test_non_finite_price_is_ignored(self):
+        for bad in ("inf", "-inf", "nan", "1e999"):
+            self.assertNotIn("price", from_query({"pmin": bad, "pmax": "2000"}))
+
+    def test_bad_param_keeps_the_others(self):
+        parsed = from_query({"state": "TX", "beds": "x", "pmin": "1000", "pmax": "2000"})
+        self.assertNotIn("beds", parsed)
+        self.assertEqual(parsed["price"], [1000, 2000])
+        self.assertEqual(parsed["state"], "TX")
+
+
+class GeoQueryTest(unittest.TestCase):
+    def test_valid_shapes_round_trip(self):
+        shapes = [
+            {"type": "polygon", "ring": [[-95.5, 29.7], [-95.3, 29.7], [-95.3, 29.9]]},
+            {"type": "circle", "center": [-95.4, 29.8], "radius": 1500.0},
+        ]
+        filters = normalize_filters("TX", "", [2], (0, 3000), shapes)
+        self.assertEqual(from_query(to_query(filters))["shapes"], shapes)
+
+    def test_malformed_shapes_are_dropped(self):
+        for geo in (
+            "5", "{}", "not json", '"polygon"',
+            '[{"type": "circle"}]',
+            '[{"type": "circle", "center": [-95.4, 29.8], "radius": 0}]',
+            '[{"type": "circle", "center": [-95.4, 29.8], "radius": "x"}]',
+            '[{"type": "circle", "center": [-95.4], "radius": 100}]',
+            '[{"type": "polygon", "ring": [[1]]}]',
+            '[{"type": "polygon", "ring": [[-95.5, 29.7], [-95.3, 29.7]]}]',
+            '[{"type": "polygon", "ring": [[-95.5, 29.7], [-95.3, 29.7], [500, 29.9]]}]',
+            '[{"type": "polygon", "ring": 7}]',
+            '[5, null, "x"]',
+        ):
+            self.assertEqual(from_query({"geo": geo}).get("shapes"), [], geo)
+
+    def test_invalid_shape_does_not_drop_valid_one(self):
+        geo = '[{"type": "circle"}, {"type": "circle", "center": [-95.4, 29.8], "radius": 100}]'
+        self.assertEqual(len(from_query({"geo": geo})["shapes"]), 1)
+
+    def test_parsed_shapes_filter_without_error(self):
+        shapes = from_query({"geo": '[{"type": "polygon", "ring": [[-95.5, 29.7], [-95.3, 29.7], [-95.3, 29.9]]}]'})["shapes"]
+        mask = shapes_mask(np.array([29.75, 10.0]), np.array([-95.35, 10.0]), shapes)
+        self.assertEqual(mask.tolist(), [True, False])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+# tests/test_hexbin.py - arredondamento hexagonal, medianas por célula e células sem preço
+import math
+import unittest
+import numpy as np
+from core.hexbin import NO_DATA, HexGrid, _group_median, _hex_round
+
+SQRT3 = math.sqrt(3)
+NEIGHBORS = [(0, 0), (1, 0), (-1, 0), (0, 1), (0, -1), (1, -1), (-1, 1)]
+
+
+def center(q, r):
+    # Centro do hexágono (pointy-top, tamanho 1) em coordenadas de tela
+    return SQRT3 * (q + r / 2), 1.5 * r
+
+
+class HexRoundTest(unittest.TestCase):
+    def test_rounds_to_nearest_center(self):
+        rng = np.random.default_rng(5)
+        x, y = rng.uniform(-50, 50, (2, 5000))
+        q, r = _hex_round(SQRT3 / 3 * x - y / 3, 2 / 3 * y)
+        cx, cy = center(q, r)
+        d = np.hypot(x - cx, y - cy)
+        for dq, dr in NEIGHBORS[1:]:
+            nx, ny = center(q + dq, r + dr)
+            self.assertTrue(np.all(d <= np.hypot(x - nx, y - ny) + 1e-9))
+        # Raio circunscrito = 1: nenhum ponto fica fora do próprio hexágono
+        self.assertLessEqual(d.max(), 1 + 1e-9)
+
+
+class GroupMedianTest(unittest.TestCase):
+    def test_matches_numpy_median_ignoring_nan(self):
+        rng = np.random.default_rng(2)
+        cell = rng.integers(0, 40, 1000)
+        values = rng.normal(1500, 300, 1000)
+        values[::13] = np.nan
+        out = _group_median(cell, values, 42)
+        for c in range(42):
+            v = values[(cell == c) & ~np.isnan(values)]
+            if len(v):
+                self.assertAlmostEqual(out[c], float(np.median(v)))
+            else:
+                self.assertTrue(np.isnan(out[c]))
+
+
+class HexGridTest(unittest.TestCase):
+    def test_counts_and_cell_median(self):
+        lat = np.r_[np.full(5, 29.76), np.random.default_rng(1).uniform(29, 31, 200)]
+        lon = np.r_[np.full(5, -95.37), np.random.default_rng(2).uniform(-96, -95, 200)]
+        price = np.r_[[1000, 1100, 1200, 1300, 5000], np.full(200, 2000.0)]
+        grid = HexGrid(lat, lon, price, np.full(205, 2.0))
+        for level in grid.levels.values():
+            self.assertEqual(int(level["count"].sum()), 205)
+        props = [f["properties"] for f in grid.get_features(15, (29.75, -95.38, 29.77, -95.36))["features"]]
+        self.assertIn({"count": 5, "median_price": "$1,200", "median_ppb": "$600"}, [{k: p[k] for k in ("count", "median_price", "median_ppb")} for p in props])
+
+    def test_cell_without_price_is_neutral(self):
+        grid = HexGrid([29.7, 29.7, 40.0], [-95.4, -95.4, -80.0], [1000.0, 3000.0, np.nan], [1.0, 2.0, 1.0])
+        props = {f["properties"]["count"]: f["properties"] for f in grid.get_features(12)["features"]}
+        self.assertEqual(props[1]["median_price"], "N/A")
+        self.assertEqual(props[1]["fill"], NO_DATA)
+        self.assertNotEqual(props[2]["fill"], NO_DATA)
+
+
+if __name__ == "__main__":
+    unittest.main()
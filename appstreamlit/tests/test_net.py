@@ -0,0 +1,46 @@
+# tests/test_net.py - fan-out de áreas não pode travar o pool de rede (python -m unittest, de appstreamlit/)
+import threading
+import time
+import unittest
+from unittest import mock
+from benchmarks.synthetic import make_listings
+from core import net
+from core.pois import fetch_pois_around, warm_areas
+
+
+class _Response:
+    status_code = 200
+
+    def json(self):
+        return {"elements": [{"lat": 29.7, "lon": -95.4, "tags": {"amenity": "school", "name": "Test School"}}]}
+
+
+def _fake_request(method, url, **kwargs):
+    time.sleep(0.05)
+    return _Response()
+
+
+class WarmAreasTest(unittest.TestCase):
+    def test_more_areas_than_pool_workers(self):
+        df = make_listings(200, seed=1)
+        state, city = df["State"].iloc[0], df["City"].iloc[0]
+        areas = [(state, city)] * (net._POOL._max_workers + 8)
+        results = []
+        with mock.patch.object(net, "_request", _fake_request):
+            worker = threading.Thread(target=lambda: results.extend(warm_areas(df, areas, fetch=fetch_pois_around)), daemon=True)
+            worker.start()
+            worker.join(timeout=60)
+        self.assertFalse(worker.is_alive(), "warm_areas travou (deadlock no pool de rede)")
+        self.assertEqual(len(results), len(areas))
+        self.assertTrue(all(schools for _, schools in results))
+
+    def test_call_inside_pool_worker_runs_inline(self):
+        # Tarefa do _POOL que faz rede por dentro (run -> overpass -> call) não espera o próprio pool
+        with mock.patch.object(net, "_request", _fake_request):
+            futures = [net._POOL.submit(fetch_pois_around, [29.7], [-95.4]) for _ in range(net._POOL._max_workers + 4)]
+            results = [f.result(timeout=60) for f in futures]
+        self.assertEqual(len(results), len(futures))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,38 @@
+# tests/test_results.py - paginação por cursor percorre toda a ordem, sem repetir nem pular linhas
+import unittest
+import numpy as np
+from core.results import keyset_page
+
+
+def walk(values, page_size, mask=None):
+    pages, cursor = [], None
+    while True:
+        idx, cursor = keyset_page(values, cursor, page_size, mask)
+        pages.append(idx)
+        if cursor is None:
+            return np.concatenate(pages)
+
+
+class KeysetPageTest(unittest.TestCase):
+    def test_pages_cover_sorted_order_with_ties_and_nan(self):
+        values = np.random.default_rng(0).integers(0, 20, 237).astype(float)
+        values[::17] = np.nan
+        order = walk(values, 50)
+        filled = np.nan_to_num(values, nan=np.inf)
+        self.assertEqual(order.tolist(), np.lexsort((np.arange(len(values)), filled)).tolist())
+
+    def test_mask_limits_rows(self):
+        values = np.random.default_rng(1).random(120)
+        mask = np.arange(120) % 3 != 0
+        order = walk(values, 7, mask)
+        self.assertEqual(sorted(order.tolist()), np.flatnonzero(mask).tolist())
+        self.assertTrue(np.all(np.diff(values[order]) >= 0))
+
+    def test_last_page_has_no_cursor(self):
+        idx, cursor = keyset_page(np.arange(50.0), None, 50)
+        self.assertEqual(len(idx), 50)
+        self.assertIsNone(cursor)
+
+
+if __name__ == "__main__":
+    unittest.main()
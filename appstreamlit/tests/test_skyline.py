@@ -0,0 +1,40 @@
+# tests/test_skyline.py - fronteira de Pareto frente à força bruta (empates, duplicatas e valores ausentes)
+import unittest
+import numpy as np
+import pandas as pd
+from core.skyline import MISSING, SKYLINE_COLUMNS, skyline
+
+
+def brute_force(pts):
+    le = (pts[None, :, :] <= pts[:, None, :]).all(axis=2)
+    lt = (pts[None, :, :] < pts[:, None, :]).any(axis=2)
+    return ~(le & lt).any(axis=1)
+
+
+def frame(pts):
+    return pd.DataFrame(pts, columns=SKYLINE_COLUMNS)
+
+
+class SkylineTest(unittest.TestCase):
+    def test_matches_brute_force(self):
+        rng = np.random.default_rng(3)
+        for n in (1, 2, 50, 400):
+            # Poucos valores distintos: muitos empates e triplas repetidas
+            pts = rng.integers(0, 6, (n, 3)).astype(float)
+            with self.subTest(n=n):
+                np.testing.assert_array_equal(skyline(frame(pts)), brute_force(pts))
+
+    def test_missing_is_worst_but_comparable(self):
+        pts = np.array([[1000.0, np.nan, 1.0], [1200.0, 2.0, 2.0], [900.0, np.nan, np.inf]])
+        mask = skyline(frame(pts))
+        # Mais barato que todos: continua na fronteira mesmo com distâncias ausentes
+        self.assertTrue(mask[2])
+        self.assertTrue(mask[0])
+        np.testing.assert_array_equal(mask, brute_force(np.nan_to_num(pts, nan=MISSING, posinf=MISSING)))
+
+    def test_empty(self):
+        self.assertEqual(len(skyline(frame(np.empty((0, 3))))), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,17 +1,14 @@
 # utils/helpers.py
-import requests
-from config.settings import HEADERS, DEFAULT_CENTER
-import streamlit as st
+from config.settings import DEFAULT_CENTER
+from core import net
 
 def get_city_center(city_name):
     try:
-        r = requests.get(
+        data = net.get_json_sync(
             "https://nominatim.openstreetmap.org/search",
             params={"q": f"{city_name}, TX, USA", "format": "json", "limit": 1},
-            headers=HEADERS,
             timeout=15
         )
-        data = r.json()
         if data:
             b = data[0]["boundingbox"]
             lat = (float(b[0]) + float(b[1])) / 2
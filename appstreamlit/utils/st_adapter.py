@@ -0,0 +1,72 @@
+# utils/st_adapter.py - camada fina entre o core (headless) e o Streamlit
+import logging
+import streamlit as st
+from config.settings import PROFILE_LOG_PATH
+from core.aggregates import Aggregates
+from core.data_loader import load_properties
+from core.gold import gold_area_pois, gold_available, load_gold, load_gold_pois
+from core.pois import area_pois, fetch_pois_around_shared
+
+
+class StreamlitLogHandler(logging.Handler):
+    # Avisos/erros do core viram st.warning / st.error na página
+    def emit(self, record):
+        try:
+            (st.error if record.levelno >= logging.ERROR else st.warning)(self.format(record))
+        except Exception:
+            pass
+
+
+def install_logging(level=logging.WARNING):
+    root = logging.getLogger("core")
+    if not any(isinstance(h, StreamlitLogHandler) for h in root.handlers):
+        root.addHandler(StreamlitLogHandler(level))
+    root.setLevel(level)
+
+
+def install_profiling_log(path=PROFILE_LOG_PATH):
+    # Perfis em JSON (um por linha) vão para arquivo/stderr, não para a página
+    prof_log = logging.getLogger("core.profiling")
+    if not prof_log.handlers:
+        handler = logging.FileHandler(path) if path else logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        prof_log.addHandler(handler)
+        prof_log.propagate = False
+    prof_log.setLevel(logging.INFO)
+
+
+@st.cache_resource(ttl=86400)
+def load_properties_cached():
+    # cache_resource: sem cópia/unpickle a cada rerun (o frame é tratado como somente leitura).
+    # Com a camada gold (python -m jobs.build_gold) o app só filtra e renderiza.
+    return load_gold() if gold_available() else load_properties()
+
+
+_last_aggregates = {}
+
+
+@st.cache_resource(max_entries=2)
+def load_aggregates_cached(_df, key):
+    # Chaveado pelo hash do frame na tela (nunca descrevem outro frame); na recarga do frame (TTL)
+    # só as áreas que mudaram são recalculadas. Sidebar vira lookup em dicionário
+    agg = Aggregates.from_frame(_df, _last_aggregates.get("agg"))
+    _last_aggregates["agg"] = agg
+    return agg
+
+
+@st.cache_resource(ttl=86400)
+def load_gold_pois_cached():
+    return load_gold_pois() if gold_available() else None
+
+
+@st.cache_data(ttl=7200, show_spinner=False)
+def fetch_pois_around_cached(lat_list, lon_list):
+    # L1 no processo; por baixo, o cache compartilhado entre réplicas (SHARED_CACHE_URL)
+    return fetch_pois_around_shared(lat_list, lon_list)
+
+
+def area_pois_cached(listings, state, city):
+    pois = load_gold_pois_cached()
+    if pois is not None and (pois["State"] == state).any():
+        return gold_area_pois(pois, state, city)
+    return area_pois(listings, state, city, fetch=fetch_pois_around_cached)